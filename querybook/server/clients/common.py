@@ -1,11 +1,13 @@
 from abc import ABCMeta, abstractmethod
 from collections import deque
 from itertools import islice
-from typing import Generator, List
+from typing import List
 
 
 from env import QuerybookSettings
-from lib.utils.csv import string_to_csv, LINE_TERMINATOR, split_csv_to_chunks
+from lib.utils.compression import StreamDecompressor
+from lib.utils.csv import LINE_TERMINATOR, lines_to_csv_iter
+from lib.utils.utf8 import split_by_last_invalid_utf8_char
 
 
 class FileDoesNotExist(Exception):
@@ -29,43 +31,9 @@ class ChunkReader(metaclass=ABCMeta):
         self._raw_buffer = ""
 
     def get_csv_iter(self, number_of_lines=None):
-        csv_line_count = 0
-        partial_csv_lines = []
-        for csv_chunk in self._read_csv_chunk():
-            valid_csv_chunk, partial_csv_lines = split_csv_to_chunks(
-                partial_csv_lines + csv_chunk
-            )
-            if len(valid_csv_chunk) == 0:
-                continue
-
-            csv_chunk_str = LINE_TERMINATOR.join(valid_csv_chunk)
-            csv = string_to_csv(csv_chunk_str)
-
-            if number_of_lines is None:
-                yield from csv
-            else:
-                rows_to_yield = min(len(csv), number_of_lines - csv_line_count)
-                csv_line_count += rows_to_yield
-                yield from islice(csv, rows_to_yield)
-
-                if csv_line_count >= number_of_lines:
-                    break
-
-    def _read_csv_chunk(self) -> Generator[List[str], None, None]:
-        """
-        Similar to read_line, get the entire chunk of buffer_deque and process
-        them together as CSV
-        """
-        while (not self._eof) or len(self._buffer_deque):
-            if len(self._buffer_deque) > 0:
-                line_chunks = []
-                while len(self._buffer_deque) > 0:
-                    line_chunks.append(self._buffer_deque.popleft())
-                yield line_chunks
-
-            # If not at the end, perform another round of loading
-            if not self._eof:
-                self._fill_buffer()
+        # The rows are parsed from the lines as they are read, a row cut
+        # by max_read_size is not returned
+        return islice(lines_to_csv_iter(self.read_line()), number_of_lines)
 
     def read_lines(self, number_of_lines=None) -> List[str]:
         return [line for line in islice(self.read_line(), number_of_lines)]
@@ -128,3 +96,51 @@ class ChunkReader(metaclass=ABCMeta):
             str -- The raw string from file
         """
         raise NotImplementedError()
+
+
+class BinaryChunkReader(ChunkReader):
+    """ChunkReader of a binary object, the object is decompressed
+    (if it is compressed) and decoded as utf-8
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._decompressor = StreamDecompressor()
+        self._left_over_bytes = b""
+        self._bytes_eof = False
+
+        super(BinaryChunkReader, self).__init__(*args, **kwargs)
+
+    def read(self):
+        # Compressed or multi-byte chars can be split across reads,
+        # keep reading until there is something to decode
+        while not self._bytes_eof:
+            data = self.read_bytes()
+            if len(data):
+                raw = self._left_over_bytes + self._decompressor.decompress(data)
+                valid_raw, self._left_over_bytes = split_by_last_invalid_utf8_char(raw)
+                if len(valid_raw):
+                    return valid_raw.decode("utf-8")
+            else:
+                self._bytes_eof = True
+                raw = self._left_over_bytes + self._decompressor.flush()
+                self._left_over_bytes = b""
+                # A truncated object can end in the middle of a char
+                return raw.decode("utf-8", errors="ignore")
+        return ""
+
+    @abstractmethod
+    def read_bytes(self) -> bytes:
+        """
+            Get the next bytes of the object,
+            It is expected that the size returned is equal to self._read_size but
+            not required.
+
+            Return empty bytes when reaching eof
+
+        Raises:
+            NotImplementedError: Must be implemented by the child class
+
+        Returns:
+            bytes -- The raw (possibly compressed) bytes from file
+        """
+        raise NotImplementedError()
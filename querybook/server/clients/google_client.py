@@ -6,7 +6,7 @@ from urllib.parse import quote
 import requests
 
 from env import QuerybookSettings
-from .common import ChunkReader, FileDoesNotExist
+from .common import BinaryChunkReader, FileDoesNotExist
 from lib.utils.utils import DATETIME_TO_UTC
 
 
@@ -45,6 +45,7 @@ class GoogleUploadClient(object):
         self,
         bucket_name: str,
         blob_name: str,
+        content_encoding: str = None,
     ):
         from google.cloud import storage
         from google.auth.transport import requests
@@ -53,6 +54,7 @@ class GoogleUploadClient(object):
         self._client = storage.Client(project=cred.project_id, credentials=cred)
         self._bucket = self._client.bucket(bucket_name)
         self._blob = self._bucket.blob(blob_name)
+        self._content_encoding = content_encoding
 
         self._chunk_size = QuerybookSettings.STORE_MIN_UPLOAD_CHUNK_SIZE
 
@@ -71,18 +73,28 @@ class GoogleUploadClient(object):
             f"https://www.googleapis.com/upload/storage/v1/b/"
             f"{self._bucket.name}/o?uploadType=resumable"
         )
+        metadata = {"name": self._blob.name}
+        if self._content_encoding is not None:
+            # Served with the signed url so the download is decompressed
+            metadata["contentEncoding"] = self._content_encoding
+
         self._request = ResumableUpload(upload_url=url, chunk_size=self._chunk_size)
         self._request.initiate(
             transport=self._transport,
             content_type="application/octet-stream",
             stream=self._stream,
             stream_final=False,
-            metadata={"name": self._blob.name},
+            metadata=metadata,
         )
 
     def stop(self):
         self._request.transmit_next_chunk(self._transport)
 
+    def abort(self):
+        """Cancel the resumable upload, the uploaded chunks are deleted"""
+        # Cancelling a resumable upload responds with 499
+        self._transport.delete(self._request.resumable_url)
+
     def write(self, data: bytes):
         from google.resumable_media import common
 
@@ -108,7 +120,7 @@ class GoogleUploadClient(object):
         return data_len
 
 
-class GoogleDownloadClient(ChunkReader):
+class GoogleDownloadClient(BinaryChunkReader):
     def __init__(
         self,
         bucket_name,
@@ -118,7 +130,7 @@ class GoogleDownloadClient(ChunkReader):
     ):
         from google.cloud import storage
         from google.auth.transport.requests import AuthorizedSession
-        from google.resumable_media.requests import ChunkedDownload
+        from google.resumable_media.requests import RawChunkedDownload
 
         # First check for existence
         cred = get_google_credentials()
@@ -139,13 +151,20 @@ class GoogleDownloadClient(ChunkReader):
             f"{bucket_name}/o/{quote(blob_name, safe='')}?alt=media"
         )
 
-        self._download = ChunkedDownload(download_url, read_size, self._stream)
+        # Download the stored bytes as is, otherwise gcs would decompress
+        # the gzip encoded blobs and ignore the chunk ranges
+        self._download = RawChunkedDownload(
+            download_url,
+            read_size,
+            self._stream,
+            headers={"accept-encoding": "gzip"},
+        )
 
         super(GoogleDownloadClient, self).__init__(read_size, max_read_size)
 
-    def read(self):
+    def read_bytes(self):
         if self._download.finished:
-            return ""
+            return b""
         self._download.consume_next_chunk(self._transport)
         self._stream.seek(0)
         content = self._stream.read()
@@ -154,7 +173,28 @@ class GoogleDownloadClient(ChunkReader):
         self._stream.seek(0)
         self._stream.truncate(0)
 
-        return content.decode("utf-8")
+        return content
+
+
+def open_google_blob(bucket_name: str, blob_name: str, offset: int = 0):
+    """Open a blob as a readonly binary file-like object of its stored bytes,
+    starting from the byte offset
+
+    Raises:
+        FileDoesNotExist: if the blob is not in the bucket
+    """
+    from google.cloud import storage
+
+    cred = get_google_credentials()
+    client = storage.Client(project=cred.project_id, credentials=cred)
+    blob = client.bucket(bucket_name).blob(blob_name)
+    if not blob.exists():
+        raise FileDoesNotExist("{}/{} does not exist".format(bucket_name, blob_name))
+    blob_reader = blob.open("rb", raw_download=True)
+    if offset > 0:
+        # Only the bytes after the offset are downloaded
+        blob_reader.seek(offset)
+    return blob_reader
 
 
 class GoogleKeySigner(object):
@@ -1,50 +1,156 @@
-from typing import Dict, TextIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, TextIO, Union
 import boto3
 import botocore
 from botocore.client import Config
 
 
 from env import QuerybookSettings
-from lib.utils.utf8 import split_by_last_invalid_utf8_char
 
-from .common import ChunkReader, FileDoesNotExist
+from .common import BinaryChunkReader, FileDoesNotExist
 
 
 class MultiPartUploader(object):
-    def __init__(self, bucket_name, key):
+    def __init__(
+        self,
+        bucket_name,
+        key,
+        max_concurrent_parts=None,
+        max_pending_size=None,
+        content_encoding=None,
+    ):
+        """Upload a s3 object in parts of at least STORE_MIN_UPLOAD_CHUNK_SIZE
+
+        Arguments:
+            bucket_name {str}
+            key {str}
+
+        Keyword Arguments:
+            max_concurrent_parts {int} -- Number of parts uploaded in parallel,
+                if 1 every part is uploaded synchronously in write()
+                (default: {STORE_MAX_CONCURRENT_UPLOAD_PARTS})
+            max_pending_size {int} -- Max size of the parts being uploaded in
+                parallel, write() blocks until there is room
+                (default: {STORE_MAX_PENDING_UPLOAD_SIZE})
+            content_encoding {str} -- Content-Encoding of the object, e.g. gzip
+                if the written data is compressed (default: {None})
+        """
         self._bucket_name = bucket_name
         self._key = key
         self._s3 = boto3.client("s3")
-        self._mpu = self._s3.create_multipart_upload(Bucket=bucket_name, Key=key)
+        mpu_params = {}
+        if content_encoding is not None:
+            # Served with the presigned url so the download is decompressed
+            mpu_params["ContentEncoding"] = content_encoding
+        self._mpu = self._s3.create_multipart_upload(
+            Bucket=bucket_name, Key=key, **mpu_params
+        )
         self._parts = []
         self._part_number = 1
 
+        self._max_concurrent_parts = (
+            max_concurrent_parts or QuerybookSettings.STORE_MAX_CONCURRENT_UPLOAD_PARTS
+        )
+        self._max_pending_size = (
+            max_pending_size or QuerybookSettings.STORE_MAX_PENDING_UPLOAD_SIZE
+        )
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self._max_concurrent_parts)
+            if self._max_concurrent_parts > 1
+            else None
+        )
+        # Parts being uploaded in the order of part number
+        self._pending_parts = deque()  # (part_number, size, future)
+        self._pending_size = 0
+
         self.chunk = []
         self.chunk_datasize = 0
         self.is_first_upload = True
+        self._aborted = False
+
+    def _send_part(self, part_number: int, body) -> str:
+        part = self._s3.upload_part(
+            Bucket=self._bucket_name,
+            Key=self._key,
+            PartNumber=part_number,
+            UploadId=self._mpu["UploadId"],
+            Body=body,
+        )
+        return part["ETag"].replace('"', "")
 
     def _upload_part(self, body):
         if self._part_number > QuerybookSettings.STORE_MAX_UPLOAD_CHUNK_NUM:
             return
 
-        part = self._s3.upload_part(
+        part_number = self._part_number
+        self._part_number += 1
+        try:
+            if self._executor is None:
+                self._parts.append(
+                    {
+                        "PartNumber": part_number,
+                        "ETag": self._send_part(part_number, body),
+                    }
+                )
+            else:
+                self._wait_for_pending_parts(len(body))
+                self._pending_parts.append(
+                    (
+                        part_number,
+                        len(body),
+                        self._executor.submit(self._send_part, part_number, body),
+                    )
+                )
+                self._pending_size += len(body)
+        except Exception:
+            self.abort()
+            raise
+
+    def _wait_for_pending_parts(self, incoming_size: int = None):
+        """Wait until there is room for a part of incoming_size,
+        or for all parts to be uploaded if incoming_size is None
+        """
+        while len(self._pending_parts) and (
+            incoming_size is None
+            or len(self._pending_parts) >= self._max_concurrent_parts
+            or self._pending_size + incoming_size > self._max_pending_size
+        ):
+            # Parts are finished in order so self._parts stays sorted
+            part_number, size, future = self._pending_parts.popleft()
+            self._pending_size -= size
+            self._parts.append({"PartNumber": part_number, "ETag": future.result()})
+
+    def abort(self):
+        """Cancel the upload, the uploaded parts are deleted. A failed write
+        already aborts the upload, so calling it again does nothing
+        """
+        if self._aborted:
+            return
+        self._aborted = True
+
+        if self._executor is not None:
+            for _, _, future in self._pending_parts:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._pending_parts.clear()
+
+        self._s3.abort_multipart_upload(
             Bucket=self._bucket_name,
             Key=self._key,
-            PartNumber=self._part_number,
             UploadId=self._mpu["UploadId"],
-            Body=body,
         )
 
-        self._parts.append(
-            {"PartNumber": self._part_number, "ETag": part["ETag"].replace('"', "")}
-        )
-        self._part_number += 1
+    def _join_chunk(self) -> Union[str, bytes]:
+        # An upload is either all text or all bytes (e.g. columnar results)
+        return (b"" if isinstance(self.chunk[0], bytes) else "").join(self.chunk)
 
-    def write(self, string: str) -> bool:
+    def write(self, string: Union[str, bytes]) -> bool:
         """Write a string to upload
 
         Arguments:
-            string {str} -- the string to upload
+            string {Union[str, bytes]} -- the string (or bytes) to upload
 
         Returns:
             bool -- Whether or not the upload is successful
@@ -55,7 +161,7 @@ class MultiPartUploader(object):
         self.chunk.append(string)
         self.chunk_datasize += len(string)
         if self.chunk_datasize > QuerybookSettings.STORE_MIN_UPLOAD_CHUNK_SIZE:
-            self._upload_part("".join(self.chunk))
+            self._upload_part(self._join_chunk())
             self.chunk = []
             self.chunk_datasize = 0
         return True
@@ -65,7 +171,14 @@ class MultiPartUploader(object):
 
     def complete(self):
         if len(self.chunk) > 0:
-            self._upload_part("".join(self.chunk))
+            self._upload_part(self._join_chunk())
+        if self._executor is not None:
+            try:
+                self._wait_for_pending_parts()
+            except Exception:
+                self.abort()
+                raise
+            self._executor.shutdown()
         self._s3.complete_multipart_upload(
             Bucket=self._bucket_name,
             Key=self._key,
@@ -103,7 +216,47 @@ class S3KeySigner(object):
         return None
 
 
-class S3FileReader(ChunkReader):
+_shared_s3_client = None
+
+
+def get_shared_s3_client():
+    """Get the s3 client shared by the readers, boto3 clients are
+    thread safe but slow to create"""
+    global _shared_s3_client
+    if _shared_s3_client is None:
+        _shared_s3_client = boto3.client("s3")
+    return _shared_s3_client
+
+
+def open_s3_object(bucket_name: str, key: str, offset: int = 0):
+    """Get the streaming body of a s3 object
+
+    Arguments:
+        offset {int} -- Byte offset to start reading from, the bytes
+            before it are not downloaded
+
+    Raises:
+        FileDoesNotExist: if the key is not in the bucket
+    """
+    get_params = {}
+    if offset > 0:
+        get_params["Range"] = f"bytes={offset}-"
+    try:
+        return get_shared_s3_client().get_object(
+            Bucket=bucket_name, Key=key, **get_params
+        )["Body"]
+    except botocore.exceptions.ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        if error_code == "NoSuchKey":
+            raise FileDoesNotExist("{}/{} does not exist".format(bucket_name, key))
+        elif error_code == "InvalidRange":
+            # The offset is the end of the object
+            return BytesIO(b"")
+        else:
+            raise e
+
+
+class S3FileReader(BinaryChunkReader):
     def __init__(
         self,
         bucket_name,
@@ -113,27 +266,14 @@ class S3FileReader(ChunkReader):
     ):
         self._bucket_name = bucket_name
         self._key = key
-        self._left_over_bytes = b""
 
         super(S3FileReader, self).__init__(read_size, max_read_size)
 
         # Now connect to s3 using boto3
-        try:
-            self._s3 = boto3.resource("s3")
-            self._object = self._s3.Object(self._bucket_name, key)
-            self._body = self._object.get()["Body"]
-        except botocore.exceptions.ClientError as e:
-            if e.response["Error"]["Code"] == "NoSuchKey":
-                raise FileDoesNotExist(
-                    "{}/{} does not exist".format(self._bucket_name, key)
-                )
-            else:
-                raise e
+        self._body = open_s3_object(self._bucket_name, key)
 
-    def read(self):
-        raw = self._left_over_bytes + self._body.read(self._read_size)
-        valid_raw, self._left_over_bytes = split_by_last_invalid_utf8_char(raw)
-        return valid_raw.decode("utf-8")
+    def read_bytes(self):
+        return self._body.read(self._read_size)
 
 
 class S3FileCopier(object):
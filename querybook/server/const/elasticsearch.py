@@ -10,3 +10,12 @@ class ElasticsearchItem(Enum):
     tables = "tables"
     users = "users"
     boards = "boards"
+
+
+# Redis set of the "<item type>:<item id>" to reindex on the next flush
+ELASTICSEARCH_SYNC_QUEUE_KEY = "elasticsearch_sync_queue"
+# Redis set of the search document fields to update for a queued item,
+# suffixed by "<item type>:<item id>"
+ELASTICSEARCH_SYNC_QUEUE_FIELDS_KEY_PREFIX = "elasticsearch_sync_queue_fields:"
+# Marks that all the fields of the queued item must be updated
+ELASTICSEARCH_SYNC_ALL_FIELDS = "*"
@@ -477,7 +477,7 @@ def add_datadoc_editor(
             namespace="/datadoc",
             room=doc_id,
         )
-        logic.update_es_data_doc_by_id(doc_id)
+        logic.update_es_data_doc_by_id(doc_id, fields=["readable_user_ids"])
         send_add_datadoc_editor_email(doc_id, uid, read, write)
         return editor_dict
 
@@ -683,7 +683,9 @@ def update_datadoc_owner(doc_id, next_owner_id, originator=None):
             namespace="/datadoc",
             room=next_owner_editor_dict["data_doc_id"],
         )
-        logic.update_es_data_doc_by_id(doc_id)
+        logic.update_es_data_doc_by_id(
+            doc_id, fields=logic.get_data_doc_es_fields(["owner_uid"])
+        )
         # Update queries in elasticsearch to reflect new permissions
         logic.update_es_queries_by_datadoc_id(doc_id)
 
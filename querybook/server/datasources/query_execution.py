@@ -1,3 +1,4 @@
+from contextlib import closing
 from datetime import datetime
 from typing import Dict, Optional
 
@@ -15,6 +16,13 @@ from app.auth.permission import (
 from clients.common import FileDoesNotExist
 from lib.export.all_exporters import ALL_EXPORTERS, get_exporter
 from lib.result_store import GenericReader
+from lib.result_store.result_index import read_result_rows
+from lib.result_store.result_preview_cache import (
+    get_result_preview,
+    get_uploading_result_preview,
+    set_result_preview,
+)
+from lib.query_executor.result_cache import apply_cached_query_execution
 from lib.query_analysis.templating import (
     QueryTemplatingError,
     get_templated_variables_in_string,
@@ -88,7 +96,9 @@ def process_query_execution_metadata(
     return data_doc
 
 
-def initiate_query_execution(query_execution, uid, peer_review_params, session):
+def initiate_query_execution(
+    query_execution, uid, peer_review_params, session, use_result_cache=True
+):
     """Initiate the query execution based on peer_review_params."""
     # Initiate peer review workflow
     if peer_review_params:
@@ -100,6 +110,11 @@ def initiate_query_execution(query_execution, uid, peer_review_params, session):
         )
     # Start immediate execution
     else:
+        # Reuse the result of the same query if the engine has a result cache,
+        # run_query_task then skips the execution and only completes it
+        apply_cached_query_execution(
+            query_execution.id, use_result_cache=use_result_cache, session=session
+        )
         run_query_task.apply_async(
             args=[
                 query_execution.id,
@@ -115,6 +130,7 @@ def create_query_execution(
     data_cell_id: Optional[int] = None,
     originator: Optional[str] = None,
     peer_review_params: Optional[PeerReviewParamsDict] = None,
+    use_result_cache: bool = True,
 ):
     """
     Creates a new QueryExecution.
@@ -126,6 +142,8 @@ def create_query_execution(
         data_cell_id (int, optional): ID of the DataDoc cell to associate with.
         originator (str, optional): Identifier for the originator of the request.
         peer_review_params (dict, optional): Parameters for peer review workflow.
+        use_result_cache (bool, optional): Whether a cached result of the same
+            query can be used, if the engine has a result cache. Defaults to True.
 
     Returns:
         dict: A dictionary representation of the created QueryExecution.
@@ -160,6 +178,7 @@ def create_query_execution(
                 uid=uid,
                 peer_review_params=peer_review_params,
                 session=session,
+                use_result_cache=use_result_cache,
             )
 
             query_execution_dict = query_execution.to_dict(with_query_review=True)
@@ -378,8 +397,13 @@ def download_statement_execution_result(statement_execution_id):
             response = redirect(download_url)
         else:
             # We read the raw file and download it for the user
-            reader.start()
-            raw = reader.read_raw()
+            try:
+                # Stores with binary objects (e.g. compressed with zstd)
+                # are streamed decompressed
+                raw = _iter_stream(reader.open_binary_stream())
+            except NotImplementedError:
+                reader.start()
+                raw = reader.read_raw()
             response = Response(raw)
             response.headers["Content-Type"] = "text/csv"
             response.headers[
@@ -388,12 +412,22 @@ def download_statement_execution_result(statement_execution_id):
         return response
 
 
+def _iter_stream(stream, chunk_size: int = 1048576):
+    with closing(stream):
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
 @register(
     "/statement_execution/<int:statement_execution_id>/result/",
     methods=["GET"],
     require_auth=True,
 )
-def get_statement_execution_result(statement_execution_id, limit=None):
+def get_statement_execution_result(statement_execution_id, limit=None, offset=0):
+    """Get the column row followed by the result rows [offset, offset + limit)"""
     # TODO: make this customizable
     limit = (
         QUERY_RESULT_LIMIT_CONFIG["default_query_result_size"]
@@ -404,6 +438,7 @@ def get_statement_execution_result(statement_execution_id, limit=None):
         limit <= QUERY_RESULT_LIMIT_CONFIG["query_result_size_options"][-1],
         message="Too many rows requested",
     )
+    api_assert(offset >= 0, message="Invalid offset")
 
     with DBSession() as session:
         try:
@@ -417,13 +452,55 @@ def get_statement_execution_result(statement_execution_id, limit=None):
                 statement_execution.query_execution_id, session=session
             )
 
-            with GenericReader(statement_execution.result_path) as reader:
-                result = reader.read_csv(number_of_lines=limit + 1)  # 1 row for column
-                return result
+            # The result does not change once the statement is done
+            use_preview_cache = (
+                offset == 0
+                and statement_execution.status == StatementExecutionStatus.DONE
+            )
+            if use_preview_cache:
+                result = get_result_preview(statement_execution_id, limit)
+                if result is not None:
+                    return result
+            elif (
+                offset == 0
+                and statement_execution.status == StatementExecutionStatus.UPLOADING
+            ):
+                # The first rows are available before the result is uploaded
+                result = get_uploading_result_preview(statement_execution_id)
+                if result is not None:
+                    return result[: limit + 1]
+
+            result = _read_statement_execution_result(
+                statement_execution, limit, offset
+            )
+            if use_preview_cache:
+                set_result_preview(statement_execution_id, limit, result)
+            return result
         except FileDoesNotExist as e:
             abort(RESOURCE_NOT_FOUND_STATUS_CODE, str(e))
 
 
+def _read_statement_execution_result(statement_execution, limit: int, offset: int):
+    if offset > 0:
+        # Skip the rows before offset with the row offset index
+        result = read_result_rows(
+            statement_execution.result_path, offset=offset, limit=limit
+        )
+        if result is not None:
+            return result
+
+    # Without index the rows before offset are read as well, so they are
+    # bounded like the number of rows a request can ask for
+    api_assert(
+        offset + limit <= QUERY_RESULT_LIMIT_CONFIG["query_result_size_options"][-1],
+        message="Offset is too large for this result",
+    )
+    with GenericReader(statement_execution.result_path) as reader:
+        # 1 row for column
+        result = reader.read_csv(number_of_lines=offset + limit + 1)
+        return result[:1] + result[offset + 1 :]
+
+
 @register(
     "/statement_execution/<int:statement_execution_id>/log/",
     methods=["GET"],
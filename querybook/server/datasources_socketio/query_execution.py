@@ -5,6 +5,10 @@ from app.auth.permission import verify_query_engine_permission
 from app.db import DBSession
 from const.query_execution import QueryExecutionStatus, QUERY_EXECUTION_NAMESPACE
 from lib.logger import get_logger
+from lib.query_executor.poll_scheduler import (
+    on_query_execution_subscribe,
+    on_query_execution_unsubscribe,
+)
 from logic import query_execution as qe_logic
 from tasks import run_query as tasks
 from .helper import register_socket
@@ -22,6 +26,10 @@ def on_join_room(query_execution_id):
         verify_query_engine_permission(execution.engine_id, session=session)
 
         execution_dict = execution.to_dict(True) if execution is not None else None
+        if query_execution_id not in rooms(
+            request.sid, namespace=QUERY_EXECUTION_NAMESPACE
+        ):
+            on_query_execution_subscribe(query_execution_id)
         join_room(query_execution_id)
 
         if execution_dict and len(execution_dict.get("statement_executions", [])):
@@ -61,6 +69,8 @@ def on_join_room(query_execution_id):
 
 @register_socket("unsubscribe", namespace=QUERY_EXECUTION_NAMESPACE)
 def on_leave_room(query_execution_id):
+    if query_execution_id in rooms(request.sid, namespace=QUERY_EXECUTION_NAMESPACE):
+        on_query_execution_unsubscribe(query_execution_id)
     leave_room(query_execution_id)
 
 
@@ -69,3 +79,6 @@ def disconnect():
     query_execution_ids = rooms(request.sid, namespace=QUERY_EXECUTION_NAMESPACE)
     for query_execution_id in query_execution_ids:
         leave_room(query_execution_id)
+        # Every client is also in the room of its own sid
+        if query_execution_id != request.sid:
+            on_query_execution_unsubscribe(query_execution_id)
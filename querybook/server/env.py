@@ -60,10 +60,21 @@ class QuerybookSettings(object):
 
     # Celery
     REDIS_URL = get_env_config("REDIS_URL", optional=False)
+    QUERY_EXECUTION_POLL_MODE = get_env_config("QUERY_EXECUTION_POLL_MODE")
+    QUERY_EXECUTION_MAX_CONCURRENT_POLLS = int(
+        get_env_config("QUERY_EXECUTION_MAX_CONCURRENT_POLLS")
+    )
+    QUERY_EXECUTION_EMIT_INTERVAL = float(
+        get_env_config("QUERY_EXECUTION_EMIT_INTERVAL")
+    )
 
     # Search
     ELASTICSEARCH_HOST = get_env_config("ELASTICSEARCH_HOST", optional=False)
     ELASTICSEARCH_CONNECTION_TYPE = get_env_config("ELASTICSEARCH_CONNECTION_TYPE")
+    ELASTICSEARCH_BULK_CHUNK_SIZE = int(get_env_config("ELASTICSEARCH_BULK_CHUNK_SIZE"))
+    ELASTICSEARCH_BULK_MAX_CHUNK_BYTES = int(
+        get_env_config("ELASTICSEARCH_BULK_MAX_CHUNK_BYTES")
+    )
 
     # Lineage
     DATA_LINEAGE_BACKEND = get_env_config("DATA_LINEAGE_BACKEND")
@@ -127,13 +138,22 @@ class QuerybookSettings(object):
     STORE_PATH_PREFIX = get_env_config("STORE_PATH_PREFIX")
     STORE_MIN_UPLOAD_CHUNK_SIZE = int(get_env_config("STORE_MIN_UPLOAD_CHUNK_SIZE"))
     STORE_MAX_UPLOAD_CHUNK_NUM = int(get_env_config("STORE_MAX_UPLOAD_CHUNK_NUM"))
+    STORE_MAX_CONCURRENT_UPLOAD_PARTS = int(
+        get_env_config("STORE_MAX_CONCURRENT_UPLOAD_PARTS")
+    )
+    STORE_MAX_PENDING_UPLOAD_SIZE = int(get_env_config("STORE_MAX_PENDING_UPLOAD_SIZE"))
     STORE_MAX_READ_SIZE = int(get_env_config("STORE_MAX_READ_SIZE"))
     STORE_READ_SIZE = int(get_env_config("STORE_READ_SIZE"))
+    STORE_COMPRESSION = get_env_config("STORE_COMPRESSION")
     S3_BUCKET_S3V4_ENABLED = get_env_config("S3_BUCKET_S3V4_ENABLED") == "true"
     AWS_REGION = get_env_config("AWS_REGION")
 
     DB_MAX_UPLOAD_SIZE = int(get_env_config("DB_MAX_UPLOAD_SIZE"))
 
+    RESULT_STORE_COLUMNAR_ENABLED = (
+        str(get_env_config("RESULT_STORE_COLUMNAR_ENABLED")).lower() == "true"
+    )
+
     GOOGLE_CREDS = get_env_config("GOOGLE_CREDS")
 
     # Logging
@@ -4,6 +4,7 @@ from typing import Dict
 from .base_checker import BaseEngineStatusChecker, EngineStatus
 from const.query_execution import QueryEngineStatus
 from lib.query_executor.base_executor import QueryExecutorBaseClass
+from lib.query_executor.client_pool import get_client_pool
 from lib.utils.utils import Timeout
 
 
@@ -24,8 +25,12 @@ def check_connection(
 ) -> EngineStatus:
     result: EngineStatus = {"status": QueryEngineStatus.GOOD.value, "messages": []}
     try:
-        with Timeout(20, "Connection took too long"):
-            cursor = executor._get_client(client_settings).cursor()
+        # A new client is created to actually check the connection,
+        # it is then pooled for the next queries
+        with Timeout(20, "Connection took too long"), get_client_pool().client(
+            executor, client_settings, fresh=True
+        ) as client:
+            cursor = client.cursor()
             utc_now_str = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
             result["messages"].append(
                 f"Connection check successed at {utc_now_str} UTC"
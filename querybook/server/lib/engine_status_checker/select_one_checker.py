@@ -5,6 +5,7 @@ from .base_checker import BaseEngineStatusChecker, EngineStatus
 from const.query_execution import QueryEngineStatus
 from lib.query_executor.base_executor import QueryExecutorBaseClass
 from lib.query_executor.base_client import CursorBaseClass
+from lib.query_executor.client_pool import get_client_pool
 from lib.utils.utils import Timeout, TimeoutError
 
 
@@ -29,8 +30,10 @@ def check_select_one(
 ) -> EngineStatus:
     result: EngineStatus = {"status": QueryEngineStatus.GOOD.value, "messages": []}
     try:
-        with Timeout(20, "Select 1 took too long"):
-            cursor: CursorBaseClass = executor._get_client(client_settings).cursor()
+        with Timeout(20, "Select 1 took too long"), get_client_pool().client(
+            executor, client_settings
+        ) as client:
+            cursor: CursorBaseClass = client.cursor()
             cursor.run("select 1")
             cursor.poll_until_finish()
             first_row = cursor.get_one_row()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Set, Tuple
 from lib.logger import get_logger
 import sqlparse
 
@@ -99,6 +99,151 @@ def get_table_statement_type(query: str) -> List[str]:
     return statement_types
 
 
+def get_statement_dependencies(statements: List[str], language=None) -> List[Set[int]]:
+    """Find which statements must run before each statement
+
+    A statement depends on a previous statement if one of them writes a table
+    that the other one reads or writes. Statements that are not about tables
+    (SET, USE, ...) or whose tables cannot be found depend on all previous
+    statements and all following statements depend on them.
+
+    Arguments:
+        statements {List[str]} -- The statements of the query, in order
+
+    Returns:
+        List[Set[int]] -- For each statement, the indexes of the previous
+                          statements it depends on
+    """
+    default_schema = _get_default_schema(language)
+
+    table_access_per_statement = []
+    for statement in statements:
+        table_access, default_schema = _get_statement_table_access(
+            statement, default_schema
+        )
+        table_access_per_statement.append(table_access)
+    return _get_table_access_dependencies(table_access_per_statement)
+
+
+def get_query_dependencies(
+    queries: List[str],
+    languages: Optional[List[Optional[str]]] = None,
+    metastore_ids: Optional[List[Optional[int]]] = None,
+) -> List[Set[int]]:
+    """Same as get_statement_dependencies, but for queries that run in their
+    own session (e.g. DataDoc cells), so SET and USE statements only apply to
+    the query they are in. A query depends on all previous queries, and all
+    following queries depend on it, if any of its statements is unknown.
+
+    Arguments:
+        queries {List[str]} -- The queries, in order
+
+    Keyword Arguments:
+        languages {List[str]} -- The language of each query, used to find
+            the default schema (default: {None})
+        metastore_ids {List[int]} -- The metastore of the engine of each
+            query, only queries of the same metastore depend on each other.
+            A query without metastore may depend on any query (default: {None})
+
+    Returns:
+        List[Set[int]] -- For each query, the indexes of the previous
+                          queries it depends on
+    """
+    languages = languages or [None] * len(queries)
+    return _get_table_access_dependencies(
+        [
+            _get_query_table_access(query, language)
+            for query, language in zip(queries, languages)
+        ],
+        metastore_ids,
+    )
+
+
+def _get_default_schema(language=None) -> str:
+    return "main" if language == "sqlite" else "default"
+
+
+def _get_table_access_dependencies(
+    table_access_per_statement: List[Optional[Tuple[Set[str], Set[str]]]],
+    metastore_ids: Optional[List[Optional[int]]] = None,
+) -> List[Set[int]]:
+    dependencies = []
+    for index, table_access in enumerate(table_access_per_statement):
+        statement_dependencies = set()
+        for previous_index in range(index):
+            if (
+                metastore_ids is not None
+                and metastore_ids[index] is not None
+                and metastore_ids[previous_index] is not None
+                and metastore_ids[index] != metastore_ids[previous_index]
+            ):
+                # The tables of different metastores are never the same
+                continue
+
+            previous_table_access = table_access_per_statement[previous_index]
+            if table_access is None or previous_table_access is None:
+                statement_dependencies.add(previous_index)
+                continue
+
+            write_tables, read_tables = table_access
+            previous_write_tables, previous_read_tables = previous_table_access
+            if (previous_write_tables & (write_tables | read_tables)) or (
+                write_tables & previous_read_tables
+            ):
+                statement_dependencies.add(previous_index)
+        dependencies.append(statement_dependencies)
+    return dependencies
+
+
+def _get_query_table_access(
+    query: str, language=None
+) -> Optional[Tuple[Set[str], Set[str]]]:
+    default_schema = _get_default_schema(language)
+    write_tables, read_tables = set(), set()
+    for statement in tokenize_by_statement(query):
+        if statement.token_first(skip_cm=True).normalized in ("SET", "USE"):
+            default_schema = get_statement_schema(statement, default_schema)
+            continue
+
+        table_access, default_schema = _get_statement_table_access(
+            str(statement), default_schema
+        )
+        if table_access is None:
+            return None
+        write_tables |= table_access[0]
+        read_tables |= table_access[1]
+    return write_tables, read_tables
+
+
+def _get_statement_table_access(
+    statement: str, default_schema: str
+) -> Tuple[Optional[Tuple[Set[str], Set[str]]], str]:
+    """Get the tables written and read by the statement
+
+    Returns:
+        ((write tables, read tables), default schema) where the tables are None
+        if the statement is not about tables or cannot be parsed
+    """
+    parsed_statements = tokenize_by_statement(statement)
+    if len(parsed_statements) != 1:
+        return None, default_schema
+
+    parsed_statement = parsed_statements[0]
+    new_default_schema = get_statement_schema(parsed_statement, default_schema)
+    statement_type = get_table_statement_type(statement)[0]
+    if statement_type is None or new_default_schema != default_schema:
+        return None, new_default_schema
+
+    table_list, from_list = get_table_list(
+        parsed_statement,
+        get_statement_placeholders(parsed_statement),
+        default_schema,
+    )
+    if statement_type != "SELECT" and len(table_list) == 0:
+        return None, default_schema
+    return (set(table_list), set(from_list)), default_schema
+
+
 def get_statement_placeholders(statement):
     """
     This function checks for table names that act as placeholders
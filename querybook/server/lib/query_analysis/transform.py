@@ -103,6 +103,30 @@ def transform_to_limited_query(
         return query
 
 
+def transform_to_limited_statement(
+    statement: str, limit: int = None, language: str = None
+) -> str:
+    """Apply a limit to a single select statement if it doesn't already have a limit.
+    The statement is returned as is if it is not an unlimited select statement,
+    so that only the statements that need a limit are rewritten.
+    """
+    if not limit:
+        return statement
+
+    try:
+        dialect = _get_sqlglot_dialect(language)
+        statements = [s for s in parse(statement, dialect=dialect) if s is not None]
+        if len(statements) != 1 or get_select_statement_limit(statements[0]) != -1:
+            return statement
+
+        return statements[0].limit(limit).sql(dialect=dialect, pretty=True)
+    except Exception as e:
+        # The statement is run as is if it cannot be transformed, e.g. if
+        # sqlglot does not support some syntax of the engine
+        LOG.debug(f"Failed to limit statement: {e}")
+        return statement
+
+
 def _get_sampled_statement(
     statement_ast: exp.Expression,
     sampling_tables: dict[str, dict[str, str]],
@@ -1,6 +1,6 @@
 from time import sleep
 from abc import ABCMeta, abstractmethod
-from typing import List, Any
+from typing import List, Any, Optional
 
 
 class ClientBaseClass(metaclass=ABCMeta):
@@ -12,6 +12,20 @@ class ClientBaseClass(metaclass=ABCMeta):
 
         pass
 
+    # The follow functions are optional overrides, used by the client pool
+    def is_healthy(self) -> bool:
+        """Checked before an idle client is reused, it should be cheap
+           (e.g. not run a query on the engine)
+
+        Returns:
+            bool -- False if the client should be closed instead of reused
+        """
+        return True
+
+    def close(self):
+        """Release the connection to the engine"""
+        pass
+
 
 class CursorBaseClass(metaclass=ABCMeta):
     @abstractmethod
@@ -94,14 +108,34 @@ class CursorBaseClass(metaclass=ABCMeta):
         return ""
 
     # These functions are intended to use as is
-    def get_rows_iter(self, chunk_size: int = 10000):
-        while True:
-            rows = self.get_n_rows(chunk_size)
+    def get_rows_chunk_iter(
+        self, chunk_size: int = 10000, max_rows: Optional[int] = None
+    ):
+        """Fetch the rows chunk by chunk
+
+        Arguments:
+            chunk_size {int} -- max number of rows fetched at once
+            max_rows {Optional[int]} -- stop after this many rows, the last
+                fetch is sized to the remaining rows so that the engine does
+                not send rows that are not used
+        """
+        remaining_rows = max_rows
+        while remaining_rows is None or remaining_rows > 0:
+            rows = self.get_n_rows(
+                chunk_size
+                if remaining_rows is None
+                else min(chunk_size, remaining_rows)
+            )
 
             if rows is None or len(rows) == 0:
                 break
-            for row in rows:
-                yield row
+            if remaining_rows is not None:
+                remaining_rows -= len(rows)
+            yield rows
+
+    def get_rows_iter(self, chunk_size: int = 10000, max_rows: Optional[int] = None):
+        for rows in self.get_rows_chunk_iter(chunk_size, max_rows=max_rows):
+            yield from rows
 
     def get_rows(self) -> List:
         return [row for row in self.get_rows_iter()]
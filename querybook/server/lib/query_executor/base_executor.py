@@ -1,10 +1,12 @@
 from abc import ABCMeta, abstractclassmethod
 import datetime
+from itertools import chain
 import time
-from typing import Union, List
+from typing import List, Optional, Union
 
 from app.db import DBSession
 from app.flask_app import socketio
+from env import QuerybookSettings
 
 
 from const.db import description_length
@@ -16,19 +18,59 @@ from const.query_execution import (
 
 from lib.form import AllFormField
 from lib.logger import get_logger
+from lib.query_analysis.lineage import get_statement_dependencies
+from lib.query_analysis.statements import get_sanitized_statement
+from lib.query_analysis.transform import transform_to_limited_statement
 from lib.query_executor.base_client import ClientBaseClass
+from lib.query_executor.client_pool import get_client_pool, has_session_statement
+from lib.query_executor.poll_scheduler import (
+    AdaptivePollScheduler,
+    BasePollScheduler,
+    QueryExecutionSubscriberChecker,
+)
+from lib.query_executor.result_upload import ResultUploadPipeline
 from lib.query_executor.utils import (
     merge_str,
     parse_exception,
     format_if_internal_error_with_stack_trace,
 )
+from lib.utils.csv import serialize_cell
 from lib.result_store import GenericUploader
-from lib.utils.csv import row_to_csv
+from lib.result_store.result_preview_cache import (
+    delete_uploading_result_preview,
+    set_uploading_result_preview,
+)
+from lib.stats_logger import (
+    QUERY_EXECUTION_POLL_INTERVAL,
+    QUERY_EXECUTION_POLL_LATENCY,
+    QUERY_EXECUTION_POLLS,
+    stats_logger,
+)
 from logic import query_execution as qe_logic
 
 
 LOG = get_logger(__file__)
 
+# The stream logs are persisted in DB in bulk, once this many
+# chunks (of description_length) are buffered
+STREAM_LOG_FLUSH_CHUNKS = 20
+# or this many seconds after the last flush
+STREAM_LOG_FLUSH_INTERVAL = 5
+
+# Max number of statements of a query running at the same time,
+# if the engine runs independent statements in parallel
+PARALLEL_STATEMENTS_MAX_CONCURRENCY = 4
+
+# Logging variables of the current statement, see switch_statement
+STATEMENT_LOGGING_VARIABLES = (
+    "_has_log",
+    "_log_cache",
+    "_pending_log_chunks",
+    "_last_log_flush_time",
+    "_meta_info",
+    "_percent_complete",
+)
+
 
 class QueryExecutorLogger(object):
     """This class is used to export data from query executor to redis/mysql/socketio
@@ -40,13 +82,26 @@ class QueryExecutorLogger(object):
         [type] -- [description]
     """
 
-    def __init__(self, query_execution_id, celery_task, query, statement_ranges):
+    def __init__(
+        self,
+        query_execution_id,
+        celery_task,
+        query,
+        statement_ranges,
+        max_result_rows: Optional[int] = None,
+    ):
         self._query_execution_id = query_execution_id
+        # No more rows of a statement are fetched, see _upload_query_result
+        self._max_result_rows = max_result_rows
 
         self._celery_task = celery_task
         self._task_id = celery_task.request.id
 
         self.statement_execution_ids = []
+        # Statement receiving the updates, the last started one by default
+        self._current_statement_execution_id = None
+        # statement_execution_id -> logging variables of the other running statements
+        self._statement_logging_variables = {}
 
         self._query = query
         self._statement_ranges = statement_ranges
@@ -54,10 +109,20 @@ class QueryExecutorLogger(object):
         # logging variable
         self._has_log = False
         self._log_cache = ""  # [statement_logs]
+        self._pending_log_chunks = []  # [statement_logs] to persist in DB
+        self._last_log_flush_time = time.time()
         self._meta_info = None  # statement_urls
         self._percent_complete = 0  # percent_complete
         self._statement_progress = {}
 
+        # statement_update emits and progress are coalesced, see _emit_statement_updates
+        self._pending_statement_updates = {}  # statement_execution_id -> update
+        self._has_pending_progress = False
+        self._last_emit_time = None
+        self._subscriber_checker = QueryExecutionSubscriberChecker(query_execution_id)
+        # Statements with an uploading result preview, see _on_result_preview
+        self._previewed_statement_ids = set()
+
         # Connect to mysql db
         with DBSession() as session:
             query_execution = qe_logic.update_query_execution(
@@ -111,12 +176,44 @@ class QueryExecutorLogger(object):
     def reset_logging_variables(self):
         self._has_log = False
         self._log_cache = ""  # [statement_logs]
+        self._pending_log_chunks = []  # [statement_logs] to persist in DB
+        self._last_log_flush_time = time.time()
         self._meta_info = ""  # statement_urls
         self._percent_complete = None  # percent_complete
 
-    def on_statement_start(self, statement_index):
-        self.reset_logging_variables()
+    @property
+    def current_statement_execution_id(self):
+        if self._current_statement_execution_id is not None:
+            return self._current_statement_execution_id
+        if len(self.statement_execution_ids) > 0:
+            return self.statement_execution_ids[-1]
+        return None
+
+    def switch_statement(self, statement_execution_id: int):
+        """Send the statement updates to another statement, used when statements
+        run in parallel. The logging variables of the current statement are kept
+        until it is switched back to.
+        """
+        current_statement_execution_id = self.current_statement_execution_id
+        if current_statement_execution_id == statement_execution_id:
+            return
 
+        if current_statement_execution_id is not None:
+            self._statement_logging_variables[current_statement_execution_id] = {
+                name: getattr(self, name) for name in STATEMENT_LOGGING_VARIABLES
+            }
+
+        logging_variables = self._statement_logging_variables.pop(
+            statement_execution_id, None
+        )
+        if logging_variables is None:
+            self.reset_logging_variables()
+        else:
+            for name, value in logging_variables.items():
+                setattr(self, name, value)
+        self._current_statement_execution_id = statement_execution_id
+
+    def on_statement_start(self, statement_index):
         statement_range = self._statement_ranges[statement_index]
         statement_start, statement_end = statement_range
 
@@ -127,6 +224,7 @@ class QueryExecutorLogger(object):
             StatementExecutionStatus.RUNNING,
         ).to_dict()
         statement_execution_id = statement_execution["id"]
+        self.switch_statement(statement_execution_id)
         self.statement_execution_ids.append(statement_execution_id)
 
         socketio.emit(
@@ -142,7 +240,7 @@ class QueryExecutorLogger(object):
         meta_info: str = None,
         percent_complete=None,
     ):
-        statement_execution_id = self.statement_execution_ids[-1]
+        statement_execution_id = self.current_statement_execution_id
 
         updated_meta_info = False
         if meta_info is not None and self._meta_info != meta_info:
@@ -155,6 +253,8 @@ class QueryExecutorLogger(object):
         has_log = len(log)
         if has_log:
             self._stream_log(statement_execution_id, log)
+        else:
+            self._flush_stream_logs_if_needed(statement_execution_id)
 
         percent_complete_change = (
             percent_complete is not None and self._percent_complete != percent_complete
@@ -163,27 +263,56 @@ class QueryExecutorLogger(object):
             self._percent_complete = percent_complete
 
         if updated_meta_info or has_log or percent_complete_change:
-            statement_update_dict = {
-                "query_execution_id": self._query_execution_id,
-                "id": statement_execution_id,
-            }
+            statement_update_dict = self._pending_statement_updates.setdefault(
+                statement_execution_id,
+                {
+                    "query_execution_id": self._query_execution_id,
+                    "id": statement_execution_id,
+                },
+            )
 
             if updated_meta_info:
                 statement_update_dict["meta_info"] = meta_info
 
             if has_log:
-                statement_update_dict["log"] = [log]
+                statement_update_dict.setdefault("log", []).append(log)
 
             if percent_complete_change:
                 statement_update_dict["percent_complete"] = percent_complete
-                self._statement_progress = {
-                    statement_execution_id: {
-                        "percent_complete": percent_complete,
-                    }
+                self._statement_progress[statement_execution_id] = {
+                    "percent_complete": percent_complete,
                 }
+                self._has_pending_progress = True
 
-                self.update_progress()
+        self._emit_statement_updates_if_needed()
 
+    def _emit_statement_updates_if_needed(self):
+        if (
+            self._last_emit_time is None
+            or time.time() - self._last_emit_time
+            >= QuerybookSettings.QUERY_EXECUTION_EMIT_INTERVAL
+        ):
+            self._emit_statement_updates()
+
+    def _emit_statement_updates(self):
+        """
+        Emits the statement updates (logs, progress, meta info) coalesced since
+        the last emit, at most every QUERY_EXECUTION_EMIT_INTERVAL seconds.
+        The updates are dropped if no one is subscribed to the query execution,
+        the logs are still persisted and can be fetched.
+        """
+        self._last_emit_time = time.time()
+
+        if self._has_pending_progress:
+            self._has_pending_progress = False
+            self.update_progress()
+
+        statement_updates = self._pending_statement_updates
+        self._pending_statement_updates = {}
+        if len(statement_updates) == 0 or not self._subscriber_checker.has_subscriber():
+            return
+
+        for statement_update_dict in statement_updates.values():
             socketio.emit(
                 "statement_update",
                 statement_update_dict,
@@ -192,7 +321,8 @@ class QueryExecutorLogger(object):
             )
 
     def on_statement_end(self, cursor):
-        statement_execution_id = self.statement_execution_ids[-1]
+        self._emit_statement_updates()
+        statement_execution_id = self.current_statement_execution_id
         qe_logic.update_statement_execution(
             statement_execution_id,
             status=StatementExecutionStatus.UPLOADING,
@@ -223,8 +353,11 @@ class QueryExecutorLogger(object):
             result_path=result_path,
             log_path=upload_path if has_log else None,
         ).to_dict()
+        if statement_execution_id in self._previewed_statement_ids:
+            self._previewed_statement_ids.discard(statement_execution_id)
+            delete_uploading_result_preview(statement_execution_id)
 
-        self._statement_progress = {}
+        self._statement_progress.pop(statement_execution_id, None)
         self.update_progress()
         socketio.emit(
             "statement_end",
@@ -233,10 +366,32 @@ class QueryExecutorLogger(object):
             room=self._query_execution_id,
         )
 
+    def on_statement_cancel(self):
+        """Cancel the current statement without ending the query execution"""
+        self._emit_statement_updates()
+        statement_execution_id = self.current_statement_execution_id
+        upload_path, has_log = self._upload_log(statement_execution_id)
+        statement_execution = qe_logic.update_statement_execution(
+            statement_execution_id,
+            status=StatementExecutionStatus.CANCEL,
+            completed_at=datetime.datetime.utcnow(),
+            has_log=self._has_log,
+            log_path=upload_path if has_log else None,
+        ).to_dict()
+
+        self._statement_progress.pop(statement_execution_id, None)
+        socketio.emit(
+            "statement_end",
+            statement_execution,
+            namespace=QUERY_EXECUTION_NAMESPACE,
+            room=self._query_execution_id,
+        )
+
     def on_cancel(self):
+        self._emit_statement_updates()
         utcnow = datetime.datetime.utcnow()
         if len(self.statement_execution_ids) > 0:
-            statement_execution_id = self.statement_execution_ids[-1]
+            statement_execution_id = self.current_statement_execution_id
             upload_path, has_log = self._upload_log(statement_execution_id)
             qe_logic.update_statement_execution(
                 statement_execution_id,
@@ -262,6 +417,7 @@ class QueryExecutorLogger(object):
         )
 
     def on_exception(self, error_type: int, error_str: str, error_extracted: str):
+        self._emit_statement_updates()
         utcnow = datetime.datetime.utcnow()
         error_extracted = (
             error_extracted[:5000]
@@ -271,7 +427,7 @@ class QueryExecutorLogger(object):
 
         with DBSession() as session:
             if len(self.statement_execution_ids) > 0:
-                statement_execution_id = self.statement_execution_ids[-1]
+                statement_execution_id = self.current_statement_execution_id
                 upload_path, has_log = self._upload_log(statement_execution_id)
 
                 qe_logic.update_statement_execution(
@@ -310,7 +466,11 @@ class QueryExecutorLogger(object):
             "total": len(self._statement_ranges),
         }
 
-        self._celery_task.update_state(state="PROGRESS", meta=progress)
+        # The task id is passed since the executor may be polled outside
+        # of the task (see executor_poller)
+        self._celery_task.update_state(
+            task_id=self._task_id, state="PROGRESS", meta=progress
+        )
 
     def _upload_query_result(self, cursor, statement_execution_id: int):
         # While uploading, the first few rows are fetched and stored as well
@@ -323,60 +483,93 @@ class QueryExecutorLogger(object):
             return None, rows_uploaded
 
         key = "querybook_temp/%s/result.csv" % str(statement_execution_id)
-        uploader = GenericUploader(key)
-        uploader.start()
-
-        uploader.write(row_to_csv(columns))
-        rows_uploaded += 1  # 1 row for the column
-
-        for row in cursor.get_rows_iter():
-            did_upload = uploader.write(row_to_csv(row))
-            if not did_upload:
-                break
-            rows_uploaded += 1
-        uploader.end()
+        pipeline = ResultUploadPipeline(
+            key,
+            columns,
+            on_preview=lambda rows: self._on_result_preview(
+                statement_execution_id, columns, rows
+            ),
+        )
+        result = pipeline.run(
+            cursor.get_rows_chunk_iter(max_rows=self._max_result_rows)
+        )
 
-        return uploader.upload_url, rows_uploaded
+        if pipeline.stopped_fetching:
+            # The upload limit is reached, stop the engine from producing the
+            # remaining rows instead of leaving the cursor open. A statement
+            # capped by max_result_rows has its LIMIT pushed down and is
+            # finished, it must not be cancelled since the cursor is reused.
+            try:
+                cursor.cancel()
+            except Exception as e:
+                LOG.info(f"Failed to cancel truncated statement: {e}")
+        return result
+
+    def _on_result_preview(self, statement_execution_id: int, columns, rows):
+        """Keep and emit the first rows of a statement that is uploading,
+        so that they can be shown before the whole result is uploaded"""
+        try:
+            result = [list(map(str, columns))] + [
+                [serialize_cell(cell) for cell in row] for row in rows
+            ]
+            if not set_uploading_result_preview(statement_execution_id, result):
+                return
+            self._previewed_statement_ids.add(statement_execution_id)
+            if self._subscriber_checker.has_subscriber():
+                socketio.emit(
+                    "statement_result_preview",
+                    {
+                        "query_execution_id": self._query_execution_id,
+                        "id": statement_execution_id,
+                        "data": result,
+                    },
+                    namespace=QUERY_EXECUTION_NAMESPACE,
+                    room=self._query_execution_id,
+                )
+        except Exception as e:
+            # The preview is optional, never fail the upload because of it
+            LOG.warning(f"Failed to preview statement {statement_execution_id}: {e}")
 
     def _upload_log(self, statement_execution_id: int):
-        db_read_limit = 50
-        db_read_offset = 0
-
         try:
-            self._stream_log(statement_execution_id, "", clear_cache=True)
-
-            logs = []
-            has_log = False
+            # The buffered logs are uploaded directly instead of
+            # being persisted in DB first
+            buffered_logs = self._pending_log_chunks
+            if len(self._log_cache):
+                buffered_logs = buffered_logs + [self._log_cache]
+            self._pending_log_chunks = []
+            self._log_cache = ""
+
+            has_log = self._has_log or len(buffered_logs) > 0
             log_path = None
 
-            with DBSession() as session:
-                while True:
-                    log_rows = qe_logic.get_statement_execution_stream_logs(
-                        statement_execution_id,
-                        limit=db_read_limit,
-                        offset=db_read_offset,
-                        session=session,
-                    )
-
-                    logs += map(lambda log: log.log, log_rows)
-
-                    if len(log_rows) < db_read_limit:
-                        break
-                    db_read_offset += db_read_limit
-
-            if len(logs):
-                has_log = True
-                uri = f"querybook_temp/{statement_execution_id}/log.txt"
-                with GenericUploader(uri) as uploader:
-                    log_path = uploader.upload_url
-
-                    for log in logs:
-                        did_upload = uploader.write(log)
-                        if not did_upload:
-                            break
-                qe_logic.delete_statement_execution_stream_log(
-                    statement_execution_id, session=session
-                )
+            if has_log:
+                with DBSession() as session:
+                    logs = buffered_logs
+                    if self._has_log:
+                        logs = chain(
+                            qe_logic.iterate_statement_execution_stream_logs(
+                                statement_execution_id, session=session
+                            ),
+                            buffered_logs,
+                        )
+
+                    uri = f"querybook_temp/{statement_execution_id}/log.txt"
+                    with GenericUploader(uri) as uploader:
+                        log_path = uploader.upload_url
+
+                        did_upload = True
+                        for log in logs:
+                            # Keep consuming the db cursor even if the upload
+                            # stopped so that the session can be reused
+                            if did_upload:
+                                did_upload = uploader.write(log)
+
+                    if self._has_log:
+                        qe_logic.delete_statement_execution_stream_log(
+                            statement_execution_id, session=session
+                        )
+                self._has_log = True
             return log_path, has_log
         except Exception as e:
             import traceback
@@ -386,48 +579,65 @@ class QueryExecutorLogger(object):
                 + "Failed to upload logs. Silently suppressing error"
             )
 
-    def _stream_log(
-        self, statement_execution_id: int, log: str, clear_cache: bool = False
-    ):
+    def _stream_log(self, statement_execution_id: int, log: str):
         """
-        Persists the log in DB that's over description_length
-        for them to be read from frontend while query is running
+        Buffers the log that's over description_length in chunks,
+        the chunks are persisted in DB by _flush_stream_logs for
+        them to be read from frontend while query is running
 
         Arguments:
             statement_execution_id {int}
             log {str} -- Incoming new log
-
-        Keyword Arguments:
-            clear_cache {bool} -- [If true, will push all _log_cache into mysql DB] (default: {False})
         """
         merged_log = merge_str(self._log_cache, log)
-        created_log = False
         chunk_size = description_length
-        cache_length = 0 if clear_cache else chunk_size
 
-        with DBSession() as session:
-            while len(merged_log) > cache_length:
-                size_of_chunk = min(len(merged_log), chunk_size)
+        while len(merged_log) > chunk_size:
+            self._pending_log_chunks.append(merged_log[:chunk_size])
+            merged_log = merged_log[chunk_size:]
+        self._log_cache = merged_log
 
-                log_chunk = merged_log[:size_of_chunk]
-                qe_logic.create_statement_execution_stream_log(
-                    statement_execution_id, log_chunk, commit=False, session=session
-                )
-                created_log = True
-                merged_log = merged_log[size_of_chunk:]
+        self._flush_stream_logs_if_needed(statement_execution_id)
 
-            if not self._has_log and created_log:
+    def _flush_stream_logs_if_needed(self, statement_execution_id: int):
+        if len(self._pending_log_chunks) == 0:
+            return
+
+        if (
+            len(self._pending_log_chunks) >= STREAM_LOG_FLUSH_CHUNKS
+            or time.time() - self._last_log_flush_time >= STREAM_LOG_FLUSH_INTERVAL
+        ):
+            self._flush_stream_logs(statement_execution_id)
+
+    def _flush_stream_logs(self, statement_execution_id: int):
+        """
+        Persists the buffered log chunks in DB with a single
+        bulk insert and commit
+        """
+        self._last_log_flush_time = time.time()
+        if len(self._pending_log_chunks) == 0:
+            return
+
+        with DBSession() as session:
+            qe_logic.create_statement_execution_stream_logs(
+                statement_execution_id,
+                self._pending_log_chunks,
+                commit=False,
+                session=session,
+            )
+
+            if not self._has_log:
                 qe_logic.update_statement_execution(
                     statement_execution_id,
                     has_log=True,
                     log_path="stream://",
+                    commit=False,
                     session=session,
                 )
-                self._has_log = True
 
             session.commit()
-
-        self._log_cache = merged_log
+        self._has_log = True
+        self._pending_log_chunks = []
 
 
 class QueryExecutorBaseClass(metaclass=ABCMeta):
@@ -474,6 +684,10 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
     def LOGGER_CLASS(cls) -> QueryExecutorLogger:
         return QueryExecutorLogger
 
+    @classmethod
+    def POLL_SCHEDULER_CLASS(cls) -> BasePollScheduler:
+        return AdaptivePollScheduler
+
     @classmethod
     def match(cls, language: str, name: str) -> bool:
         if name != cls.EXECUTOR_NAME():
@@ -502,6 +716,9 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
         statement_ranges,
         client_setting,
         execution_type,
+        parallel_statements: bool = False,
+        max_result_rows: Optional[int] = None,
+        language: Optional[str] = None,
     ):
         self._query = query
         self._query_execution_id = query_execution_id
@@ -513,6 +730,27 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             self._statement_ranges = statement_ranges
         self._current_query_index = -1
 
+        # Run independent statements at the same time, see _run_ready_statements.
+        # Statements run on different cursors, so a query that changes the
+        # session (USE, SET, ...) runs its statements one by one on one cursor
+        self._parallel_statements = (
+            parallel_statements
+            and len(self._statement_ranges) > 1
+            and not self._has_session_statement()
+        )
+        self._statement_dependencies = None
+        self._pending_statement_indexes = []
+        self._completed_statement_indexes = set()
+        # statement index -> (cursor, statement_execution_id)
+        self._running_statements = {}
+        self._idle_cursors = []
+        self._current_statement_index = None
+
+        # Unlimited select statements are run with this limit
+        # and no more rows are fetched, see _execute
+        self._max_result_rows = max_result_rows
+        self._language = language
+
         self.status = QueryExecutionStatus.DELIVERED
 
         # Initialize logger
@@ -521,8 +759,11 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             celery_task,
             self._query,
             self._statement_ranges,
+            max_result_rows=max_result_rows,
         )
 
+        self._poll_scheduler = self.POLL_SCHEDULER_CLASS()(query_execution_id)
+
         # Initialize cursor once poll loop is setup
         self._client_setting = client_setting
         self._client = None
@@ -556,7 +797,16 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
         self._cursor = self._get_cursor()
 
         self._start_time = time.time()
-        self._run_next_statement()
+        if self._parallel_statements:
+            self._statement_dependencies = get_statement_dependencies(
+                [self._query[start:end] for start, end in self._statement_ranges],
+                language=self._language,
+            )
+            self._pending_statement_indexes = list(range(len(self._statement_ranges)))
+            self._idle_cursors = [self._cursor]
+            self._run_ready_statements()
+        else:
+            self._run_next_statement()
 
     def poll(self):
         try:
@@ -565,6 +815,10 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             elif self.status != QueryExecutionStatus.RUNNING:
                 return
 
+            if self._parallel_statements:
+                self._poll_running_statements()
+                return
+
             current_statement_completed = self._is_statement_completed()
             # Completed
             if current_statement_completed:
@@ -580,12 +834,18 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             LOG.error(error_message)
             self._handle_exception(e, stack_trace)
 
+    def get_sleep_time(self) -> float:
+        """Seconds to wait before the next poll"""
+        sleep_time = self._poll_scheduler.get_sleep_time()
+        stats_logger.timing(
+            QUERY_EXECUTION_POLL_INTERVAL,
+            sleep_time * 1000.0,
+            tags={"engine": self.EXECUTOR_NAME()},
+        )
+        return sleep_time
+
     def sleep(self):
-        # For the first 15 mins, we check every second
-        # Afterwards, check every 10 seconds
-        time_passed = time.time() - self._start_time  # unit in seconds
-        sleep_time = 1 if time_passed < 900 else 10
-        time.sleep(sleep_time)
+        time.sleep(self.get_sleep_time())
 
     @property
     def meta_info(self):
@@ -596,10 +856,15 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
 
     def cancel(self):
         self.status = QueryExecutionStatus.CANCEL
+        if self._parallel_statements:
+            self._cancel_parallel_statements()
         self._logger.on_cancel()
 
-        if self._current_query_index >= 0:
-            self._cursor.cancel()
+        try:
+            if self._current_query_index >= 0:
+                self._cursor.cancel()
+        finally:
+            self._release_client()
 
     def _run_next_statement(self):
         if self._current_query_index < len(self._statement_ranges):
@@ -614,8 +879,83 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
         else:
             self._on_query_completion()
 
+    def _poll_running_statements(self):
+        for index in list(self._running_statements.keys()):
+            self._switch_statement(index)
+            if self._is_statement_completed():
+                self._on_statement_completion()
+                self._idle_cursors.append(self._running_statements.pop(index)[0])
+                self._completed_statement_indexes.add(index)
+        self._run_ready_statements()
+
+    def _run_ready_statements(self):
+        """Start the statements whose dependencies (see get_statement_dependencies)
+        are completed, on separate cursors of the client
+        """
+        for index in list(self._pending_statement_indexes):
+            if len(self._running_statements) >= PARALLEL_STATEMENTS_MAX_CONCURRENCY:
+                break
+            if not self._statement_dependencies[index].issubset(
+                self._completed_statement_indexes
+            ):
+                continue
+
+            self._pending_statement_indexes.remove(index)
+            self._logger.on_statement_start(index)
+
+            cursor = (
+                self._idle_cursors.pop()
+                if len(self._idle_cursors)
+                else self._get_cursor()
+            )
+            self._running_statements[index] = (
+                cursor,
+                self._logger.current_statement_execution_id,
+            )
+            self._switch_statement(index)
+
+            statement_start, statement_end = self._statement_ranges[index]
+            self._execute(self._query[statement_start:statement_end])
+            self._current_query_index += 1
+
+        if len(self._running_statements) == 0:
+            self._on_query_completion()
+
+    def _switch_statement(self, index: int):
+        cursor, statement_execution_id = self._running_statements[index]
+        self._cursor = cursor
+        self._current_statement_index = index
+        self._logger.switch_statement(statement_execution_id)
+
+    def _cancel_parallel_statements(self):
+        """Cancel all the running statements but the current one, which is
+        cancelled or marked as failed like in the sequential mode
+        """
+        if len(self._running_statements) == 0:
+            return
+
+        current_index = (
+            self._current_statement_index
+            if self._current_statement_index in self._running_statements
+            else next(iter(self._running_statements))
+        )
+        for index in list(self._running_statements.keys()):
+            if index == current_index:
+                continue
+
+            self._switch_statement(index)
+            try:
+                self._cursor.cancel()
+            except Exception as e:
+                LOG.info(f"Failed to cancel statement: {e}")
+            self._logger.on_statement_cancel()
+            del self._running_statements[index]
+        self._switch_statement(current_index)
+
     def _handle_exception(self, exc: Exception, stack_trace: str):
         try:
+            if self._parallel_statements:
+                self._cancel_parallel_statements()
             # Try our best to fetch logs again
             if self._cursor:
                 self._logger.on_statement_update(
@@ -640,6 +980,7 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
             # Since in case of failure, it is expected that the caller of executor
             # to update the db status
             self.status = QueryExecutionStatus.ERROR
+            self._release_client()
 
     def _on_statement_completion(self):
         self._logger.on_statement_end(self._cursor)
@@ -647,16 +988,33 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
     def _on_query_completion(self):
         self._logger.on_query_end()
         self.status = QueryExecutionStatus.DONE
+        self._release_client()
 
     def _execute(self, statement):
+        if self._max_result_rows is not None:
+            statement = transform_to_limited_statement(
+                statement, limit=self._max_result_rows, language=self._language
+            )
         self._cursor.run(statement)
 
     def _is_statement_completed(self):
+        start_time = time.time()
         completed = self._cursor.poll()
+        log = self._get_logs()
+        percent_complete = self._cursor.percent_complete
+
+        # Engine side of the poll, the logger updates are not included
+        duration_ms = (time.time() - start_time) * 1000.0
+        tags = {"engine": self.EXECUTOR_NAME()}
+        stats_logger.incr(QUERY_EXECUTION_POLLS, tags=tags)
+        stats_logger.timing(QUERY_EXECUTION_POLL_LATENCY, duration_ms, tags=tags)
 
+        self._poll_scheduler.on_poll(
+            completed, percent_complete=percent_complete, has_log=bool(log)
+        )
         self._logger.on_statement_update(
-            log=self._get_logs(),
-            percent_complete=self._cursor.percent_complete,
+            log=log,
+            percent_complete=percent_complete,
             meta_info=self.meta_info,
         )
 
@@ -664,10 +1022,30 @@ class QueryExecutorBaseClass(metaclass=ABCMeta):
 
     def _get_cursor(self):
         if self._client is None:
-            self._client = self._get_client(self._client_setting)
+            self._client = get_client_pool().acquire(type(self), self._client_setting)
 
         return self._client.cursor()
 
+    def _release_client(self):
+        """Give the client back to the pool once the query is done,
+        it is closed if the query failed or changed the session
+        """
+        if self._client is None:
+            return
+
+        reusable = (
+            self.status == QueryExecutionStatus.DONE
+            and not self._has_session_statement()
+        )
+        get_client_pool().release(self._client, reusable=reusable)
+        self._client = None
+
+    def _has_session_statement(self) -> bool:
+        return has_session_statement(
+            get_sanitized_statement(self._query[start:end])
+            for start, end in self._statement_ranges
+        )
+
     def _get_logs(self):
         return self._cursor.get_logs()
 
@@ -0,0 +1,202 @@
+"""Process wide pool of query engine clients
+
+Creating a client usually means opening a connection to the engine (TLS
+handshake, Thrift/HS2 session, authentication), so clients are kept once
+a query is done and reused by the next query of the same engine and user.
+
+Clients are keyed by the executor and its client settings, which contain
+the engine connection params and the proxy user, so a client is never
+shared by two users and editing an engine does not reuse stale clients.
+
+A client is only returned to the pool if the query succeeded and did not
+change the session (e.g. SET, USE), otherwise it is closed.
+"""
+
+from contextlib import contextmanager
+import json
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from lib.logger import get_logger
+from lib.query_executor.base_client import ClientBaseClass
+
+LOG = get_logger(__file__)
+
+# Max number of idle clients kept by the pool, and per engine/user
+CLIENT_POOL_MAX_IDLE_CLIENTS = 20
+CLIENT_POOL_MAX_IDLE_CLIENTS_PER_KEY = 4
+# Idle clients are closed after this many seconds
+CLIENT_POOL_IDLE_TIMEOUT = 300
+
+_session_statement_pattern = re.compile(
+    r"^\s*("
+    r"set|reset|unset|use|add|declare|begin|start\s+transaction|alter\s+session"
+    r"|create\s+(or\s+replace\s+)?temp(orary)?"
+    r")\b",
+    re.IGNORECASE,
+)
+
+
+def has_session_statement(statements: Iterable[str]) -> bool:
+    """Whether any of the (sanitized) statements may change the state of
+    the engine session, in which case the client should not be reused
+    """
+    return any(_session_statement_pattern.match(statement) for statement in statements)
+
+
+def _get_client_key(executor, client_setting: Dict) -> Tuple:
+    return (executor, json.dumps(client_setting, sort_keys=True, default=str))
+
+
+class QueryEngineClientPool(object):
+    def __init__(
+        self,
+        max_idle_clients: int = CLIENT_POOL_MAX_IDLE_CLIENTS,
+        max_idle_clients_per_key: int = CLIENT_POOL_MAX_IDLE_CLIENTS_PER_KEY,
+        idle_timeout: float = CLIENT_POOL_IDLE_TIMEOUT,
+    ):
+        self._max_idle_clients = max_idle_clients
+        self._max_idle_clients_per_key = max_idle_clients_per_key
+        self._idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        # key -> [(released at, client)], the last client is the most recent
+        self._idle_clients: Dict[Tuple, List[Tuple[float, ClientBaseClass]]] = {}
+        # id(client) -> key of the clients in use
+        self._client_keys: Dict[int, Tuple] = {}
+
+    @property
+    def num_idle_clients(self) -> int:
+        return sum(len(clients) for clients in self._idle_clients.values())
+
+    def acquire(
+        self, executor, client_setting: Dict, fresh: bool = False
+    ) -> ClientBaseClass:
+        """Get an idle healthy client of the executor/settings, or create one.
+        The client must be given back with release()
+
+        Arguments:
+            executor -- The query executor class, its _get_client creates the client
+            client_setting {Dict} -- Settings of the engine and user
+            fresh {bool} -- Always create a new client, e.g. to check the
+                connection to the engine. It can still be released to the pool
+        """
+        key = _get_client_key(executor, client_setting)
+
+        while True:
+            client = None
+            with self._lock:
+                clients_to_close = self._pop_expired_clients()
+                idle_clients = self._idle_clients.get(key)
+                if idle_clients and not fresh:
+                    client = idle_clients.pop()[1]
+                    if len(idle_clients) == 0:
+                        del self._idle_clients[key]
+            self._close_clients(clients_to_close)
+
+            if client is None:
+                client = executor._get_client(client_setting)
+                break
+            if self._is_healthy(client):
+                break
+            self._close_clients([client])
+
+        with self._lock:
+            self._client_keys[id(client)] = key
+        return client
+
+    def release(self, client: ClientBaseClass, reusable: bool = True):
+        """Give back a client from acquire()
+
+        Arguments:
+            client {ClientBaseClass}
+            reusable {bool} -- If False, the client is closed instead of kept
+        """
+        clients_to_close = []
+        with self._lock:
+            key = self._client_keys.pop(id(client), None)
+            if key is None or not reusable:
+                clients_to_close.append(client)
+            else:
+                idle_clients = self._idle_clients.setdefault(key, [])
+                idle_clients.append((time.time(), client))
+                if len(idle_clients) > self._max_idle_clients_per_key:
+                    clients_to_close.append(idle_clients.pop(0)[1])
+                clients_to_close += self._pop_oldest_clients()
+        self._close_clients(clients_to_close)
+
+    @contextmanager
+    def client(self, executor, client_setting: Dict, fresh: bool = False):
+        """Acquire a client for the duration of the context, the client
+        is closed instead of reused if an exception is raised
+        """
+        client = self.acquire(executor, client_setting, fresh=fresh)
+        try:
+            yield client
+        except BaseException:
+            self.release(client, reusable=False)
+            raise
+        else:
+            self.release(client)
+
+    def clear(self):
+        with self._lock:
+            clients_to_close = [
+                client
+                for idle_clients in self._idle_clients.values()
+                for _, client in idle_clients
+            ]
+            self._idle_clients = {}
+        self._close_clients(clients_to_close)
+
+    def _pop_expired_clients(self) -> List[ClientBaseClass]:
+        expired_clients = []
+        expire_before = time.time() - self._idle_timeout
+        for key in list(self._idle_clients.keys()):
+            idle_clients = self._idle_clients[key]
+            while len(idle_clients) and idle_clients[0][0] < expire_before:
+                expired_clients.append(idle_clients.pop(0)[1])
+            if len(idle_clients) == 0:
+                del self._idle_clients[key]
+        return expired_clients
+
+    def _pop_oldest_clients(self) -> List[ClientBaseClass]:
+        oldest_clients = []
+        while self.num_idle_clients > self._max_idle_clients:
+            key = min(
+                self._idle_clients.keys(),
+                key=lambda key: self._idle_clients[key][0][0],
+            )
+            idle_clients = self._idle_clients[key]
+            oldest_clients.append(idle_clients.pop(0)[1])
+            if len(idle_clients) == 0:
+                del self._idle_clients[key]
+        return oldest_clients
+
+    @staticmethod
+    def _is_healthy(client: ClientBaseClass) -> bool:
+        try:
+            return client.is_healthy()
+        except Exception as e:
+            LOG.info(f"Pooled query engine client is unhealthy: {e}")
+            return False
+
+    @staticmethod
+    def _close_clients(clients: List[ClientBaseClass]):
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                LOG.info(f"Failed to close query engine client: {e}")
+
+
+_client_pool = None
+
+
+def get_client_pool() -> QueryEngineClientPool:
+    global _client_pool
+    if _client_pool is None:
+        _client_pool = QueryEngineClientPool()
+    return _client_pool
@@ -2,7 +2,12 @@ import json
 import re
 
 from pyhive import hive
-from TCLIService.ttypes import TOperationState
+from TCLIService.ttypes import (
+    TGetInfoReq,
+    TGetInfoType,
+    TOperationState,
+    TStatusCode,
+)
 from lib.utils.utils import Timeout
 from lib.query_executor.base_client import ClientBaseClass, CursorBaseClass
 from lib.query_executor.connection_string.hive import get_hive_connection_conf
@@ -44,6 +49,22 @@ class HiveClient(ClientBaseClass):
     def cursor(self) -> CursorBaseClass:
         return HiveCursor(cursor=self._connection.cursor())
 
+    def is_healthy(self) -> bool:
+        # GetInfo is answered by HiveServer2 without running a query
+        try:
+            response = self._connection.client.GetInfo(
+                TGetInfoReq(
+                    sessionHandle=self._connection.sessionHandle,
+                    infoType=TGetInfoType.CLI_SERVER_NAME,
+                )
+            )
+            return response.status.statusCode == TStatusCode.SUCCESS_STATUS
+        except Exception:
+            return False
+
+    def close(self):
+        self._connection.close()
+
 
 class HiveCursor(CursorBaseClass):
     def __init__(self, cursor):
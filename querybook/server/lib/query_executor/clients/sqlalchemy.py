@@ -34,6 +34,9 @@ class SqlAlchemyClient(ClientBaseClass):
     def cursor(self) -> CursorBaseClass:
         return SqlAlchemyCursor(engine=self._engine)
 
+    def close(self):
+        self._engine.dispose()
+
 
 class SqlAlchemyCursor(CursorBaseClass):
     def __init__(self, engine):
@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union
-
-from .presto_types import PrestoType, rename_duplicate_names
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .presto_types import PrestoType, compile_row_transform, rename_duplicate_names
 
 CursorT = TypeVar("CursorT")
 CursorReturnT = TypeVar("CursorReturnT", bound=Union[List[Any], Tuple])
@@ -36,6 +47,11 @@ class PrestoCursorMixin(Generic[CursorT, CursorReturnT], ABC):
     def tracking_url(self):
         return self._tracking_url
 
+    @property
+    def row_transform(self) -> Callable[[Sequence[Any]], List[Any]]:
+        """Formats a row of the current result, see compile_row_transform"""
+        return compile_row_transform([i[1] for i in self._cursor.description])
+
     @staticmethod
     def transform_row(row: CursorReturnT, presto_types: List[PrestoType]) -> List[Any]:
         return [pt.format_data(data) for data, pt in zip(row, presto_types)]
@@ -52,12 +68,14 @@ class PrestoCursorMixin(Generic[CursorT, CursorReturnT], ABC):
             return rename_duplicate_names([d[0] for d in description])
 
     def get_one_row(self) -> List[Any]:
-        return self.transform_row(self._cursor.fetchone(), self.presto_types)
+        row = self._cursor.fetchone()
+        return None if row is None else self.row_transform(row)
 
     def get_n_rows(self, n: int) -> List[List[Any]]:
-        presto_types = self.presto_types
         rows = self._cursor.fetchmany(size=n)
-        return [self.transform_row(row, presto_types) for row in rows]
+        if len(rows) == 0:
+            return []
+        return list(map(self.row_transform, rows))
 
     def run(self, query: str):
         self._init_query_state_vars()
@@ -2,7 +2,11 @@ import re
 from abc import ABC, abstractmethod
 from collections import Counter, OrderedDict
 from dataclasses import dataclass
-from typing import Any, ClassVar, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+# Converts the value of a column, None if the value is returned as is
+Converter = Optional[Callable[[Any], Any]]
 
 
 def rename_duplicate_names(names: List[str]) -> List[str]:
@@ -34,6 +38,12 @@ class PrestoType(ABC):
     def format_data(self, data):
         pass
 
+    @abstractmethod
+    def get_converter(self) -> Converter:
+        """Build a function doing the same as format_data once the type is
+        known, None if the data does not need to be formatted"""
+        pass
+
 
 @dataclass
 class RowType(PrestoType):
@@ -75,6 +85,34 @@ class RowType(PrestoType):
             for (name, type_), dat in zip(self.fields.items(), data)
         }
 
+    def get_converter(self) -> Converter:
+        names = tuple(self.fields.keys())
+        field_converters = [
+            (index, converter)
+            for index, converter in enumerate(
+                type_.get_converter() for type_ in self.fields.values()
+            )
+            if converter is not None
+        ]
+
+        if len(field_converters) == 0:
+
+            def convert(data):
+                return None if data is None else dict(zip(names, data))
+
+        else:
+
+            def convert(data):
+                if data is None:
+                    return None
+                data = list(data)
+                for index, converter in field_converters:
+                    if index < len(data):
+                        data[index] = converter(data[index])
+                return dict(zip(names, data))
+
+        return convert
+
 
 @dataclass
 class ArrayType(PrestoType):
@@ -94,6 +132,16 @@ class ArrayType(PrestoType):
             return data
         return list(map(self.element_type.format_data, data))
 
+    def get_converter(self) -> Converter:
+        element_converter = self.element_type.get_converter()
+        if element_converter is None:
+            return None
+
+        def convert(data):
+            return None if data is None else list(map(element_converter, data))
+
+        return convert
+
 
 @dataclass
 class MapType(PrestoType):
@@ -117,6 +165,18 @@ class MapType(PrestoType):
             return data
         return {k: self.value_type.format_data(v) for k, v in data.items()}
 
+    def get_converter(self) -> Converter:
+        value_converter = self.value_type.get_converter()
+        if value_converter is None:
+            return None
+
+        def convert(data):
+            if data is None:
+                return None
+            return {k: value_converter(v) for k, v in data.items()}
+
+        return convert
+
 
 @dataclass
 class AtomicType(PrestoType):
@@ -129,6 +189,45 @@ class AtomicType(PrestoType):
     def format_data(self, data: Any) -> Any:
         return data
 
+    def get_converter(self) -> Converter:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _compile_row_transform(
+    type_strings: Tuple[str, ...]
+) -> Callable[[Sequence[Any]], List[Any]]:
+    column_converters = [
+        (index, converter)
+        for index, converter in enumerate(
+            PrestoType.from_string(type_string).get_converter()
+            for type_string in type_strings
+        )
+        if converter is not None
+    ]
+
+    if len(column_converters) == 0:
+        return list
+
+    def transform(row: Sequence[Any]) -> List[Any]:
+        row = list(row)
+        for index, converter in column_converters:
+            row[index] = converter(row[index])
+        return row
+
+    return transform
+
+
+def compile_row_transform(
+    type_strings: Sequence[str],
+) -> Callable[[Sequence[Any]], List[Any]]:
+    """Build the function formatting the rows of a result with the given
+    column types, same as calling format_data on every value but the types
+    are parsed once and the columns returned as is are skipped.
+    Transforms are cached since the same results are often fetched again.
+    """
+    return _compile_row_transform(tuple(type_strings))
+
 
 def _bracket_aware_split(value: str, delimiter: str) -> List[str]:
     if len(delimiter) != 1:
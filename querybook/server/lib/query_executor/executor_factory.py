@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from app.db import with_session
 from const.query_execution import QueryExecutionStatus
@@ -43,6 +43,7 @@ def _get_executor_params_and_engine(
         raise ArchivedQueryEngine("This query engine is disabled.")
 
     client_setting = get_client_setting_from_engine(engine, uid, session=session)
+    feature_params = engine.get_feature_params()
 
     return (
         {
@@ -52,11 +53,25 @@ def _get_executor_params_and_engine(
             "statement_ranges": statement_ranges,
             "client_setting": client_setting,
             "execution_type": execution_type,
+            "parallel_statements": bool(
+                feature_params.get("parallel_statements", False)
+            ),
+            "max_result_rows": get_max_result_rows(feature_params),
+            "language": engine.language,
         },
         engine,
     )
 
 
+def get_max_result_rows(feature_params: Dict) -> Optional[int]:
+    """Max number of rows of a statement result, None if unlimited"""
+    try:
+        max_result_rows = int(feature_params.get("max_result_rows") or 0)
+    except (TypeError, ValueError):
+        return None
+    return max_result_rows if max_result_rows > 0 else None
+
+
 @with_session
 def get_client_setting_from_engine(engine, uid=None, session=None) -> Dict:
     """Compute the settings passed to the query engine.
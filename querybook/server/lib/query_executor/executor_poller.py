@@ -0,0 +1,160 @@
+"""Multiplexed polling of query executors
+
+By default every run_query_task keeps a worker process busy polling its
+executor and sleeping in between for the whole life of the query. When
+QUERY_EXECUTION_POLL_MODE is "multiplexed", the executors of a worker process
+are instead polled by a single loop which keeps a priority queue of their next
+poll time, so that one gevent worker process (celery worker -P gevent) can
+run hundreds of long running queries.
+
+The state machine of the executors is unchanged: the loop does what
+run_executor_until_finish does, executor.poll() until it is no longer
+running, but waits executor.get_sleep_time() in the queue instead of
+calling executor.sleep().
+"""
+
+import heapq
+from itertools import count
+import time
+
+import gevent
+from gevent.event import AsyncResult, Event
+from gevent.monkey import is_module_patched
+from gevent.pool import Pool
+
+from app.flask_app import flask_app
+from const.query_execution import QueryExecutionStatus
+from env import QuerybookSettings
+from lib.logger import get_logger
+
+LOG = get_logger(__file__)
+
+POLL_MODE_PROCESS = "process"
+POLL_MODE_MULTIPLEXED = "multiplexed"
+
+
+def is_multiplexed_poll_enabled() -> bool:
+    """Whether the executors of this process should be polled by the
+    multiplexed poller, which requires a gevent patched worker
+    """
+    if QuerybookSettings.QUERY_EXECUTION_POLL_MODE != POLL_MODE_MULTIPLEXED:
+        return False
+
+    if not is_module_patched("socket"):
+        LOG.warning(
+            "QUERY_EXECUTION_POLL_MODE is multiplexed but the worker is not "
+            + "running with the gevent pool, polling in process mode instead"
+        )
+        return False
+    return True
+
+
+class _PolledExecution(object):
+    def __init__(self, celery_task, executor):
+        self.celery_task = celery_task
+        # The celery request is local to the greenlet running the task,
+        # so the task id is kept to be used from the poll loop
+        self.task_id = celery_task.request.id
+        self.executor = executor
+        self.result = AsyncResult()
+        self.removed = False
+
+
+class MultiplexedExecutorPoller(object):
+    """Poll the executors of the process in a single loop
+
+    The loop pops the executors whose poll time has come from the
+    queue, and polls them in a greenlet pool so that a slow poll
+    (e.g. uploading a large result) does not delay the other executors.
+    """
+
+    def __init__(self, max_concurrent_polls: int):
+        # (next poll time, insertion order, _PolledExecution)
+        self._queue = []
+        self._counter = count()
+        self._pool = Pool(max_concurrent_polls)
+        self._wake_up = Event()
+        self._loop_greenlet = None
+
+    def run_executor_until_finish(self, celery_task, executor):
+        """Same as run_executor_until_finish in tasks.run_query, but only
+        blocks the calling greenlet while the executor is polled by the loop
+
+        Raises:
+            Exception: Any exception raised by the executor
+        """
+        polled_execution = _PolledExecution(celery_task, executor)
+        self._schedule(time.time(), polled_execution)
+        try:
+            polled_execution.result.get()
+        except BaseException:
+            # e.g. SoftTimeLimitExceeded raised in the task greenlet,
+            # the loop must stop polling the executor
+            polled_execution.removed = True
+            raise
+
+    def _schedule(self, poll_time: float, polled_execution: _PolledExecution):
+        if polled_execution.removed:
+            return
+
+        heapq.heappush(self._queue, (poll_time, next(self._counter), polled_execution))
+        if self._loop_greenlet is None:
+            self._loop_greenlet = gevent.spawn(self._loop)
+        elif self._queue[0][2] is polled_execution:
+            # The loop might be waiting for a later poll time
+            self._wake_up.set()
+
+    def _loop(self):
+        while True:
+            if len(self._queue) == 0:
+                # Wait for a new executor or a running poll to schedule
+                # its executor again
+                self._wake_up.clear()
+                self._wake_up.wait()
+                continue
+
+            poll_time, _, polled_execution = self._queue[0]
+            wait_time = poll_time - time.time()
+            if wait_time > 0:
+                self._wake_up.clear()
+                self._wake_up.wait(wait_time)
+                continue
+
+            heapq.heappop(self._queue)
+            if not polled_execution.removed:
+                # Blocks if there are too many running polls
+                self._pool.spawn(self._poll, polled_execution)
+
+    def _poll(self, polled_execution: _PolledExecution):
+        try:
+            # Same as the celery task context (ContextTask)
+            with flask_app.app_context():
+                self._poll_executor(polled_execution)
+        except Exception as e:
+            polled_execution.result.set_exception(e)
+
+    def _poll_executor(self, polled_execution: _PolledExecution):
+        executor = polled_execution.executor
+        if polled_execution.celery_task.is_aborted(task_id=polled_execution.task_id):
+            executor.cancel()
+            polled_execution.result.set()
+            return
+
+        executor.poll()
+        if executor.status != QueryExecutionStatus.RUNNING:
+            polled_execution.result.set()
+            return
+
+        self._schedule(time.time() + executor.get_sleep_time(), polled_execution)
+
+
+_poller = None
+
+
+def get_executor_poller() -> MultiplexedExecutorPoller:
+    global _poller
+    if _poller is None:
+        _poller = MultiplexedExecutorPoller(
+            QuerybookSettings.QUERY_EXECUTION_MAX_CONCURRENT_POLLS
+        )
+    return _poller
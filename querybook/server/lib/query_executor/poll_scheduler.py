@@ -0,0 +1,202 @@
+"""Schedulers deciding how long a query executor waits between two polls
+
+Every poll calls the engine (cursor.poll, get_logs) and emits the update
+through socketio, so the executor only polls often when it is useful.
+Executors pick their scheduler with POLL_SCHEDULER_CLASS.
+"""
+
+from abc import ABCMeta, abstractmethod
+import time
+from typing import Optional
+
+from clients.redis_client import get_redis, semi_decr, semi_incr
+from lib.logger import get_logger
+
+LOG = get_logger(__file__)
+
+# Queries are polled at least every second for the first 15 mins,
+# then at least every 10 seconds
+POLL_MIN_INTERVAL = 1
+LONG_RUNNING_QUERY_POLL_MIN_INTERVAL = 10
+LONG_RUNNING_QUERY_SECONDS = 900
+
+# Max interval if someone is watching the query, or not
+POLL_MAX_INTERVAL = 10
+UNWATCHED_POLL_MAX_INTERVAL = 30
+# Interval growth when nothing changed since the last poll
+POLL_BACKOFF_FACTOR = 1.5
+
+# How long the result of the subscriber check is used
+SUBSCRIBER_CHECK_INTERVAL = 10
+# Expiration of the subscriber count, in case a web server
+# never decrements it
+SUBSCRIBER_COUNT_EXPIRATION = 86400
+
+
+def _get_subscriber_key(query_execution_id: int) -> str:
+    return f"query_execution_subscribers_{query_execution_id}"
+
+
+def on_query_execution_subscribe(query_execution_id: int):
+    """Count the socketio subscribers of the query execution"""
+    try:
+        semi_incr(
+            _get_subscriber_key(query_execution_id),
+            expiration=SUBSCRIBER_COUNT_EXPIRATION,
+        )
+    except Exception as e:
+        LOG.warning(f"Failed to count query execution subscriber: {e}")
+
+
+def on_query_execution_unsubscribe(query_execution_id: int):
+    try:
+        semi_decr(_get_subscriber_key(query_execution_id))
+    except Exception as e:
+        LOG.warning(f"Failed to count query execution subscriber: {e}")
+
+
+def has_query_execution_subscriber(query_execution_id: int) -> bool:
+    """Whether someone is watching the query execution through socketio"""
+    return bool(get_redis().exists(_get_subscriber_key(query_execution_id)))
+
+
+class QueryExecutionSubscriberChecker(object):
+    """Check has_query_execution_subscriber at most every
+    SUBSCRIBER_CHECK_INTERVAL seconds
+    """
+
+    def __init__(self, query_execution_id: int):
+        self._query_execution_id = query_execution_id
+        self._has_subscriber = True
+        self._checked_at = None
+
+    def has_subscriber(self) -> bool:
+        now = time.time()
+        if (
+            self._checked_at is None
+            or now - self._checked_at >= SUBSCRIBER_CHECK_INTERVAL
+        ):
+            self._checked_at = now
+            try:
+                self._has_subscriber = has_query_execution_subscriber(
+                    self._query_execution_id
+                )
+            except Exception as e:
+                # Assume someone is watching if redis is not available
+                LOG.warning(f"Failed to check query execution subscribers: {e}")
+                self._has_subscriber = True
+        return self._has_subscriber
+
+
+class BasePollScheduler(metaclass=ABCMeta):
+    def __init__(self, query_execution_id: int):
+        self._query_execution_id = query_execution_id
+        self._start_time = time.time()
+
+    def on_poll(
+        self,
+        completed: bool,
+        percent_complete: Optional[float] = None,
+        has_log: bool = False,
+    ):
+        """Called after every poll of the running statement
+
+        Arguments:
+            completed {bool} -- Whether the statement completed
+            percent_complete {Optional[float]} -- Progress reported by the engine
+            has_log {bool} -- Whether the poll returned new logs
+        """
+        pass
+
+    @abstractmethod
+    def get_sleep_time(self) -> float:
+        """Seconds to wait before the next poll"""
+        raise NotImplementedError()
+
+    @property
+    def _min_interval(self) -> float:
+        time_passed = time.time() - self._start_time  # unit in seconds
+        return (
+            POLL_MIN_INTERVAL
+            if time_passed < LONG_RUNNING_QUERY_SECONDS
+            else LONG_RUNNING_QUERY_POLL_MIN_INTERVAL
+        )
+
+
+class FixedPollScheduler(BasePollScheduler):
+    """Poll every second for the first 15 mins, every 10 seconds afterwards"""
+
+    def get_sleep_time(self) -> float:
+        return self._min_interval
+
+
+class AdaptivePollScheduler(BasePollScheduler):
+    """Back off while the statement makes no visible progress
+
+    The interval is reset to the min interval whenever the progress or the
+    logs change (or a new statement starts), and grows by POLL_BACKOFF_FACTOR
+    otherwise, up to POLL_MAX_INTERVAL or UNWATCHED_POLL_MAX_INTERVAL if no
+    one is subscribed to the query execution. If the engine reports progress,
+    the interval is also capped to half of the expected remaining time so
+    that the completion is not noticed late.
+    """
+
+    def __init__(self, query_execution_id: int):
+        super(AdaptivePollScheduler, self).__init__(query_execution_id)
+        self._interval = None
+        self._reset_progress()
+
+        self._subscriber_checker = QueryExecutionSubscriberChecker(query_execution_id)
+
+    def _reset_progress(self):
+        self._percent_complete = None
+        self._progress_start = None  # (time, percent_complete)
+
+    def on_poll(
+        self,
+        completed: bool,
+        percent_complete: Optional[float] = None,
+        has_log: bool = False,
+    ):
+        now = time.time()
+        changed = completed or has_log
+        if completed:
+            self._reset_progress()
+        elif (
+            percent_complete is not None and percent_complete != self._percent_complete
+        ):
+            if self._progress_start is None:
+                self._progress_start = (now, percent_complete)
+            self._percent_complete = percent_complete
+            changed = True
+
+        if changed or self._interval is None:
+            self._interval = self._min_interval
+        else:
+            self._interval = self._interval * POLL_BACKOFF_FACTOR
+
+    def get_sleep_time(self) -> float:
+        min_interval = self._min_interval
+        max_interval = (
+            POLL_MAX_INTERVAL
+            if self._subscriber_checker.has_subscriber()
+            else UNWATCHED_POLL_MAX_INTERVAL
+        )
+
+        sleep_time = min(self._interval or min_interval, max_interval)
+        remaining_time = self._get_expected_remaining_time()
+        if remaining_time is not None:
+            sleep_time = min(sleep_time, remaining_time / 2)
+        return max(sleep_time, min_interval)
+
+    def _get_expected_remaining_time(self) -> Optional[float]:
+        if self._progress_start is None:
+            return None
+
+        start_time, start_percent = self._progress_start
+        progress = self._percent_complete - start_percent
+        elapsed = time.time() - start_time
+        if progress <= 0 or elapsed <= 0:
+            return None
+        rate = progress / elapsed  # percent per second
+        return max(100 - self._percent_complete, 0) / rate
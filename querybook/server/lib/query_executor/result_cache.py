@@ -0,0 +1,289 @@
+"""Per engine cache of query execution results
+
+Engines opt in with the "result_cache_ttl" feature param (in seconds).
+When a read only query is executed successfully, its execution id is kept
+in redis under the engine id and the normalized query (comments and
+surrounding whitespace removed from every statement). A new execution of
+the same query on the same engine then reuses the result files of the
+cached execution instead of running the query again.
+
+A cached result is only used if:
+    - every statement is a SELECT (or WITH ... SELECT), as found by
+      get_table_statement_type, without time or random functions such as
+      now() or rand()
+    - the cached execution and all its statements are DONE
+    - the first statement started less than result_cache_ttl seconds ago,
+      executions created from the cache keep the original statement times
+      so that they never extend the freshness of a result
+
+The cache is shared by all users of the engine, so it should only be
+enabled on engines where all users can read the same data. Engines that
+run the queries as the querying user (impersonate or proxy_user_id engine
+params) keep a separate cache per user.
+"""
+
+import datetime
+import hashlib
+import re
+from typing import List, Optional
+
+from app.db import with_session
+from clients.redis_client import get_redis
+from const.query_execution import QueryExecutionStatus, StatementExecutionStatus
+from lib.logger import get_logger
+from lib.query_analysis.lineage import get_table_statement_type
+from lib.query_analysis.statements import get_statement_ranges, get_statements
+from lib.stats_logger import QUERY_EXECUTION_RESULT_CACHE, stats_logger
+from logic import admin as admin_logic, query_execution as qe_logic
+from models.query_execution import StatementExecution
+
+LOG = get_logger(__file__)
+
+_nondeterministic_function_pattern = re.compile(
+    r"\b(now|rand|random|uuid|current_timestamp|current_time|localtime"
+    r"|localtimestamp|sysdate|systimestamp)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_query(query: str) -> str:
+    return ";\n".join(get_statements(query))
+
+
+def is_query_cacheable(statements: List[str]) -> bool:
+    """Whether the result of the (sanitized) statements can be reused,
+    only deterministic read only queries are cached
+    """
+    return len(statements) > 0 and all(
+        get_table_statement_type(statement) == ["SELECT"]
+        and not _nondeterministic_function_pattern.search(statement)
+        for statement in statements
+    )
+
+
+def get_result_cache_ttl(engine) -> int:
+    """Seconds a result of the engine can be reused, 0 if the cache is disabled"""
+    try:
+        return max(int(engine.get_feature_params().get("result_cache_ttl") or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_result_cache_uid(engine, uid: int) -> Optional[int]:
+    """The user whose credentials the engine runs the query with,
+    None if all users of the engine share the same credentials
+    """
+    engine_params = engine.get_engine_params()
+    if engine_params.get("impersonate") or engine_params.get("proxy_user_id"):
+        return uid
+    return None
+
+
+def _get_result_cache_key(
+    engine_id: int, normalized_query: str, cache_uid: Optional[int] = None
+) -> str:
+    query_hash = hashlib.sha256(normalized_query.encode("utf-8")).hexdigest()
+    if cache_uid is not None:
+        return f"query_result_cache_{engine_id}_{cache_uid}_{query_hash}"
+    return f"query_result_cache_{engine_id}_{query_hash}"
+
+
+@with_session
+def cache_query_execution_result(query_execution_id: int, session=None):
+    """Make the result of a successful query execution available to the
+    next executions of the same query, if its engine has the cache enabled
+    """
+    try:
+        query_execution = qe_logic.get_query_execution_by_id(
+            query_execution_id, session=session
+        )
+        if (
+            query_execution is None
+            or query_execution.status != QueryExecutionStatus.DONE
+        ):
+            return
+
+        ttl = get_result_cache_ttl(query_execution.engine)
+        statements = get_statements(query_execution.query)
+        if ttl == 0 or not is_query_cacheable(statements):
+            return
+
+        get_redis().set(
+            _get_result_cache_key(
+                query_execution.engine_id,
+                ";\n".join(statements),
+                get_result_cache_uid(query_execution.engine, query_execution.uid),
+            ),
+            query_execution_id,
+            ex=ttl,
+        )
+    except Exception as e:
+        LOG.warning(f"Failed to cache query execution {query_execution_id}: {e}")
+
+
+@with_session
+def get_cached_query_execution(query: str, engine_id: int, uid: int, session=None):
+    """Get a fresh successful execution of the query on the engine,
+    which the user is allowed to reuse
+
+    Returns:
+        Optional[QueryExecution] -- None if there is no usable cached result
+    """
+    engine = admin_logic.get_query_engine_by_id(engine_id, session=session)
+    ttl = get_result_cache_ttl(engine) if engine is not None else 0
+    if ttl == 0:
+        return None
+
+    statements = get_statements(query)
+    if not is_query_cacheable(statements):
+        return None
+    normalized_query = ";\n".join(statements)
+    cache_uid = get_result_cache_uid(engine, uid)
+
+    try:
+        cached_id = get_redis().get(
+            _get_result_cache_key(engine_id, normalized_query, cache_uid)
+        )
+    except Exception as e:
+        LOG.warning(f"Failed to get cached query execution: {e}")
+        return None
+
+    query_execution = (
+        qe_logic.get_query_execution_by_id(int(cached_id), session=session)
+        if cached_id is not None
+        else None
+    )
+    if not _is_cached_execution_usable(
+        query_execution, engine_id, normalized_query, ttl, cache_uid
+    ):
+        stats_logger.incr(QUERY_EXECUTION_RESULT_CACHE, tags={"result": "miss"})
+        return None
+
+    stats_logger.incr(QUERY_EXECUTION_RESULT_CACHE, tags={"result": "hit"})
+    return query_execution
+
+
+def _is_cached_execution_usable(
+    query_execution,
+    engine_id: int,
+    normalized_query: str,
+    ttl: int,
+    cache_uid: Optional[int],
+) -> bool:
+    if (
+        query_execution is None
+        or query_execution.engine_id != engine_id
+        or (cache_uid is not None and query_execution.uid != cache_uid)
+        or query_execution.status != QueryExecutionStatus.DONE
+    ):
+        return False
+
+    statement_executions = sorted(
+        query_execution.statement_executions, key=lambda s: s.id
+    )
+    if len(statement_executions) == 0 or any(
+        statement_execution.status != StatementExecutionStatus.DONE
+        for statement_execution in statement_executions
+    ):
+        return False
+
+    fresh_after = datetime.datetime.utcnow() - datetime.timedelta(seconds=ttl)
+    if statement_executions[0].created_at < fresh_after:
+        return False
+
+    return normalize_query(query_execution.query) == normalized_query
+
+
+@with_session
+def apply_cached_query_execution(
+    query_execution_id: int, use_result_cache: bool = True, session=None
+) -> bool:
+    """Complete the (not started) query execution with the cached result
+    of the same query, if there is one.
+
+    Arguments:
+        query_execution_id {int}
+        use_result_cache {bool} -- If False, the cache is bypassed
+
+    Returns:
+        bool -- True if the query execution is completed and should not be run
+    """
+    if not use_result_cache:
+        return False
+
+    query_execution = qe_logic.get_query_execution_by_id(
+        query_execution_id, session=session
+    )
+    if (
+        query_execution is None
+        or query_execution.status != QueryExecutionStatus.INITIALIZED
+    ):
+        return False
+
+    try:
+        cached_execution = get_cached_query_execution(
+            query_execution.query,
+            query_execution.engine_id,
+            query_execution.uid,
+            session=session,
+        )
+    except Exception as e:
+        LOG.warning(f"Failed to look up the query result cache: {e}")
+        return False
+    if cached_execution is None:
+        return False
+
+    copy_statement_executions(cached_execution, query_execution, session=session)
+    return True
+
+
+@with_session
+def copy_statement_executions(
+    from_query_execution, to_query_execution, commit=True, session=None
+):
+    """Link the statement results of a completed query execution to another
+    one of the same query and mark it as completed
+    """
+    statement_ranges = get_statement_ranges(to_query_execution.query)
+    from_statement_executions = sorted(
+        from_query_execution.statement_executions, key=lambda s: s.id
+    )
+    for index, statement_execution in enumerate(from_statement_executions):
+        statement_range = (
+            statement_ranges[index] if index < len(statement_ranges) else None
+        )
+        # Stream logs are stored per statement execution and are not copied
+        has_log = statement_execution.has_log and not (
+            statement_execution.log_path or ""
+        ).startswith("stream")
+        session.add(
+            StatementExecution(
+                query_execution_id=to_query_execution.id,
+                statement_range_start=(
+                    statement_range[0]
+                    if statement_range
+                    else statement_execution.statement_range_start
+                ),
+                statement_range_end=(
+                    statement_range[1]
+                    if statement_range
+                    else statement_execution.statement_range_end
+                ),
+                status=statement_execution.status,
+                meta_info=statement_execution.meta_info,
+                created_at=statement_execution.created_at,
+                completed_at=statement_execution.completed_at,
+                result_row_count=statement_execution.result_row_count,
+                result_path=statement_execution.result_path,
+                has_log=has_log,
+                log_path=statement_execution.log_path if has_log else None,
+            )
+        )
+
+    to_query_execution.status = QueryExecutionStatus.DONE
+    to_query_execution.completed_at = datetime.datetime.utcnow()
+
+    if commit:
+        session.commit()
+    else:
+        session.flush()
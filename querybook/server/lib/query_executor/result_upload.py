@@ -0,0 +1,272 @@
+from itertools import takewhile
+from queue import Empty, Full, Queue
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from lib.logger import get_logger
+from lib.result_store import GenericUploader
+from lib.result_store.columnar import (
+    ColumnarResultWriter,
+    get_columnar_result_path,
+    is_columnar_result_enabled,
+)
+from lib.result_store.result_index import (
+    RESULT_INDEX_INTERVAL,
+    ResultIndexWriter,
+    get_result_index_path,
+)
+from lib.utils.csv import CSVBatchSerializer, row_to_csv
+
+LOG = get_logger(__file__)
+
+# Max number of row chunks waiting in between two stages
+PIPELINE_QUEUE_SIZE = 2
+# How often (in seconds) a blocked stage checks if the pipeline is stopped
+PIPELINE_POLL_INTERVAL = 0.1
+# Number of rows given to the on_preview callback
+RESULT_PREVIEW_ROW_COUNT = 100
+
+_END_OF_RESULT = object()
+
+
+class ResultUploadPipeline(object):
+    """Upload the result of a statement while it is still being fetched.
+
+    The three stages run concurrently and are connected by bounded queues:
+        fetch (caller thread) -> serialize to csv -> upload (background threads)
+
+    The uploader is started, written to and ended in the upload thread only,
+    so any BaseUploader can be used. Rows are counted the same way as a
+    sequential upload: once the uploader refuses a write, the remaining rows
+    of the chunk are uploaded one by one until the limit and the pipeline
+    stops fetching.
+
+    Chunks are split at every RESULT_INDEX_INTERVAL-th row so that the
+    offsets of these rows can be indexed if the uploader supports it.
+
+    If on_preview is given, it is called (in the caller thread) with the
+    first preview_size rows as soon as they are fetched, so that they can be
+    shown while the rest of the result is fetched and uploaded. It is not
+    called if the result has fewer rows since the upload is about to end.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        columns: List[str],
+        on_preview: Optional[Callable[[List[List]], None]] = None,
+        preview_size: int = RESULT_PREVIEW_ROW_COUNT,
+    ):
+        self._key = key
+        self._columns = columns
+
+        self._on_preview = on_preview
+        self._preview_size = preview_size
+        self._preview_rows = []
+
+        self._serialize_queue = Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self._upload_queue = Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+        # Set when no more rows are needed (upload limit reached or failure)
+        self._stopped = threading.Event()
+        self._aborted = False
+        self._exception = None
+
+        self._upload_url = None
+        self._rows_uploaded = 0
+        self._rows_fetched = 0
+        self._stopped_fetching = False
+
+    @property
+    def rows_fetched(self) -> int:
+        """Number of rows read from the iterator, excluding the column row"""
+        return self._rows_fetched
+
+    @property
+    def stopped_fetching(self) -> bool:
+        """Whether the iterator was left before its end because the upload
+        limit is reached, the remaining rows are never fetched"""
+        return self._stopped_fetching
+
+    def run(self, rows_chunk_iter: Iterable[List[List]]) -> Tuple[str, int]:
+        """Fetch every chunk from the iterator and upload them
+
+        Returns:
+            Tuple[str, int]: the upload url and the number of rows uploaded
+                including the column row
+        """
+        threads = [
+            threading.Thread(target=self._run_stage, args=(self._serialize,)),
+            threading.Thread(target=self._run_stage, args=(self._upload,)),
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            for rows in rows_chunk_iter:
+                self._rows_fetched += len(rows)
+                if not self._put(self._serialize_queue, rows):
+                    self._stopped_fetching = True
+                    break
+                self._collect_preview_rows(rows)
+            self._put(self._serialize_queue, _END_OF_RESULT)
+        except BaseException:
+            self._abort()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        if self._exception is not None:
+            raise self._exception
+        return self._upload_url, self._rows_uploaded
+
+    def _collect_preview_rows(self, rows: List[List]):
+        if self._on_preview is None:
+            return
+
+        self._preview_rows.extend(rows[: self._preview_size - len(self._preview_rows)])
+        if len(self._preview_rows) >= self._preview_size:
+            on_preview = self._on_preview
+            self._on_preview = None
+            on_preview(self._preview_rows)
+
+    def _run_stage(self, stage):
+        try:
+            stage()
+        except Exception as e:
+            LOG.error(f"Failed to upload {self._key}: {e}")
+            self._exception = e
+            self._abort()
+
+    def _abort(self):
+        self._aborted = True
+        self._stopped.set()
+
+    def _put(self, queue: Queue, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                queue.put(item, timeout=PIPELINE_POLL_INTERVAL)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _get(self, queue: Queue):
+        while not self._stopped.is_set():
+            try:
+                return queue.get(timeout=PIPELINE_POLL_INTERVAL)
+            except Empty:
+                pass
+        return _END_OF_RESULT
+
+    def _serialize(self):
+        serializer = CSVBatchSerializer()
+        num_rows = 0
+        while True:
+            rows = self._get(self._serialize_queue)
+            if rows is _END_OF_RESULT:
+                self._put(self._upload_queue, _END_OF_RESULT)
+                return
+
+            # List of (row number of the first row, rows, csv)
+            pieces = []
+            start = 0
+            while start < len(rows):
+                end = start + RESULT_INDEX_INTERVAL - num_rows % RESULT_INDEX_INTERVAL
+                piece_rows = rows[start:end]
+                pieces.append((num_rows, piece_rows, serializer.serialize(piece_rows)))
+                num_rows += len(piece_rows)
+                start = end
+
+            if not self._put(self._upload_queue, pieces):
+                return
+
+    def _upload(self):
+        uploader = GenericUploader(self._key)
+        self._upload_url = uploader.upload_url
+        uploader.start()
+
+        # The writers started and not ended yet
+        writers = [uploader]
+        try:
+            columnar_writer = None
+            if uploader.SUPPORTS_BINARY and is_columnar_result_enabled():
+                columnar_writer = ColumnarResultWriter(
+                    get_columnar_result_path(self._key), self._columns
+                )
+                columnar_writer.start()
+                writers.append(columnar_writer)
+
+            index_writer = self._upload_rows(uploader, columnar_writer)
+            if self._aborted:
+                return
+
+            while len(writers):
+                writers[0].end()
+                writers.pop(0)
+            if index_writer is not None:
+                index_writer.end()
+        finally:
+            # On failure or abort, so that no multipart upload or file is
+            # left open. The index is only uploaded in end().
+            for writer in writers:
+                try:
+                    writer.abort()
+                except Exception as e:
+                    LOG.error(f"Failed to abort the upload of {self._key}: {e}")
+
+    def _upload_rows(self, uploader, columnar_writer) -> Optional[ResultIndexWriter]:
+        """Upload the rows from the upload queue until the end of the result,
+        the upload limit or an abort
+
+        Returns:
+            Optional[ResultIndexWriter]: the offsets of the uploaded rows,
+                None if the uploader does not support them
+        """
+        uploader.write(row_to_csv(self._columns))
+        self._rows_uploaded += 1  # 1 row for the column
+
+        index_writer = None
+        first_row_offset = uploader.checkpoint()
+        if first_row_offset is not None:
+            index_writer = ResultIndexWriter(
+                get_result_index_path(self._key), self._columns
+            )
+            index_writer.add(0, first_row_offset)
+
+        did_upload = True
+        while did_upload:
+            pieces = self._get(self._upload_queue)
+            if pieces is _END_OF_RESULT:
+                break
+
+            for row_number, rows, csv_str in pieces:
+                if (
+                    index_writer is not None
+                    and row_number > 0
+                    and row_number % RESULT_INDEX_INTERVAL == 0
+                ):
+                    offset = uploader.checkpoint()
+                    # None if the upload limit is reached
+                    if offset is not None:
+                        index_writer.add(row_number, offset)
+
+                did_upload = uploader.write(csv_str)
+                if not did_upload:
+                    # The piece is over the limit, upload row by row until
+                    # the limit is reached
+                    rows = list(
+                        takewhile(lambda row: uploader.write(row_to_csv(row)), rows)
+                    )
+                self._rows_uploaded += len(rows)
+
+                if columnar_writer is not None:
+                    for row in rows:
+                        columnar_writer.write(row)
+
+                if not did_upload:
+                    self._stopped.set()
+                    break
+        return index_writer
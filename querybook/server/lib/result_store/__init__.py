@@ -1,4 +1,4 @@
-from typing import Generator, List, Optional
+from typing import BinaryIO, Generator, List, Optional, Union
 
 from .all_result_stores import ALL_RESULT_STORES
 from .stores.base_store import BaseReader, BaseUploader
@@ -18,13 +18,24 @@ class GenericUploader(BaseUploader):
     def start(self) -> None:
         self._uploader.start()
 
-    def write(self, data: str) -> bool:
+    def write(self, data: Union[str, bytes]) -> bool:
         return self._uploader.write(data)
 
+    @property
+    def SUPPORTS_BINARY(self):
+        return self._uploader.SUPPORTS_BINARY
+
     def end(self):
         self._uploader.end()
         self._uploader = None
 
+    def abort(self):
+        self._uploader.abort()
+        self._uploader = None
+
+    def checkpoint(self) -> Optional[int]:
+        return self._uploader.checkpoint()
+
     @property
     def is_uploading(self):
         return self._uploader.is_uploading
@@ -56,6 +67,12 @@ class GenericReader(BaseReader):
     def read_raw(self) -> str:
         return self._reader.read_raw()
 
+    def open_binary_stream(self) -> BinaryIO:
+        return self._reader.open_binary_stream()
+
+    def open_stored_stream(self, offset: int = 0) -> BinaryIO:
+        return self._reader.open_stored_stream(offset)
+
     @property
     def has_download_url(self):
         return self._reader.has_download_url
@@ -0,0 +1,199 @@
+"""Columnar result format
+
+When RESULT_STORE_COLUMNAR_ENABLED is set, the query executor writes every
+statement result twice: as result.csv (used for downloads and exports) and as
+an Arrow IPC stream named result.arrow right next to it.
+
+Columns that only contain ints, floats, bools or strings keep their arrow
+type, every other column is stored as the string serialize_cell would
+produce. Querybook itself only writes the columnar result, it is meant for
+consumers that read typed columns directly from the result store. Note that
+this doubles the storage used by query results.
+
+Requires pyarrow and a result store whose uploader has SUPPORTS_BINARY.
+"""
+
+from io import BytesIO
+from typing import List
+
+from env import QuerybookSettings
+from lib.logger import get_logger
+from lib.utils.csv import serialize_cell
+from . import GenericUploader
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+LOG = get_logger(__file__)
+
+COLUMNAR_RESULT_FILE_NAME = "result.arrow"
+# Number of rows per arrow record batch
+COLUMNAR_BATCH_SIZE = 10000
+
+
+def is_columnar_result_enabled() -> bool:
+    if not QuerybookSettings.RESULT_STORE_COLUMNAR_ENABLED:
+        return False
+    if pa is None:
+        LOG.warning("pyarrow is not installed, skipping columnar result")
+        return False
+    return True
+
+
+def get_columnar_result_path(result_path: str) -> str:
+    """Get the path of the columnar result stored next to the given
+       result path, works for both the raw key and the path with store type.
+
+    Args:
+        result_path (str): e.g. s3://querybook_temp/1/result.csv
+
+    Returns:
+        str: e.g. s3://querybook_temp/1/result.arrow
+    """
+    return result_path.rsplit("/", 1)[0] + "/" + COLUMNAR_RESULT_FILE_NAME
+
+
+def _get_cell_arrow_type(cell):
+    cell_type = type(cell)
+    if cell_type == bool:
+        return pa.bool_()
+    elif cell_type == int:
+        return pa.int64()
+    elif cell_type == float:
+        return pa.float64()
+    return pa.string()
+
+
+def get_columnar_schema(columns: List[str], rows: List[List]):
+    """Infer the type of each column from the given rows. A column is
+    typed only if all of its non null values have the same type,
+    otherwise it is stored as string
+    """
+    fields = []
+    for column_idx, column in enumerate(columns):
+        column_types = set(
+            _get_cell_arrow_type(row[column_idx])
+            for row in rows
+            if row[column_idx] is not None
+        )
+        column_type = column_types.pop() if len(column_types) == 1 else pa.string()
+        fields.append(pa.field(str(column), column_type))
+    return pa.schema(fields)
+
+
+def rows_to_record_batch(schema, rows: List[List]):
+    """Convert rows to a record batch of the given schema
+
+    Raises:
+        ValueError: if a value does not fit into the column type
+    """
+    arrays = []
+    for column_idx, field in enumerate(schema):
+        if field.type == pa.string():
+            values = [
+                None if row[column_idx] is None else serialize_cell(row[column_idx])
+                for row in rows
+            ]
+        else:
+            values = [row[column_idx] for row in rows]
+            # Arrow would silently coerce, e.g. 1 -> 1.0 for float columns
+            # which would differ from the csv representation
+            if any(
+                value is not None and _get_cell_arrow_type(value) != field.type
+                for value in values
+            ):
+                raise ValueError(f"Mixed types in column {field.name}")
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowException, OverflowError) as e:
+            raise ValueError(str(e))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ColumnarResultWriter(object):
+    """Writes rows as an arrow stream through a result store uploader.
+
+    Once a row cannot be written (type mismatch or upload size limit),
+    the writer stops and the stored result contains only the rows before it.
+    """
+
+    def __init__(self, uri: str, columns: List[str]):
+        self._uploader = GenericUploader(uri)
+        self._columns = columns
+        self._rows = []
+
+        self._schema = None
+        self._sink = BytesIO()
+        self._stream_writer = None
+
+        self.is_truncated = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end()
+
+    def start(self):
+        self._uploader.start()
+
+    def write(self, row: List) -> bool:
+        if self.is_truncated:
+            return False
+
+        self._rows.append(row)
+        if len(self._rows) >= COLUMNAR_BATCH_SIZE:
+            self._flush()
+        return not self.is_truncated
+
+    def end(self):
+        self._flush()
+        if self._stream_writer is None:
+            # Empty result, still write the schema so it can be read
+            self._open_stream(
+                pa.schema(
+                    [pa.field(str(column), pa.string()) for column in self._columns]
+                )
+            )
+        self._stream_writer.close()
+        self._upload_sink()
+        self._uploader.end()
+
+    def abort(self):
+        self._uploader.abort()
+
+    @property
+    def upload_url(self):
+        return self._uploader.upload_url
+
+    def _open_stream(self, schema):
+        self._schema = schema
+        self._stream_writer = pa.ipc.new_stream(self._sink, schema)
+
+    def _flush(self):
+        rows = self._rows
+        self._rows = []
+        if self.is_truncated or len(rows) == 0:
+            return
+
+        try:
+            if self._schema is None:
+                self._open_stream(get_columnar_schema(self._columns, rows))
+            batch = rows_to_record_batch(self._schema, rows)
+        except ValueError as e:
+            LOG.info(f"Truncating columnar result {self.upload_url}: {e}")
+            self.is_truncated = True
+            return
+
+        self._stream_writer.write_batch(batch)
+        self._upload_sink()
+
+    def _upload_sink(self):
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate(0)
+        if len(data) and not self._uploader.write(data):
+            self.is_truncated = True
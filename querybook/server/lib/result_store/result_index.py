@@ -0,0 +1,134 @@
+"""Row offset index of stored results
+
+While uploading a statement result, the query executor records the byte
+offset of every RESULT_INDEX_INTERVAL-th row of result.csv and stores them
+in result.index right next to it. Rows deep into the result can then be read
+with a ranged read that starts at the closest indexed row instead of reading
+(and parsing) every row before them.
+
+Offsets are positions in the stored object, compressed results are flushed
+at every indexed row so that they can be decompressed from there.
+
+Requires a result store whose uploader supports checkpoint().
+"""
+
+from contextlib import closing
+import io
+from itertools import islice
+import json
+from typing import List, Optional
+
+from env import QuerybookSettings
+from lib.logger import get_logger
+from lib.utils.compression import get_compression_codec, open_decompressed_stream
+from lib.utils.csv import serialize_cell, text_lines_to_csv_iter
+from . import GenericReader, GenericUploader
+from clients.common import FileDoesNotExist
+
+LOG = get_logger(__file__)
+
+RESULT_INDEX_FILE_NAME = "result.index"
+# Number of rows between two indexed rows
+RESULT_INDEX_INTERVAL = 1000
+
+
+def get_result_index_path(result_path: str) -> str:
+    """Get the path of the index stored next to the given result path,
+       works for both the raw key and the path with store type.
+
+    Args:
+        result_path (str): e.g. s3://querybook_temp/1/result.csv
+
+    Returns:
+        str: e.g. s3://querybook_temp/1/result.index
+    """
+    return result_path.rsplit("/", 1)[0] + "/" + RESULT_INDEX_FILE_NAME
+
+
+class ResultIndexWriter(object):
+    """Collect the offsets of the indexed rows during the upload of the
+    result, and upload them as the index at the end.
+    """
+
+    def __init__(self, uri: str, columns: List[str]):
+        self._uri = uri
+        # Same as the column row read back from the csv
+        self._columns = [serialize_cell(column) for column in columns]
+        self._compression = get_compression_codec(QuerybookSettings.STORE_COMPRESSION)
+        self._offsets = []
+
+    def add(self, row_number: int, offset: int):
+        """Record the offset of a data row (0 being the first row after
+        the columns), row_number must be the next row to index
+        """
+        assert row_number == len(self._offsets) * RESULT_INDEX_INTERVAL
+        self._offsets.append(offset)
+
+    def end(self):
+        with GenericUploader(self._uri) as uploader:
+            uploader.write(
+                json.dumps(
+                    {
+                        "interval": RESULT_INDEX_INTERVAL,
+                        "compression": self._compression,
+                        "columns": self._columns,
+                        "offsets": self._offsets,
+                    }
+                )
+            )
+
+
+def read_result_index(result_path: str) -> dict:
+    """Read the index of the result
+
+    Raises:
+        FileDoesNotExist: if the result has no index
+    """
+    # No need to start the reader since only the binary stream is used
+    reader = GenericReader(get_result_index_path(result_path))
+    with closing(reader.open_binary_stream()) as stream:
+        return json.loads(stream.read())
+
+
+def read_result_rows(
+    result_path: str, offset: int, limit: int
+) -> Optional[List[List[str]]]:
+    """Read the rows [offset, offset + limit) of the csv result with the
+       index, only the rows after the closest indexed row are read.
+       Returns None if the result has no index, in which case the caller
+       should read the csv from the start.
+
+    Args:
+        result_path (str): the csv result path with store type
+        offset (int): number of data rows to skip
+        limit (int): number of data rows to read
+
+    Returns:
+        Optional[List[List[str]]]: the column row followed by the data rows,
+            same as read_csv would return
+    """
+    try:
+        index = read_result_index(result_path)
+    except (FileDoesNotExist, NotImplementedError):
+        return None
+    except Exception as e:
+        LOG.warning(f"Failed to read result index of {result_path}: {e}")
+        return None
+
+    columns = index["columns"]
+    offsets = index["offsets"]
+    if len(offsets) == 0 or limit <= 0:
+        return [columns]
+
+    interval = index["interval"]
+    indexed_row = min(offset // interval, len(offsets) - 1)
+    rows_to_skip = offset - indexed_row * interval
+
+    reader = GenericReader(result_path)
+    stored_stream = reader.open_stored_stream(offsets[indexed_row])
+    with closing(
+        open_decompressed_stream(stored_stream, checkpoint_codec=index["compression"])
+    ) as stream:
+        lines = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        rows = text_lines_to_csv_iter(lines)
+        return [columns] + list(islice(rows, rows_to_skip, rows_to_skip + limit))
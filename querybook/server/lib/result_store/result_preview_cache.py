@@ -0,0 +1,132 @@
+"""Cache of the statement result previews
+
+The result of a statement never changes once the statement is done, so the
+preview returned by the statement result api (the column row followed by
+the first rows) is cached instead of being read from the result store every
+time a DataDoc cell is opened.
+
+The previews are kept in redis (REDIS_URL) so that they are shared by every
+web server. Every preview expires after RESULT_PREVIEW_CACHE_TIMEOUT and
+previews larger than RESULT_PREVIEW_CACHE_MAX_SIZE bytes are never cached.
+To bound the memory used, the redis instance should have a maxmemory with
+an eviction policy of expiring keys, such as volatile-lru.
+
+While a statement is uploading, the first rows fetched by the worker are
+kept as well (see set_uploading_result_preview) so that the web servers can
+show them before the result is stored.
+"""
+
+import json
+from typing import List, Optional
+
+from clients.redis_client import with_redis
+from lib.config import get_config_value
+from lib.logger import get_logger
+
+LOG = get_logger(__file__)
+
+# Previews are kept for a day since they are mostly read right after the
+# query is run or when a (scheduled) DataDoc is shared
+RESULT_PREVIEW_CACHE_TIMEOUT = 86400
+# Max number of bytes of a cached preview
+RESULT_PREVIEW_CACHE_MAX_SIZE = 5242880
+# The uploading preview is only needed until the statement is done
+UPLOADING_RESULT_PREVIEW_CACHE_TIMEOUT = 3600
+
+QUERY_RESULT_LIMIT_CONFIG = get_config_value("query_result_limit")
+
+
+def _get_cached_limits():
+    # Only the limits the UI can ask for are cached, so that the number of
+    # previews of a statement is bounded
+    return set(
+        [QUERY_RESULT_LIMIT_CONFIG["default_query_result_size"]]
+        + QUERY_RESULT_LIMIT_CONFIG["query_result_size_options"]
+    )
+
+
+def _get_cache_key(statement_execution_id: int, limit: int) -> str:
+    return f"statement_execution_result_preview_{statement_execution_id}_{limit}"
+
+
+def _get_uploading_cache_key(statement_execution_id: int) -> str:
+    return f"statement_execution_uploading_result_preview_{statement_execution_id}"
+
+
+@with_redis
+def get_result_preview(
+    statement_execution_id: int, limit: int, redis_conn=None
+) -> Optional[List[List[str]]]:
+    """Get the cached preview of limit rows, None if it is not cached"""
+    try:
+        cached_result = redis_conn.get(_get_cache_key(statement_execution_id, limit))
+    except Exception as e:
+        LOG.warning(f"Failed to get result preview {statement_execution_id}: {e}")
+        return None
+    return json.loads(cached_result) if cached_result is not None else None
+
+
+@with_redis
+def set_result_preview(
+    statement_execution_id: int, limit: int, result: List[List], redis_conn=None
+):
+    """Cache the preview of a done statement, the caller
+    is responsible for checking the statement is done"""
+    if limit not in _get_cached_limits():
+        return
+
+    serialized_result = json.dumps(result)
+    if len(serialized_result.encode("utf-8")) > RESULT_PREVIEW_CACHE_MAX_SIZE:
+        return
+    try:
+        redis_conn.set(
+            _get_cache_key(statement_execution_id, limit),
+            serialized_result,
+            ex=RESULT_PREVIEW_CACHE_TIMEOUT,
+        )
+    except Exception as e:
+        LOG.warning(f"Failed to set result preview {statement_execution_id}: {e}")
+
+
+@with_redis
+def get_uploading_result_preview(
+    statement_execution_id: int, redis_conn=None
+) -> Optional[List[List[str]]]:
+    """Get the first rows of a statement that is still uploading,
+    None if they are not available"""
+    try:
+        cached_result = redis_conn.get(_get_uploading_cache_key(statement_execution_id))
+    except Exception as e:
+        LOG.warning(
+            f"Failed to get uploading result preview {statement_execution_id}: {e}"
+        )
+        return None
+    return json.loads(cached_result) if cached_result is not None else None
+
+
+@with_redis
+def set_uploading_result_preview(
+    statement_execution_id: int, result: List[List[str]], redis_conn=None
+) -> bool:
+    """Keep the column row followed by the first rows fetched while the
+    statement is uploading, returns False if the preview is too large"""
+    serialized_result = json.dumps(result)
+    if len(serialized_result.encode("utf-8")) > RESULT_PREVIEW_CACHE_MAX_SIZE:
+        return False
+    redis_conn.set(
+        _get_uploading_cache_key(statement_execution_id),
+        serialized_result,
+        ex=UPLOADING_RESULT_PREVIEW_CACHE_TIMEOUT,
+    )
+    return True
+
+
+@with_redis
+def delete_uploading_result_preview(statement_execution_id: int, redis_conn=None):
+    # The preview expires anyway, so a failure is not raised
+    try:
+        redis_conn.delete(_get_uploading_cache_key(statement_execution_id))
+    except Exception as e:
+        LOG.warning(
+            f"Failed to delete uploading result preview {statement_execution_id}: {e}"
+        )
@@ -1,10 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Generator, List, Optional
+from contextlib import closing
+from typing import BinaryIO, Generator, List, Optional, Union
+
+from clients.common import FileDoesNotExist
+from env import QuerybookSettings
+from lib.utils.compression import (
+    StreamCompressor,
+    detect_compression_codec,
+    get_compression_codec,
+    open_decompressed_stream,
+)
 
 
 class BaseUploader(ABC):
     """Base interface for result uploader"""
 
+    # Whether or not write() also accepts bytes, required for binary
+    # result formats such as the columnar result
+    SUPPORTS_BINARY = False
+
     @abstractmethod
     def __init__(self, uri: str):
         pass
@@ -27,11 +41,12 @@ class BaseUploader(ABC):
         pass
 
     @abstractmethod
-    def write(self, data: str) -> bool:
+    def write(self, data: Union[str, bytes]) -> bool:
         """Upload part of the string
 
         Arguments:
-            data {str} -- Part of the string to upload
+            data {Union[str, bytes]} -- Part of the string to upload,
+                bytes are only passed if SUPPORTS_BINARY is True
 
         Returns:
             bool -- Whether or not the upload was successful
@@ -44,6 +59,23 @@ class BaseUploader(ABC):
         """Finish the upload"""
         pass
 
+    def abort(self):
+        """Stop the upload without storing the object, called instead of
+        end() when the upload fails
+        """
+        pass
+
+    def checkpoint(self) -> Optional[int]:
+        """Mark the current position of the upload, the stored object can
+           then be read from this position with BaseReader.open_stored_stream.
+           Used to index the rows of the result.
+
+        Returns:
+            Optional[int] -- The byte offset of the position in the stored
+                object, None if the store does not support reading from it
+        """
+        return None
+
 
 class BaseReader(ABC):
     @abstractmethod
@@ -120,6 +152,39 @@ class BaseReader(ABC):
         """End the reading process"""
         pass
 
+    def open_binary_stream(self) -> BinaryIO:
+        """Open the stored object as a readonly binary file-like object,
+           the object is decompressed if it is compressed.
+           Does not require start() to be called.
+
+        Returns:
+            BinaryIO: the stream, caller is responsible for closing it
+        """
+        return open_decompressed_stream(self.open_stored_stream())
+
+    def get_stored_codec(self) -> Optional[str]:
+        """Get the compression codec of the stored object, None if it is
+        not compressed or does not exist. Only readers that implement
+        open_stored_stream support it.
+        """
+        try:
+            with closing(self.open_stored_stream()) as stream:
+                return detect_compression_codec(stream)
+        except FileDoesNotExist:
+            return None
+
+    def open_stored_stream(self, offset: int = 0) -> BinaryIO:
+        """Open the stored (possibly compressed) bytes of the object as a
+           readonly binary file-like object, starting from the byte offset
+           without reading the bytes before it. Does not require start()
+           to be called. Only readers whose uploader has SUPPORTS_BINARY
+           need to implement this.
+
+        Returns:
+            BinaryIO: the stream, caller is responsible for closing it
+        """
+        raise NotImplementedError()
+
     @property
     @abstractmethod
     def has_download_url(self):
@@ -147,3 +212,10 @@ class BaseReader(ABC):
             str: the path to resource
         """
         return None
+
+
+def get_store_compressor() -> Optional[StreamCompressor]:
+    """Get the compressor of the uploaded objects based on STORE_COMPRESSION,
+    None if they are not compressed"""
+    codec = get_compression_codec(QuerybookSettings.STORE_COMPRESSION)
+    return StreamCompressor(codec) if codec else None
@@ -4,7 +4,11 @@ from typing import Generator, List, Optional
 from env import QuerybookSettings
 from lib.result_store.stores.base_store import BaseReader, BaseUploader
 from logic import result_store
-from lib.utils.csv import str_to_csv_iter, LINE_TERMINATOR
+from lib.utils.csv import (
+    LINE_TERMINATOR,
+    iter_str_lines,
+    text_lines_to_csv_iter,
+)
 
 
 class DBReader(BaseReader):
@@ -30,7 +34,11 @@ class DBReader(BaseReader):
     def get_csv_iter(
         self, number_of_lines: Optional[int] = None
     ) -> Generator[List[List[str]], None, None]:
-        return islice(str_to_csv_iter(self.read_raw()), number_of_lines)
+        # Parse the stored value line by line so that only the lines of the
+        # returned rows are copied
+        return islice(
+            text_lines_to_csv_iter(iter_str_lines(self._text)), number_of_lines
+        )
 
     def read_lines(self, number_of_lines: int) -> List[str]:
         return self._get_first_n_lines(number_of_lines)
@@ -78,3 +86,6 @@ class DBUploader(BaseUploader):
     def end(self):
         result_store.create_key_value_store(key=self._uri, value="".join(self._chunks))
         self._reset_variables()
+
+    def abort(self):
+        self._reset_variables()
@@ -1,9 +1,16 @@
+import io
 from itertools import islice
 import os
-from typing import Optional
-from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from typing import BinaryIO, Optional, TextIO, Union
+from lib.result_store.stores.base_store import (
+    BaseReader,
+    BaseUploader,
+    get_store_compressor,
+)
 from env import QuerybookSettings
-from lib.utils.csv import str_to_csv_iter
+from lib.utils.compression import open_decompressed_stream
+from lib.utils.csv import text_lines_to_csv_iter
+from clients.common import FileDoesNotExist
 
 # to use, enable docker volume inside docker-compose.yml
 # uncomment lines `- file:/opt/store/`
@@ -23,14 +30,19 @@ def get_file_uri(raw_uri: str) -> str:
 
 
 class FileUploader(BaseUploader):
+    SUPPORTS_BINARY = True
+
     def __init__(self, uri: str):
         self.uri = get_file_uri(uri)
+        self._result_file = None
 
     def start(self):
         self._chunks_length = 0
+        self._bytes_written = 0
+        self._compressor = get_store_compressor()
         os.makedirs(self.uri_dir_path, exist_ok=True)
 
-    def write(self, data: str):
+    def write(self, data: Union[str, bytes]):
         # write each line into csv
         data_len = len(data)
         if (
@@ -40,12 +52,40 @@ class FileUploader(BaseUploader):
             return False
 
         self._chunks_length += data_len
-        with open(self.uri, "a") as result_file:
-            result_file.write(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._append(data)
         return True
 
     def end(self):
-        pass
+        try:
+            if self._compressor is not None:
+                self._append(self._compressor.flush())
+        finally:
+            if self._result_file is not None:
+                self._result_file.close()
+                self._result_file = None
+
+    def abort(self):
+        if self._result_file is not None:
+            self._result_file.close()
+            self._result_file = None
+            os.remove(self.uri)
+
+    def checkpoint(self) -> int:
+        if self._compressor is not None:
+            self._append(self._compressor.checkpoint())
+        return self._bytes_written
+
+    def _append(self, data: Union[str, bytes]):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self._result_file is None:
+            # Opened on the first write and kept open (buffered) for
+            # the rest of the upload instead of reopened for every write
+            self._result_file = open(self.uri, "wb")
+        self._result_file.write(data)
+        self._bytes_written += len(data)
 
     @property
     def uri_dir_path(self):
@@ -61,10 +101,13 @@ class FileReader(BaseReader):
         pass
 
     def get_csv_iter(self, number_of_lines: Optional[int]):
-        return islice(str_to_csv_iter(self.read_raw()), number_of_lines)
+        # The file is parsed while it is read and closed once
+        # number_of_lines rows are returned
+        with self._open_text(newline="") as result_file:
+            yield from islice(text_lines_to_csv_iter(result_file), number_of_lines)
 
     def read_lines(self, number_of_lines: int):
-        with open(self.uri) as result_file:
+        with self._open_text() as result_file:
             lines = []
             line_count = 0
             for row in result_file:
@@ -76,12 +119,26 @@ class FileReader(BaseReader):
             return lines
 
     def read_raw(self):
-        with open(self.uri) as result_file:
+        with self._open_text() as result_file:
             return result_file.read()
 
     def end(self):
         pass
 
+    def open_stored_stream(self, offset: int = 0) -> BinaryIO:
+        if not os.path.exists(self.uri):
+            raise FileDoesNotExist("{} does not exist".format(self.uri))
+        result_file = open(self.uri, "rb")
+        result_file.seek(offset)
+        return result_file
+
+    def _open_text(self, newline: Optional[str] = None) -> TextIO:
+        return io.TextIOWrapper(
+            open_decompressed_stream(open(self.uri, "rb")),
+            encoding="utf-8",
+            newline=newline,
+        )
+
     @property
     def has_download_url(self):
         return False
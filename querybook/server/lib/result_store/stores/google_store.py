@@ -1,32 +1,61 @@
-from typing import Generator, List, Optional
+from typing import BinaryIO, Generator, List, Optional, Union
 
 from clients import google_client  # Needed to patch GoogleDownloadClient in tests
 from clients.google_client import (
     GoogleUploadClient,
     GoogleKeySigner,
 )
-from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from lib.result_store.stores.base_store import (
+    BaseReader,
+    BaseUploader,
+    get_store_compressor,
+)
 from env import QuerybookSettings
+from lib.utils.compression import ZSTD, get_content_encoding
 
 
 class GoogleUploader(BaseUploader):
+    SUPPORTS_BINARY = True
+
     def __init__(self, uri: str):
         self._uri = uri
 
     def start(self):
+        self._bytes_written = 0
+        self._compressor = get_store_compressor()
         self._uploader = GoogleUploadClient(
-            QuerybookSettings.STORE_BUCKET_NAME, self.uri
+            QuerybookSettings.STORE_BUCKET_NAME,
+            self.uri,
+            content_encoding=get_content_encoding(
+                self._compressor.codec if self._compressor else None
+            ),
         )
         self._uploader.start()
 
-    def write(self, data: str) -> bool:
-        self._uploader.write(data.encode())
+    def write(self, data: Union[str, bytes]) -> bool:
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._upload(data if isinstance(data, bytes) else data.encode())
         return True
 
     def end(self):
+        if self._compressor is not None:
+            self._upload(self._compressor.flush())
         self._uploader.stop()
         self._uploader = None
 
+    def abort(self):
+        self._uploader.abort()
+        self._uploader = None
+
+    def checkpoint(self) -> int:
+        if self._compressor is not None:
+            self._upload(self._compressor.checkpoint())
+        return self._bytes_written
+
+    def _upload(self, data: bytes):
+        self._bytes_written += self._uploader.write(data)
+
     @property
     def is_uploading(self):
         return self._uploader is not None
@@ -67,9 +96,16 @@ class GoogleReader(BaseReader):
     def end(self):
         self._reader = None
 
+    def open_stored_stream(self, offset: int = 0) -> BinaryIO:
+        return google_client.open_google_blob(
+            QuerybookSettings.STORE_BUCKET_NAME, self.uri, offset=offset
+        )
+
     @property
     def has_download_url(self):
-        return True
+        # zstd results are not decoded by browsers, so they are
+        # decompressed by the server instead
+        return self.get_stored_codec() != ZSTD
 
     def get_download_url(self, custom_name=None):
         signed_url_params = {}
@@ -1,28 +1,68 @@
-from typing import Generator, List, Optional
+from typing import BinaryIO, Generator, List, Optional, Union
 
-from lib.result_store.stores.base_store import BaseReader, BaseUploader
+from lib.result_store.stores.base_store import (
+    BaseReader,
+    BaseUploader,
+    get_store_compressor,
+)
 from env import QuerybookSettings
+from lib.utils.compression import ZSTD, get_content_encoding
 from clients import s3_client  # Needed to patch S3FileReader in tests
 from clients.s3_client import MultiPartUploader, S3KeySigner
 
 
 class S3Uploader(BaseUploader):
+    SUPPORTS_BINARY = True
+
     def __init__(self, uri: str):
         self._uploader = None
+        self._compressor = None
         self._uri = uri
 
     def start(self):
+        self._bytes_written = 0
+        self._compressor = get_store_compressor()
         self._uploader = MultiPartUploader(
-            QuerybookSettings.STORE_BUCKET_NAME, self.uri
+            QuerybookSettings.STORE_BUCKET_NAME,
+            self.uri,
+            content_encoding=get_content_encoding(
+                self._compressor.codec if self._compressor else None
+            ),
         )
 
-    def write(self, data: str) -> bool:
-        return self._uploader.write(data)
+    def write(self, data: Union[str, bytes]) -> bool:
+        if self._compressor is None:
+            return self._upload(data.encode("utf-8") if isinstance(data, str) else data)
+
+        # Once the part limit is reached, the data buffered in the compressor
+        # is dropped and the object ends with a truncated (still readable) stream
+        compressed = self._compressor.compress(data)
+        # The compressor can buffer the whole data
+        return self._upload(compressed) if len(compressed) else True
 
     def end(self):
+        if self._compressor is not None:
+            self._upload(self._compressor.flush())
         self._uploader.complete()
         self._uploader = None
 
+    def abort(self):
+        self._uploader.abort()
+        self._uploader = None
+
+    def checkpoint(self) -> Optional[int]:
+        if self._compressor is not None and not self._upload(
+            self._compressor.checkpoint()
+        ):
+            return None
+        return self._bytes_written
+
+    def _upload(self, data: bytes) -> bool:
+        did_upload = self._uploader.write(data)
+        if did_upload:
+            self._bytes_written += len(data)
+        return did_upload
+
     @property
     def is_uploading(self):
         return self._uploader is not None
@@ -63,9 +103,16 @@ class S3Reader(BaseReader):
     def end(self):
         self._reader = None
 
+    def open_stored_stream(self, offset: int = 0) -> BinaryIO:
+        return s3_client.open_s3_object(
+            QuerybookSettings.STORE_BUCKET_NAME, self.uri, offset=offset
+        )
+
     @property
     def has_download_url(self):
-        return True
+        # zstd results are not decoded by browsers, so they are
+        # decompressed by the server instead
+        return self.get_stored_codec() != ZSTD
 
     def get_download_url(self, custom_name=None):
         url_params = {}
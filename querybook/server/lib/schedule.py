@@ -4,4 +4,13 @@ ALL_PLUGIN_JOBS = import_module_with_default(
     "job_plugin", "ALL_PLUGIN_JOBS", default={}
 )
 
-ALL_JOBS = {**{}, **ALL_PLUGIN_JOBS}
+ALL_JOBS = {
+    **{
+        # Reindex the items queued by queue_sync_elasticsearch
+        "flush_sync_elasticsearch_queue": {
+            "task": "tasks.sync_elasticsearch.flush_sync_elasticsearch_queue",
+            "schedule": "* * * * *",
+        },
+    },
+    **ALL_PLUGIN_JOBS,
+}
@@ -10,7 +10,7 @@ class InvalidScheduleException(Exception):
     pass
 
 
-valid_schedule_config_keys = ["exports", "notifications"]
+valid_schedule_config_keys = ["exports", "notifications", "parallel_cells"]
 valid_export_config_keys = ["exporter_cell_id", "exporter_name", "exporter_params"]
 valid_notification_keys = ["with", "on", "config"]
 valid_notification_config_keys = ["to", "to_user"]
@@ -21,6 +21,8 @@ def validate_datadoc_schedule_config(schedule_config):
         validate_dict_keys(schedule_config, valid_schedule_config_keys)
         validate_notifications_config(schedule_config.get("notifications", []))
         validate_exporters_config(schedule_config.get("exports", []))
+        if not isinstance(schedule_config.get("parallel_cells", False), bool):
+            raise InvalidScheduleException("parallel_cells must be a boolean")
     except InvalidScheduleException as e:
         return False, str(e)
     return True, ""
@@ -21,7 +21,21 @@ def update_model_fields(
     Returns:
         bool -- Whether or not the model got updated
     """
-    model_updated = False
+    changed_field_names = update_model_fields_and_get_changed(
+        model, skip_if_value_none=skip_if_value_none, field_names=field_names, **fields
+    )
+    return len(changed_field_names) > 0
+
+
+def update_model_fields_and_get_changed(
+    model, skip_if_value_none=False, field_names: List[str] = None, **fields
+) -> List[str]:
+    """Same as update_model_fields
+
+    Returns:
+        List[str] -- The names of the fields whose value changed
+    """
+    changed_field_names = []
 
     if field_names is None:
         field_names = fields.keys()
@@ -36,9 +50,9 @@ def update_model_fields(
 
         if getattr(model, key) != value:
             setattr(model, key, value)
-            model_updated = True
+            changed_field_names.append(key)
 
-    return model_updated
+    return changed_field_names
 
 
 class SerializeMixin:
@@ -9,6 +9,10 @@ SQL_SESSION_FAILURES = "sql_session.failures"
 TASK_FAILURES = "task.failures"
 REDIS_OPERATIONS = "redis.operations"
 QUERY_EXECUTIONS = "query.executions"
+QUERY_EXECUTION_POLLS = "query.polls"
+QUERY_EXECUTION_POLL_LATENCY = "query.poll_latency"
+QUERY_EXECUTION_POLL_INTERVAL = "query.poll_interval"
+QUERY_EXECUTION_RESULT_CACHE = "query.result_cache"
 
 
 logger_name = QuerybookSettings.STATS_LOGGER_NAME
@@ -1,4 +1,5 @@
 import tempfile
+from contextlib import closing
 from typing import Tuple
 import re
 from abc import abstractmethod
@@ -8,8 +9,10 @@ import numpy as np
 
 from app.db import with_session
 from clients.s3_client import S3FileCopier
-from clients.s3_client import MultiPartUploader
+from clients.s3_client import MultiPartUploader, open_s3_object
+from env import QuerybookSettings
 
+from lib.utils.compression import detect_compression_codec
 from lib.utils.execute_query import ExecuteQuery
 from lib.table_upload.common import ImporterResourceType
 from logic.admin import get_query_engine_by_id
@@ -184,7 +187,15 @@ class S3CSVExporter(S3BaseExporter):
         resource_type, resource_path = importer.get_resource_path()
 
         # If from s3 -> s3 is possible, do copy which is a lot faster
-        if resource_type == ImporterResourceType.S3:
+        can_copy = resource_type == ImporterResourceType.S3
+        if can_copy:
+            # Compressed results can't be copied since the table reads plain csv
+            with closing(
+                open_s3_object(QuerybookSettings.STORE_BUCKET_NAME, resource_path)
+            ) as stream:
+                can_copy = detect_compression_codec(stream) is None
+
+        if can_copy:
             self._copy_to_s3(resource_path)
         else:
             # Otherwise use Pandas DF to do all the work
@@ -0,0 +1,241 @@
+import io
+import zlib
+from typing import BinaryIO, Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+COMPRESSION_CODECS = (GZIP, ZSTD)
+
+# Compressed streams are recognized by their first bytes, so objects
+# written before compression was enabled can still be read as is.
+# Neither magic number is valid utf-8, so text is never mistaken for them
+_MAGIC_NUMBERS = {
+    GZIP: b"\x1f\x8b",
+    ZSTD: b"\x28\xb5\x2f\xfd",
+}
+_MAGIC_NUMBER_LENGTH = max(len(magic) for magic in _MAGIC_NUMBERS.values())
+
+# Using 16 + MAX_WBITS makes zlib read and write gzip headers
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+# Raw deflate without headers, used to read a gzip stream from a checkpoint
+_DEFLATE_WBITS = -zlib.MAX_WBITS
+
+
+def get_compression_codec(codec: Optional[str]) -> Optional[str]:
+    """Validate the compression codec name, None means no compression
+
+    Raises:
+        ValueError: if the codec is unknown or its library is not installed
+    """
+    if not codec or str(codec).lower() in ("none", "null"):
+        return None
+
+    codec = str(codec).lower()
+    if codec not in COMPRESSION_CODECS:
+        raise ValueError(
+            f"Unknown compression {codec}, "
+            f"should be one of {', '.join(COMPRESSION_CODECS)}"
+        )
+    if codec == ZSTD and zstandard is None:
+        raise ValueError("zstandard is not installed, it is needed for zstd")
+    return codec
+
+
+def get_content_encoding(codec: Optional[str]) -> Optional[str]:
+    """Content-Encoding of an object compressed with the codec. Browsers
+    decode gzip when downloading it, but not zstd, so zstd objects have no
+    Content-Encoding and are decompressed by the server instead"""
+    return codec if codec == GZIP else None
+
+
+def detect_compression_codec(stream: BinaryIO) -> Optional[str]:
+    """Read the first bytes of the stream to detect its codec,
+    None if it is not compressed"""
+    head = stream.read(_MAGIC_NUMBER_LENGTH)
+    for codec, magic in _MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+class StreamCompressor(object):
+    """Compress a stream of str/bytes written in arbitrary pieces"""
+
+    def __init__(self, codec: str):
+        self.codec = codec
+        if codec == GZIP:
+            self._compressor = zlib.compressobj(wbits=_GZIP_WBITS)
+        elif codec == ZSTD:
+            self._compressor = zstandard.ZstdCompressor().compressobj()
+        else:
+            raise ValueError(f"Unknown compression {codec}")
+
+    def compress(self, data: Union[str, bytes]) -> bytes:
+        """Compress the data, the returned bytes can be empty
+        since the compressor buffers its input"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """End the stream and return the remaining compressed bytes"""
+        return self._compressor.flush()
+
+    def checkpoint(self) -> bytes:
+        """Flush the compressed bytes so that the stream can also be
+        decompressed starting from the current position, see the
+        checkpoint_codec of StreamDecompressor
+        """
+        if self.codec == GZIP:
+            # Resets the compression state, the rest of the stream does not
+            # refer to the data before the checkpoint
+            return self._compressor.flush(zlib.Z_FULL_FLUSH)
+
+        # Start a new zstd frame, a stream can have multiple frames
+        compressed = self._compressor.flush()
+        self._compressor = zstandard.ZstdCompressor().compressobj()
+        return compressed
+
+
+class StreamDecompressor(object):
+    """Decompress a stream fed in arbitrary pieces.
+
+    The codec is detected from the magic number at the start of the stream,
+    a stream without a known magic number is returned unchanged.
+    Concatenated gzip members/zstd frames are decompressed one after another.
+    """
+
+    def __init__(self, checkpoint_codec: Optional[str] = None):
+        """
+        Args:
+            checkpoint_codec (Optional[str]): Set if the stream starts at a
+                StreamCompressor.checkpoint() of a stream compressed with
+                this codec instead of the start of the compressed stream
+        """
+        self.codec = None
+        self._decompressor = None
+        # Bytes kept until there is enough of them to detect the codec
+        self._head = b""
+        self._detected = False
+        # Whether or not the rest of the stream is ignored
+        self._ended = False
+        # There is no gzip header at a checkpoint, so the stream is read
+        # as raw deflate and the gzip footer that follows is ignored
+        self._ended_at_eof = checkpoint_codec == GZIP
+        if checkpoint_codec == GZIP:
+            self.codec = GZIP
+            self._decompressor = zlib.decompressobj(wbits=_DEFLATE_WBITS)
+            self._detected = True
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._ended:
+            return b""
+
+        if not self._detected:
+            self._head += data
+            if len(self._head) < _MAGIC_NUMBER_LENGTH:
+                return b""
+            data = self._head
+            self._head = b""
+            self._detect_codec(data)
+
+        if self._decompressor is None:
+            return data
+
+        decompressed = self._decompressor.decompress(data)
+        if self._decompressor.eof:
+            unused_data = self._decompressor.unused_data
+            if self._ended_at_eof:
+                self._ended = True
+            else:
+                # Another gzip member/zstd frame may follow
+                self.codec = None
+                self._decompressor = None
+                self._detected = False
+                if len(unused_data):
+                    decompressed += self.decompress(unused_data)
+        return decompressed
+
+    def flush(self) -> bytes:
+        """Called at the end of the stream to return the remaining bytes"""
+        if self._ended:
+            return b""
+
+        if not self._detected:
+            # The stream is shorter than any magic number
+            data = self._head
+            self._head = b""
+            self._detect_codec(data)
+            return self.decompress(data)
+
+        if self.codec == GZIP:
+            return self._decompressor.flush()
+        return b""
+
+    def _detect_codec(self, head: bytes):
+        self._detected = True
+        for codec, magic in _MAGIC_NUMBERS.items():
+            if head.startswith(magic):
+                self.codec = codec
+                break
+
+        if self.codec == GZIP:
+            self._decompressor = zlib.decompressobj(wbits=_GZIP_WBITS)
+        elif self.codec == ZSTD:
+            if zstandard is None:
+                raise ValueError("zstandard is not installed, it is needed for zstd")
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+
+class DecompressedStream(io.RawIOBase):
+    """Readonly binary stream of the decompressed content of another stream"""
+
+    def __init__(
+        self,
+        raw: BinaryIO,
+        read_size: int = io.DEFAULT_BUFFER_SIZE,
+        checkpoint_codec: Optional[str] = None,
+    ):
+        self._raw = raw
+        self._read_size = read_size
+        self._decompressor = StreamDecompressor(checkpoint_codec=checkpoint_codec)
+        self._buffer = b""
+        self._buffer_pos = 0
+        self._raw_eof = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b) -> int:
+        while self._buffer_pos >= len(self._buffer) and not self._raw_eof:
+            data = self._raw.read(self._read_size)
+            if data:
+                self._buffer = self._decompressor.decompress(data)
+            else:
+                self._raw_eof = True
+                self._buffer = self._decompressor.flush()
+            self._buffer_pos = 0
+
+        size = min(len(b), len(self._buffer) - self._buffer_pos)
+        b[:size] = self._buffer[self._buffer_pos : self._buffer_pos + size]
+        self._buffer_pos += size
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+def open_decompressed_stream(
+    raw: BinaryIO, checkpoint_codec: Optional[str] = None
+) -> BinaryIO:
+    """Wrap a binary stream so that it reads its decompressed content,
+    uncompressed content is read as is. See StreamDecompressor for
+    checkpoint_codec"""
+    return io.BufferedReader(DecompressedStream(raw, checkpoint_codec=checkpoint_codec))
@@ -2,8 +2,9 @@ import csv
 import datetime
 from io import StringIO
 import json
+import math
 import sys
-from typing import Generator, List, Tuple
+from typing import Generator, Iterable, List, Tuple
 
 from .utils import DATE_STRING, DATETIME_STRING
 
@@ -23,6 +24,64 @@ def str_to_csv_iter(raw_csv_str: str) -> Generator[List[List[str]], None, None]:
     return csv.reader(raw_results, delimiter=",")
 
 
+def iter_str_lines(raw_str: str) -> Generator[str, None, None]:
+    """Lazily split the string into lines that keep their line terminator,
+    unlike str.splitlines/StringIO it does not copy the whole string upfront
+    """
+    start = 0
+    str_len = len(raw_str)
+    while start < str_len:
+        end = raw_str.find(LINE_TERMINATOR, start)
+        end = str_len if end == -1 else end + 1
+        yield raw_str[start:end]
+        start = end
+
+
+def text_lines_to_csv_iter(
+    lines: Iterable[str],
+) -> Generator[List[str], None, None]:
+    """Parse the csv rows of lines that keep their line terminator,
+       e.g. the lines of a text file opened with newline="".
+       Nothing is read ahead of the parsed rows.
+
+    Args:
+        lines (Iterable[str]): Lines that end with their line terminator
+
+    Returns:
+        Generator[List[str], None, None]: the parsed rows
+    """
+    # Remove NULL byte to make sure csv conversion works
+    return csv.reader((line.replace("\x00", "") for line in lines), delimiter=",")
+
+
+def lines_to_csv_iter(lines: Iterable[str]) -> Generator[List[str], None, None]:
+    """Parse the csv rows while the lines are read, quoted cells can span
+       multiple lines. A row that is not complete when the lines end
+       (e.g. the lines were cut inside a quoted cell) is dropped.
+
+    Args:
+        lines (Iterable[str]): Lines that do not have \n in them
+
+    Yields:
+        List[str]: the parsed rows
+    """
+    lines_ended = False
+
+    def terminated_lines():
+        nonlocal lines_ended
+        for line in lines:
+            # Remove NULL byte to make sure csv conversion works
+            yield line.replace("\x00", "") + LINE_TERMINATOR
+        lines_ended = True
+
+    # csv.reader keeps the state of a quoted cell from one line to the next
+    for row in csv.reader(terminated_lines(), delimiter=","):
+        if lines_ended:
+            # The row was ended by the end of the lines, not by a line end
+            return
+        yield row
+
+
 def string_to_csv(raw_csv_str: str) -> List[List[str]]:
     csv_reader = str_to_csv_iter(raw_csv_str)
     return [row for row in csv_reader]
@@ -62,6 +121,126 @@ def row_to_csv(row):
     return ",".join(output) + "\n"
 
 
+_NoneType = type(None)
+# Column types that csv.writer serializes the same way as serialize_cell
+# once None is replaced, floats need to be finite (no NaN/Infinity)
+_STR_COLUMN_TYPES = {str, _NoneType}
+_NUMBER_COLUMN_TYPES = {int, float, _NoneType}
+_BOOL_COLUMN_TYPES = {bool, _NoneType}
+
+_NULL_TO_STR = {None: "null"}
+_BOOL_TO_STR = {None: "null", True: "true", False: "false"}
+
+
+def _without_carriage_return(column):
+    # csv.writer only quotes \r if it is in the line terminator
+    return None if "\r" in "".join(column) else column
+
+
+def _serialize_str_column(column):
+    if None in column:
+        column = list(map(_NULL_TO_STR.get, column, column))
+    return _without_carriage_return(column)
+
+
+def _serialize_number_column(column):
+    try:
+        # filter skips None (and zeros), NaN and Infinity propagate in the sum
+        if not math.isfinite(sum(filter(None, column))):
+            return None
+    except OverflowError:
+        return None
+    if None in column:
+        column = list(map(_NULL_TO_STR.get, column, column))
+    return column
+
+
+def _serialize_bool_column(column):
+    return list(map(_BOOL_TO_STR.__getitem__, column))
+
+
+def _serialize_datetime_column(column):
+    return list(map(datetime.datetime.isoformat, column))
+
+
+def _serialize_other_column(column):
+    return _without_carriage_return(list(map(serialize_cell, column)))
+
+
+class CSVBatchSerializer(object):
+    """Serialize chunks of rows to csv, produces the same output as
+    calling row_to_csv on each row, but lets the C csv.writer do the work.
+
+    A per column plan is computed from the types seen in the first chunk,
+    str, number and bool columns are converted with C level map/join
+    calls only. Every chunk is checked against the plan, which is widened
+    if new types show up.
+    """
+
+    def __init__(self):
+        self._column_types = None  # List[Set[type]]
+        self._column_serializers = None
+
+        self._buffer = StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator=LINE_TERMINATOR)
+
+    @staticmethod
+    def _get_column_serializer(column_types):
+        if column_types <= _STR_COLUMN_TYPES:
+            return _serialize_str_column
+        elif column_types <= _BOOL_COLUMN_TYPES:
+            return _serialize_bool_column
+        elif column_types <= _NUMBER_COLUMN_TYPES:
+            return _serialize_number_column
+        elif column_types == {datetime.datetime}:
+            return _serialize_datetime_column
+        return _serialize_other_column
+
+    def _update_plan(self, columns):
+        if self._column_types is None:
+            self._column_types = [set() for _ in columns]
+            self._column_serializers = [None] * len(columns)
+
+        for idx, column in enumerate(columns):
+            column_types = set(map(type, column))
+            if not column_types <= self._column_types[idx]:
+                self._column_types[idx] |= column_types
+                self._column_serializers[idx] = self._get_column_serializer(
+                    self._column_types[idx]
+                )
+
+    def serialize(self, rows: List[List]) -> str:
+        if len(rows) == 0:
+            return ""
+
+        # csv.writer quotes single empty cell rows, unlike row_to_csv
+        row_lengths = set(map(len, rows))
+        if len(row_lengths) != 1 or row_lengths.pop() < 2:
+            return self._slow_serialize(rows)
+
+        columns = list(zip(*rows))
+        self._update_plan(columns)
+
+        serialized_columns = []
+        for column, serializer in zip(columns, self._column_serializers):
+            serialized_column = serializer(column)
+            if serialized_column is None:
+                return self._slow_serialize(rows)
+            serialized_columns.append(serialized_column)
+
+        try:
+            self._writer.writerows(zip(*serialized_columns))
+            return self._buffer.getvalue()
+        except csv.Error:
+            return self._slow_serialize(rows)
+        finally:
+            self._buffer.seek(0)
+            self._buffer.truncate(0)
+
+    def _slow_serialize(self, rows: List[List]) -> str:
+        return "".join(map(row_to_csv, rows))
+
+
 def csv_sniffer(lines: List[str]) -> int:
     """Given n number of lines, figure out
        the last valid line for a csv. The CSV
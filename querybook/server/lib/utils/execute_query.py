@@ -1,6 +1,7 @@
 from app.db import with_session
 from logic.admin import get_query_engine_by_id
 from lib.query_executor.all_executors import get_executor_class
+from lib.query_executor.client_pool import get_client_pool, has_session_statement
 from lib.query_executor.executor_factory import get_client_setting_from_engine
 from lib.query_analysis.statements import get_statements
 
@@ -48,12 +49,22 @@ class ExecuteQuery(object):
             # Empty statement, return None
             return None
 
-        cursor = self.executor._get_client(client_settings).cursor()
-        if self._async:
-            self._async_run(cursor, statements)
-            return None
-        else:
-            return self._sync_run(cursor, statements)
+        client = get_client_pool().acquire(self.executor, client_settings)
+        try:
+            cursor = client.cursor()
+            if self._async:
+                self._async_run(client, cursor, statements)
+                return None
+            else:
+                result = self._sync_run(cursor, statements)
+        except Exception:
+            get_client_pool().release(client, reusable=False)
+            raise
+
+        get_client_pool().release(
+            client, reusable=not has_session_statement(statements)
+        )
+        return result
 
     def _sync_run(self, cursor, statements):
         for statement in statements[:-1]:
@@ -63,10 +74,23 @@ class ExecuteQuery(object):
         cursor.poll_until_finish(self._poll_interval)
         return cursor.get()
 
-    def _async_run(self, cursor, statements):
+    def _async_run(self, client, cursor, statements):
+        self._set_async_parameters()
+        self._client = client
         self._cursor = cursor
         self._statements = statements
-        self._set_async_parameters()
+
+    def _release_client(self, reusable: bool):
+        if self._client is not None:
+            get_client_pool().release(self._client, reusable=reusable)
+            self._client = None
+
+    def close(self):
+        """Release the client of an async query that is not polled
+        until it finishes, e.g. if the task polling it fails
+        """
+        if self._async:
+            self._release_client(reusable=False)
 
     def poll(self) -> bool:
         """
@@ -80,6 +104,17 @@ class ExecuteQuery(object):
         if self._cur_index >= len(self._statements):
             return True
 
+        try:
+            is_query_finished = self._poll()
+        except Exception:
+            self._release_client(reusable=False)
+            raise
+
+        if is_query_finished:
+            self._release_client(reusable=not has_session_statement(self._statements))
+        return is_query_finished
+
+    def _poll(self) -> bool:
         # Start the query if progress is not set yet
         if len(self._progress) <= self._cur_index:
             self._cursor.run(self._statements[self._cur_index])
@@ -121,6 +156,7 @@ class ExecuteQuery(object):
         return self._result
 
     def _set_async_parameters(self):
+        self._client = None
         self._progress = []
         self._cur_index = 0
         self._result = None
@@ -4,9 +4,11 @@ from app.db import with_session
 from const.elasticsearch import ElasticsearchItem
 from models.board import Board, BoardItem, BoardEditor
 from models.access_request import AccessRequest
+from models.metastore import DataTable
 from lib.sqlalchemy import update_model_fields
-from tasks.sync_elasticsearch import sync_elasticsearch
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 from logic.generic_permission import get_all_groups_and_group_members_with_access
 
 
@@ -194,7 +196,7 @@ def get_boards_from_board_item(
 
 
 def update_es_boards_by_id(board_id: int):
-    sync_elasticsearch.apply_async(args=[ElasticsearchItem.boards.value, board_id])
+    queue_sync_elasticsearch(ElasticsearchItem.boards.value, board_id)
 
 
 @with_session
@@ -207,6 +209,24 @@ def get_all_public_boards(environment_id, session=None):
     )
 
 
+@with_session
+def get_boards_after_id(after_id=0, limit=100, session=None):
+    """Get the next page of boards ordered by id, with the relationships
+    needed for search indexing loaded in the same round trip."""
+    return (
+        session.query(Board)
+        .options(
+            selectinload(Board.docs),
+            selectinload(Board.tables).joinedload(DataTable.data_schema),
+            selectinload(Board.editors),
+        )
+        .filter(Board.id > after_id)
+        .order_by(Board.id)
+        .limit(limit)
+        .all()
+    )
+
+
 @with_session
 def update_board_item(id, session=None, **fields):
     board = BoardItem.update(
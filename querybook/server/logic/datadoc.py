@@ -1,12 +1,14 @@
 import datetime
+from typing import List
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.db import with_session
 from const.data_doc import DataCellType
 from const.elasticsearch import ElasticsearchItem
 from const.impression import ImpressionItemType
 from const.query_execution import QueryExecutionStatus
-from lib.sqlalchemy import update_model_fields
+from lib.sqlalchemy import update_model_fields, update_model_fields_and_get_changed
 from lib.data_doc.data_cell import cell_types, sanitize_data_cell_meta
 from logic.query_execution import get_last_query_execution_from_cell
 from logic.generic_permission import get_all_groups_and_group_members_with_access
@@ -24,7 +26,7 @@ from models.datadoc import (
 from models.access_request import AccessRequest
 from models.impression import Impression
 from models.query_execution import QueryExecution
-from tasks.sync_elasticsearch import sync_elasticsearch
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 from tasks.sync_es_queries_by_datadoc import (
     sync_es_queries_by_datadoc_id,
     sync_es_query_cells_by_datadoc_id,
@@ -140,24 +142,25 @@ def update_data_doc(id, commit=True, session=None, **fields):
     if not data_doc:
         return
 
-    updated = update_model_fields(
+    updated_fields = update_model_fields_and_get_changed(
         data_doc,
         skip_if_value_none=True,
         field_names=["public", "archived", "owner_uid", "title", "meta"],
         **fields,
     )
 
-    if updated:
+    if updated_fields:
         data_doc.updated_at = datetime.datetime.now()
 
         if commit:
             session.commit()
 
-            if any(
-                field_name in fields
-                for field_name in ["public", "archived", "owner_uid", "title"]
-            ):
+            if "archived" in updated_fields:
                 update_es_data_doc_by_id(data_doc.id)
+            else:
+                es_fields = get_data_doc_es_fields(updated_fields)
+                if es_fields:
+                    update_es_data_doc_by_id(data_doc.id, fields=es_fields)
 
             # update es queries if doc is switched between public/private
             if "public" in fields:
@@ -187,12 +190,15 @@ def get_data_doc_by_user(uid, environment_id, offset, limit, session=None):
 
 
 @with_session
-def get_all_data_docs(offset=0, limit=100, session=None):
+def get_data_docs_after_id(after_id=0, limit=100, session=None):
+    """Get the next page of unarchived data docs ordered by id,
+    with their cells loaded in the same round trip."""
     return (
         session.query(DataDoc)
+        .options(selectinload(DataDoc.cells))
         .filter_by(archived=False)
-        .order_by(DataDoc.id.desc())
-        .offset(offset)
+        .filter(DataDoc.id > after_id)
+        .order_by(DataDoc.id)
         .limit(limit)
         .all()
     )
@@ -362,7 +368,7 @@ def update_data_cell(
 
         if commit:
             session.commit()
-            update_es_data_doc_by_id(data_cell.doc.id)
+            update_es_data_doc_by_id(data_cell.doc.id, fields=["cells"])
 
             if data_cell.cell_type == DataCellType.query:
                 update_es_query_cell_by_id(data_cell.id)
@@ -439,7 +445,7 @@ def insert_data_doc_cell(data_doc_id, cell_id, index, commit=True, session=None)
 
     if commit:
         session.commit()
-        update_es_data_doc_by_id(data_doc_id)
+        update_es_data_doc_by_id(data_doc_id, fields=["cells"])
 
         if data_cell.cell_type == DataCellType.query:
             update_es_query_cell_by_id(data_cell.id)
@@ -474,7 +480,7 @@ def delete_data_doc_cell(data_doc_id, data_cell_id, commit=True, session=None):
 
     if commit:
         session.commit()
-        update_es_data_doc_by_id(data_doc_id)
+        update_es_data_doc_by_id(data_doc_id, fields=["cells"])
         update_es_query_cell_by_id(data_cell_id)
 
 
@@ -527,7 +533,7 @@ def move_data_doc_cell(data_doc_id, from_index, to_index, commit=True, session=N
 
     if commit:
         session.commit()
-        update_es_data_doc_by_id(data_doc.id)
+        update_es_data_doc_by_id(data_doc.id, fields=["cells"])
     return data_doc
 
 
@@ -599,8 +605,8 @@ def move_data_doc_cell_to_doc(cell_id, data_doc_id, index, commit=True, session=
 
     if commit:
         session.commit()
-        update_es_data_doc_by_id(data_doc.id)
-        update_es_data_doc_by_id(old_data_doc.id)
+        update_es_data_doc_by_id(data_doc.id, fields=["cells"])
+        update_es_data_doc_by_id(old_data_doc.id, fields=["cells"])
 
         data_cell = get_data_cell_by_id(datadoc_datacell.data_cell_id, session=session)
         if data_cell.cell_type == DataCellType.query:
@@ -903,7 +909,7 @@ def create_data_doc_editor(
     session.add(editor)
     if commit:
         session.commit()
-        update_es_data_doc_by_id(editor.data_doc_id)
+        update_es_data_doc_by_id(editor.data_doc_id, fields=["readable_user_ids"])
         update_es_queries_by_datadoc_id(editor.data_doc_id)
     else:
         session.flush()
@@ -941,7 +947,7 @@ def delete_data_doc_editor(id, doc_id, session=None, commit=True):
     session.query(DataDocEditor).filter_by(id=id).delete()
     if commit:
         session.commit()
-        update_es_data_doc_by_id(doc_id)
+        update_es_data_doc_by_id(doc_id, fields=["readable_user_ids"])
         update_es_queries_by_datadoc_id(doc_id)
 
 
@@ -1043,8 +1049,27 @@ def get_unarchived_query_cell_by_id(id, session=None):
     )
 
 
-def update_es_data_doc_by_id(id):
-    sync_elasticsearch.apply_async(args=[ElasticsearchItem.datadocs.value, id])
+# Search document fields that depend on each DataDoc column
+DATA_DOC_ES_FIELDS_BY_COLUMN = {
+    "title": ["title"],
+    "public": ["public", "readable_user_ids"],
+    "owner_uid": ["owner_uid", "readable_user_ids"],
+}
+
+
+def get_data_doc_es_fields(column_names: List[str]) -> List[str]:
+    return sorted(
+        {
+            es_field
+            for column_name in column_names
+            for es_field in DATA_DOC_ES_FIELDS_BY_COLUMN.get(column_name, [])
+        }
+    )
+
+
+def update_es_data_doc_by_id(id, fields: List[str] = None):
+    """fields are the search document fields to update, all of them if None"""
+    queue_sync_elasticsearch(ElasticsearchItem.datadocs.value, id, fields=fields)
 
 
 def update_es_queries_by_datadoc_id(id):
@@ -1056,7 +1081,7 @@ def update_es_query_cells_by_data_doc_id(id):
 
 
 def update_es_query_cell_by_id(id):
-    sync_elasticsearch.apply_async(args=[ElasticsearchItem.query_cells.value, id])
+    queue_sync_elasticsearch(ElasticsearchItem.query_cells.value, id)
 
 
 @with_session
@@ -1089,14 +1114,18 @@ def get_query_executions_by_data_doc_id(id, session=None):
 
 
 @with_session
-def get_all_query_cells(offset=0, limit=100, session=None):
+def get_query_cells_after_id(after_id=0, limit=100, session=None):
+    """Get the next page of query cells in unarchived data docs ordered by id,
+    with their data doc loaded in the same round trip."""
     return (
         session.query(DataCell)
+        .options(joinedload(DataCell.doc))
         .filter_by(cell_type=DataCellType.query)
         .join(DataDocDataCell)
         .join(DataDoc)
         .filter(DataDoc.archived.is_(False))
-        .offset(offset)
+        .filter(DataCell.id > after_id)
+        .order_by(DataCell.id)
         .limit(limit)
         .all()
     )
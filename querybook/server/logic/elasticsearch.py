@@ -1,14 +1,24 @@
 import math
 import re
 import time
+from collections import defaultdict
 from html import escape
 from itertools import chain
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from elasticsearch.helpers import streaming_bulk
 
 from app.db import with_session
+from clients.redis_client import get_redis
 from const.ai_assistant import DEFAULT_SAMPLE_QUERY_COUNT
+from const.elasticsearch import (
+    ELASTICSEARCH_SYNC_ALL_FIELDS,
+    ELASTICSEARCH_SYNC_QUEUE_FIELDS_KEY_PREFIX,
+    ELASTICSEARCH_SYNC_QUEUE_KEY,
+)
 from const.impression import ImpressionItemType
 from const.query_execution import QueryExecutionStatus
+from env import QuerybookSettings
 from lib.elasticsearch.search_query import construct_query_search_query
 from lib.elasticsearch.search_utils import (
     ES_CONFIG,
@@ -22,33 +32,52 @@ from lib.richtext import richtext_to_plaintext
 from lib.utils.utils import DATETIME_TO_UTC, with_exception
 from logic import admin as admin_logic
 from logic import datadoc as datadoc_logic
+from logic.board import get_boards_after_id
 from logic.datadoc import (
-    get_all_data_docs,
-    get_all_query_cells,
     get_data_cell_by_query_execution_id,
     get_data_doc_by_id,
+    get_data_docs_after_id,
+    get_query_cells_after_id,
     get_unarchived_query_cell_by_id,
 )
 from logic.impression import (
     get_last_impressions_date,
     get_viewers_count_by_item_after_date,
+    get_viewers_count_by_items_after_date,
 )
 from logic.metastore import (
-    get_all_table,
     get_table_by_id,
     get_table_query_samples_count,
+    get_tables_after_id,
+    get_tables_query_samples_count,
 )
 from logic.query_execution import (
     get_query_execution_by_id,
-    get_successful_adhoc_query_executions,
-    get_successful_query_executions_by_data_cell_id,
+    get_successful_adhoc_query_executions_after_id,
+    get_successful_query_executions_by_data_cell_ids_after_id,
 )
 from models.board import Board
 from models.datadoc import DataCellType
 from models.user import User
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 
 LOG = get_logger(__file__)
 
+# Bulk requests are retried with backoff when ES is overloaded (429)
+ES_BULK_MAX_RETRIES = 5
+# Only the first failed documents of a bulk indexing are logged in details
+ES_BULK_MAX_LOGGED_ERRORS = 10
+# Set during a reindex, maps an alias to the index being built
+ES_REINDEX_KEY_PREFIX = "es_reindex_"
+ES_REINDEX_KEY_TIMEOUT = 24 * 60 * 60
+# Ids of the documents updated during a reindex
+ES_REINDEX_UPDATES_KEY_PREFIX = "es_reindex_updates_"
+ES_REINDEX_REPLAY_BATCH_SIZE = 1000
+# Max number of queued items reindexed per bulk request by flush_sync_queue
+ES_SYNC_QUEUE_BATCH_SIZE = 1000
+# Table fields that require the (costly) table weight
+TABLE_WEIGHT_FIELDS = ("completion_name", "importance_score")
+
 
 def _get_dict_by_field(
     field_to_getter: Dict[str, Any], fields: Optional[List[str]] = None
@@ -93,57 +122,60 @@ def _get_table_names_from_query(query, language=None) -> List[str]:
 
 @with_session
 def _get_query_cell_executions_iter(batch_size=1000, fields=None, session=None):
-    offset = 0
+    last_query_cell_id = 0
     while True:
-        query_cells = get_all_query_cells(
+        query_cells = get_query_cells_after_id(
+            after_id=last_query_cell_id,
             limit=batch_size,
-            offset=offset,
             session=session,
         )
+        query_cell_by_id = {query_cell.id: query_cell for query_cell in query_cells}
         query_executions_count = 0
-        for query_cell in query_cells:
-            query_cell_executions_offset = 0
-            while True:
-                query_cell_executions = get_successful_query_executions_by_data_cell_id(
-                    query_cell.id,
+        last_cell_execution_id = 0
+        # Fetch the executions of the whole batch of cells at once
+        while query_cell_by_id:
+            query_cell_executions = (
+                get_successful_query_executions_by_data_cell_ids_after_id(
+                    list(query_cell_by_id.keys()),
+                    after_id=last_cell_execution_id,
                     limit=batch_size,
-                    offset=query_cell_executions_offset,
                     session=session,
                 )
-                for query_execution in query_cell_executions:
-                    expand_query_execution = query_execution_to_es(
-                        query_execution,
-                        data_cell=query_cell,
-                        fields=fields,
-                        session=session,
-                    )
-                    yield expand_query_execution
-                query_executions_count += len(query_cell_executions)
-                if len(query_cell_executions) < batch_size:
-                    break
-                query_cell_executions_offset += batch_size
+            )
+            for _, query_cell_id, query_execution in query_cell_executions:
+                expand_query_execution = query_execution_to_es(
+                    query_execution,
+                    data_cell=query_cell_by_id[query_cell_id],
+                    fields=fields,
+                    session=session,
+                )
+                yield expand_query_execution
+            query_executions_count += len(query_cell_executions)
+            if len(query_cell_executions) < batch_size:
+                break
+            last_cell_execution_id = query_cell_executions[-1][0]
         LOG.info(
-            "\n--Query cell count: {}, query cell executions count: {}, offset: {}".format(
-                len(query_cells), query_executions_count, offset
+            "\n--Query cell count: {}, query cell executions count: {}, last id: {}".format(
+                len(query_cells), query_executions_count, last_query_cell_id
             )
         )
         if len(query_cells) < batch_size:
             break
-        offset += batch_size
+        last_query_cell_id = query_cells[-1].id
 
 
 @with_session
 def _get_adhoc_query_executions_iter(batch_size=1000, fields=None, session=None):
-    offset = 0
+    last_id = 0
     while True:
-        query_executions = get_successful_adhoc_query_executions(
+        query_executions = get_successful_adhoc_query_executions_after_id(
+            after_id=last_id,
             limit=batch_size,
-            offset=offset,
             session=session,
         )
         LOG.info(
-            "\n--Adhoc query executions count: {}, offset: {}".format(
-                len(query_executions), offset
+            "\n--Adhoc query executions count: {}, last id: {}".format(
+                len(query_executions), last_id
             )
         )
 
@@ -155,7 +187,7 @@ def _get_adhoc_query_executions_iter(batch_size=1000, fields=None, session=None)
 
         if len(query_executions) < batch_size:
             break
-        offset += batch_size
+        last_id = query_executions[-1].id
 
 
 @with_session
@@ -205,27 +237,22 @@ def query_execution_to_es(query_execution, data_cell=None, fields=None, session=
     return _get_dict_by_field(field_to_getter, fields=fields)
 
 
-@with_exception
-def _bulk_insert_query_executions():
-    index_name = ES_CONFIG["query_executions"]["index_name"]
+def _bulk_insert_query_executions(index_name=None):
+    index_name = index_name or ES_CONFIG["query_executions"]["index_name"]
 
-    for query_execution in get_query_executions_iter():
-        _insert(index_name, query_execution["id"], query_execution)
+    return _bulk_insert(index_name, get_query_executions_iter())
 
 
-@with_exception
 def _bulk_update_query_executions(fields: Set[str] = None):
     index_name = ES_CONFIG["query_executions"]["index_name"]
 
-    for query_execution in get_query_executions_iter(fields=fields):
-        updated_body = {"doc": query_execution, "doc_as_upsert": True}
-        _update(index_name, query_execution["id"], updated_body)
+    return _bulk_upsert(index_name, get_query_executions_iter(fields=fields))
 
 
 @with_exception
 @with_session
-def update_query_execution_by_id(query_execution_id, session=None):
-    index_name = ES_CONFIG["query_executions"]["index_name"]
+def update_query_execution_by_id(query_execution_id, index_name=None, session=None):
+    index_name = index_name or ES_CONFIG["query_executions"]["index_name"]
 
     query_execution = get_query_execution_by_id(query_execution_id, session=session)
     if query_execution is None or query_execution.status != QueryExecutionStatus.DONE:
@@ -258,16 +285,16 @@ def update_query_execution_by_id(query_execution_id, session=None):
 
 @with_session
 def get_query_cells_iter(batch_size=1000, fields=None, session=None):
-    offset = 0
+    last_id = 0
 
     while True:
-        query_cells = get_all_query_cells(
+        query_cells = get_query_cells_after_id(
+            after_id=last_id,
             limit=batch_size,
-            offset=offset,
             session=session,
         )
         LOG.info(
-            "\n--Query cells count: {}, offset: {}".format(len(query_cells), offset)
+            "\n--Query cells count: {}, last id: {}".format(len(query_cells), last_id)
         )
 
         for query_cell in query_cells:
@@ -278,7 +305,7 @@ def get_query_cells_iter(batch_size=1000, fields=None, session=None):
 
         if len(query_cells) < batch_size:
             break
-        offset += batch_size
+        last_id = query_cells[-1].id
 
 
 @with_session
@@ -311,27 +338,22 @@ def query_cell_to_es(query_cell, fields=None, session=None):
     return _get_dict_by_field(field_to_getter, fields=fields)
 
 
-@with_exception
-def _bulk_insert_query_cells():
-    index_name = ES_CONFIG["query_cells"]["index_name"]
+def _bulk_insert_query_cells(index_name=None):
+    index_name = index_name or ES_CONFIG["query_cells"]["index_name"]
 
-    for query_cell in get_query_cells_iter():
-        _insert(index_name, query_cell["id"], query_cell)
+    return _bulk_insert(index_name, get_query_cells_iter())
 
 
-@with_exception
 def _bulk_update_query_cells(fields: Set[str] = None):
     index_name = ES_CONFIG["query_cells"]["index_name"]
 
-    for query_cell in get_query_cells_iter(fields=fields):
-        updated_body = {"doc": query_cell, "doc_as_upsert": True}
-        _update(index_name, query_cell["id"], updated_body)
+    return _bulk_upsert(index_name, get_query_cells_iter(fields=fields))
 
 
 @with_exception
 @with_session
-def update_query_cell_by_id(query_cell_id, session=None):
-    index_name = ES_CONFIG["query_cells"]["index_name"]
+def update_query_cell_by_id(query_cell_id, index_name=None, session=None):
+    index_name = index_name or ES_CONFIG["query_cells"]["index_name"]
 
     query_cell = get_unarchived_query_cell_by_id(query_cell_id, session=session)
     if query_cell is None:
@@ -399,15 +421,15 @@ def get_sample_query_cells_by_table_name(
 
 @with_session
 def get_datadocs_iter(batch_size=5000, fields=None, session=None):
-    offset = 0
+    last_id = 0
 
     while True:
-        data_docs = get_all_data_docs(
+        data_docs = get_data_docs_after_id(
+            after_id=last_id,
             limit=batch_size,
-            offset=offset,
             session=session,
         )
-        LOG.info("\n--Datadocs count: {}, offset: {}".format(len(data_docs), offset))
+        LOG.info("\n--Datadocs count: {}, last id: {}".format(len(data_docs), last_id))
 
         for data_doc in data_docs:
             expand_datadoc = datadocs_to_es(data_doc, fields=fields, session=session)
@@ -415,7 +437,7 @@ def get_datadocs_iter(batch_size=5000, fields=None, session=None):
 
         if len(data_docs) < batch_size:
             break
-        offset += batch_size
+        last_id = data_docs[-1].id
 
 
 def get_joined_cells(datadoc):
@@ -451,27 +473,22 @@ def datadocs_to_es(datadoc, fields=None, session=None):
     return _get_dict_by_field(field_to_getter, fields=fields)
 
 
-@with_exception
-def _bulk_insert_datadocs():
-    index_name = ES_CONFIG["datadocs"]["index_name"]
+def _bulk_insert_datadocs(index_name=None):
+    index_name = index_name or ES_CONFIG["datadocs"]["index_name"]
 
-    for datadoc in get_datadocs_iter():
-        _insert(index_name, datadoc["id"], datadoc)
+    return _bulk_insert(index_name, get_datadocs_iter())
 
 
-@with_exception
 def _bulk_update_datadocs(fields: Set[str] = None):
     index_name = ES_CONFIG["datadocs"]["index_name"]
 
-    for datadoc in get_datadocs_iter(fields=fields):
-        updated_body = {"doc": datadoc, "doc_as_upsert": True}
-        _update(index_name, datadoc["id"], updated_body)
+    return _bulk_upsert(index_name, get_datadocs_iter(fields=fields))
 
 
 @with_exception
 @with_session
-def update_data_doc_by_id(doc_id, session=None):
-    index_name = ES_CONFIG["datadocs"]["index_name"]
+def update_data_doc_by_id(doc_id, fields=None, index_name=None, session=None):
+    index_name = index_name or ES_CONFIG["datadocs"]["index_name"]
 
     doc = get_data_doc_by_id(doc_id, session=session)
     if doc is None or doc.archived:
@@ -480,12 +497,13 @@ def update_data_doc_by_id(doc_id, session=None):
         except Exception:
             LOG.error("failed to delete {}. Will pass.".format(doc_id))
     else:
-        formatted_object = datadocs_to_es(doc, session=session)
+        formatted_object = datadocs_to_es(doc, fields=fields, session=session)
         try:
             # Try to update if present
             updated_body = {
                 "doc": formatted_object,
-                "doc_as_upsert": True,
+                # A partial document must not be inserted as is
+                "doc_as_upsert": fields is None,
             }  # ES requires this format for updates
             _update(index_name, doc_id, updated_body)
         except Exception:
@@ -499,23 +517,29 @@ def update_data_doc_by_id(doc_id, session=None):
 
 @with_session
 def get_tables_iter(batch_size=5000, fields=None, session=None):
-    offset = 0
+    need_weight = fields is None or any(
+        field in TABLE_WEIGHT_FIELDS for field in fields
+    )
+    last_id = 0
 
     while True:
-        tables = get_all_table(
+        tables = get_tables_after_id(
+            after_id=last_id,
             limit=batch_size,
-            offset=offset,
             session=session,
         )
-        LOG.info("\n--Table count: {}, offset: {}".format(len(tables), offset))
+        LOG.info("\n--Table count: {}, last id: {}".format(len(tables), last_id))
 
+        weights = get_table_weights(tables, session=session) if need_weight else {}
         for table in tables:
-            expand_table = table_to_es(table, fields=fields, session=session)
+            expand_table = table_to_es(
+                table, fields=fields, weight=weights.get(table.id), session=session
+            )
             yield expand_table
 
         if len(tables) < batch_size:
             break
-        offset += batch_size
+        last_id = tables[-1].id
 
 
 @with_session
@@ -542,13 +566,52 @@ def get_table_weight(table_id: int, session=None) -> int:
     )
     boost_score = get_table_by_id(table_id, session=session).boost_score
 
+    return _compute_table_weight(num_impressions, num_samples, boost_score)
+
+
+@with_session
+def get_table_weights(tables, session=None) -> Dict[int, int]:
+    """Same as get_table_weight but for a batch of tables, the samples
+       and impressions are counted with one aggregate query each
+
+    Arguments:
+        tables {List[DataTable]} -- The tables to weight
+
+    Keyword Arguments:
+        session -- Sqlalchemy DB session (default: {None})
+
+    Returns:
+        Dict[int, int] -- Table id to its integer weight
+    """
+    table_ids = [table.id for table in tables]
+    num_samples_by_id = get_tables_query_samples_count(table_ids, session=session)
+    num_impressions_by_id = get_viewers_count_by_items_after_date(
+        ImpressionItemType.DATA_TABLE,
+        table_ids,
+        get_last_impressions_date(),
+        session=session,
+    )
+
+    return {
+        table.id: _compute_table_weight(
+            num_impressions_by_id.get(table.id, 0),
+            num_samples_by_id.get(table.id, 0),
+            table.boost_score,
+        )
+        for table in tables
+    }
+
+
+def _compute_table_weight(num_impressions: int, num_samples: int, boost_score) -> int:
     # Samples worth 10x as much as impression
     # Log the score to flatten the score distrution (since its power law distribution)
     return int(math.log2(((num_impressions + num_samples * 10) + 1) + boost_score))
 
 
 @with_session
-def table_to_es(table, fields=None, session=None):
+def table_to_es(table, fields=None, weight=None, session=None):
+    """weight can be precomputed (see get_table_weights) to avoid
+    computing it table by table during bulk indexing"""
     schema = table.data_schema
     schema_name = schema.name
     table_name = table.name
@@ -574,8 +637,6 @@ def table_to_es(table, fields=None, session=None):
             richtext_to_plaintext(d.description, escape=True) for d in data_elements
         ]
 
-    weight = None
-
     def compute_weight():
         nonlocal weight
         if weight is None:
@@ -615,36 +676,36 @@ def table_to_es(table, fields=None, session=None):
     return _get_dict_by_field(field_to_getter, fields=fields)
 
 
-def _bulk_insert_tables():
-    index_name = ES_CONFIG["tables"]["index_name"]
+def _bulk_insert_tables(index_name=None):
+    index_name = index_name or ES_CONFIG["tables"]["index_name"]
 
-    for table in get_tables_iter():
-        _insert(index_name, table["id"], table)
+    return _bulk_insert(index_name, get_tables_iter())
 
 
 def _bulk_update_tables(fields: Set[str] = None):
     index_name = ES_CONFIG["tables"]["index_name"]
 
-    for table in get_tables_iter(fields=fields):
-        updated_body = {"doc": table, "doc_as_upsert": True}
-        _update(index_name, table["id"], updated_body)
+    return _bulk_upsert(index_name, get_tables_iter(fields=fields))
 
 
 @with_exception
 @with_session
-def update_table_by_id(table_id, update_vector_store=False, session=None):
-    index_name = ES_CONFIG["tables"]["index_name"]
+def update_table_by_id(
+    table_id, update_vector_store=False, fields=None, index_name=None, session=None
+):
+    index_name = index_name or ES_CONFIG["tables"]["index_name"]
 
     table = get_table_by_id(table_id, session=session)
     if table is None:
-        delete_es_table_by_id(table_id)
+        delete_es_table_by_id(table_id, index_name=index_name)
     else:
-        formatted_object = table_to_es(table, session=session)
+        formatted_object = table_to_es(table, fields=fields, session=session)
         try:
             # Try to update if present
             updated_body = {
                 "doc": formatted_object,
-                "doc_as_upsert": True,
+                # A partial document must not be inserted as is
+                "doc_as_upsert": fields is None,
             }  # ES requires this format for updates
             _update(index_name, table_id, updated_body)
 
@@ -658,10 +719,8 @@ def update_table_by_id(table_id, update_vector_store=False, session=None):
             LOG.error("failed to upsert {}. Will pass.".format(table_id))
 
 
-def delete_es_table_by_id(
-    table_id,
-):
-    index_name = ES_CONFIG["tables"]["index_name"]
+def delete_es_table_by_id(table_id, index_name=None):
+    index_name = index_name or ES_CONFIG["tables"]["index_name"]
     try:
         _delete(index_name, id=table_id)
 
@@ -736,27 +795,24 @@ def get_users_iter(batch_size=5000, session=None):
         offset += batch_size
 
 
-def _bulk_insert_users():
-    index_name = ES_CONFIG["users"]["index_name"]
+def _bulk_insert_users(index_name=None):
+    index_name = index_name or ES_CONFIG["users"]["index_name"]
 
-    for user in get_users_iter():
-        expanded_user = user_to_es(user, fields=None)
-        _insert(index_name, expanded_user["id"], expanded_user)
+    return _bulk_insert(index_name, (user_to_es(user) for user in get_users_iter()))
 
 
 def _bulk_update_users(fields: Set[str] = None):
     index_name = ES_CONFIG["users"]["index_name"]
 
-    for user in get_users_iter():
-        expanded_user = user_to_es(user, fields=fields)
-        updated_body = {"doc": expanded_user, "doc_as_upsert": True}
-        _update(index_name, expanded_user["id"], updated_body)
+    return _bulk_upsert(
+        index_name, (user_to_es(user, fields=fields) for user in get_users_iter())
+    )
 
 
 @with_exception
 @with_session
-def update_user_by_id(uid, session=None):
-    index_name = ES_CONFIG["users"]["index_name"]
+def update_user_by_id(uid, index_name=None, session=None):
+    index_name = index_name or ES_CONFIG["users"]["index_name"]
 
     user = User.get(id=uid, session=session)
     if user is None:
@@ -784,15 +840,15 @@ def update_user_by_id(uid, session=None):
 
 @with_session
 def get_boards_iter(batch_size=5000, fields=None, session=None):
-    offset = 0
+    last_id = 0
 
     while True:
-        boards = Board.get_all(
+        boards = get_boards_after_id(
+            after_id=last_id,
             limit=batch_size,
-            offset=offset,
             session=session,
         )
-        LOG.info("\n--Board count: {}, offset: {}".format(len(boards), offset))
+        LOG.info("\n--Board count: {}, last id: {}".format(len(boards), last_id))
 
         for board in boards:
             expanded_board = board_to_es(board, fields=fields, session=session)
@@ -800,7 +856,7 @@ def get_boards_iter(batch_size=5000, fields=None, session=None):
 
         if len(boards) < batch_size:
             break
-        offset += batch_size
+        last_id = boards[-1].id
 
 
 @with_session
@@ -834,25 +890,22 @@ def board_to_es(board, fields=None, session=None):
     return _get_dict_by_field(field_to_getter, fields=fields)
 
 
-def _bulk_insert_boards():
-    index_name = ES_CONFIG["boards"]["index_name"]
+def _bulk_insert_boards(index_name=None):
+    index_name = index_name or ES_CONFIG["boards"]["index_name"]
 
-    for board in get_boards_iter():
-        _insert(index_name, board["id"], board)
+    return _bulk_insert(index_name, get_boards_iter())
 
 
 def _bulk_update_boards(fields: Set[str] = None):
     index_name = ES_CONFIG["boards"]["index_name"]
 
-    for board in get_boards_iter(fields=fields):
-        updated_body = {"doc": board, "doc_as_upsert": True}
-        _update(index_name, board["id"], updated_body)
+    return _bulk_upsert(index_name, get_boards_iter(fields=fields))
 
 
 @with_exception
 @with_session
-def update_board_by_id(board_id, session=None):
-    index_name = ES_CONFIG["boards"]["index_name"]
+def update_board_by_id(board_id, index_name=None, session=None):
+    index_name = index_name or ES_CONFIG["boards"]["index_name"]
 
     board = Board.get(id=board_id, session=session)
     if board is None or board.deleted_at is not None:
@@ -878,60 +931,166 @@ def update_board_by_id(board_id, session=None):
 """
 
 
-def _insert(index_name, id, content):
-    get_hosted_es().index(index=index_name, id=id, body=content)
-
-
 def _delete(index_name, id):
+    _record_reindex_update(index_name, id)
     get_hosted_es().delete(index=index_name, id=id)
 
 
 def _update(index_name, id, content):
+    _record_reindex_update(index_name, id)
     get_hosted_es().update(index=index_name, id=id, body=content)
 
 
-def _bulk_insert_index(type_name: str):
+def _bulk(
+    index_name: Optional[str],
+    actions: Iterable[Dict],
+    on_document_missing: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, int]:
+    """Send the actions with the bulk api, in requests of at most
+       ELASTICSEARCH_BULK_CHUNK_SIZE actions / ELASTICSEARCH_BULK_MAX_CHUNK_BYTES.
+       The actions are consumed lazily, so the documents are only read from
+       the db once ES has accepted the previous request.
+       index_name can be None if every action has an _index.
+
+       If on_document_missing is given, it is called with the _id of every
+       update (without upsert) of a document that is not in the index,
+       which is then not counted as a failure.
+
+    Returns:
+        Tuple[int, int] -- number of documents indexed and failed
+    """
+    index_name_label = index_name or "multiple indices"
+    num_success = 0
+    num_failed = 0
+    for ok, item in streaming_bulk(
+        get_hosted_es(),
+        actions,
+        index=index_name,
+        chunk_size=QuerybookSettings.ELASTICSEARCH_BULK_CHUNK_SIZE,
+        max_chunk_bytes=QuerybookSettings.ELASTICSEARCH_BULK_MAX_CHUNK_BYTES,
+        max_retries=ES_BULK_MAX_RETRIES,
+        raise_on_error=False,
+    ):
+        # Deleting a document that was never indexed is not a failure
+        if ok or item.get("delete", {}).get("status") == 404:
+            num_success += 1
+            continue
+
+        if on_document_missing is not None and _is_document_missing(item):
+            on_document_missing(item["update"]["_id"])
+            continue
+
+        num_failed += 1
+        if num_failed <= ES_BULK_MAX_LOGGED_ERRORS:
+            LOG.error(f"Failed to index document in {index_name_label}: {item}")
+
+    LOG.info(
+        f"Bulk indexed {num_success} documents in {index_name_label}, {num_failed} failed"
+    )
+    return num_success, num_failed
+
+
+def _is_document_missing(item: Dict) -> bool:
+    update_result = item.get("update", {})
+    return (
+        update_result.get("status") == 404
+        and update_result.get("error", {}).get("type") == "document_missing_exception"
+    )
+
+
+def _bulk_insert(index_name: str, docs: Iterable[Dict]) -> Tuple[int, int]:
+    return _bulk(index_name, ({"_id": doc["id"], "_source": doc} for doc in docs))
+
+
+def _bulk_upsert(index_name: str, docs: Iterable[Dict]) -> Tuple[int, int]:
+    return _bulk(
+        index_name,
+        (
+            {"_op_type": "update", "_id": doc["id"], "doc": doc, "doc_as_upsert": True}
+            for doc in docs
+        ),
+    )
+
+
+def _bulk_insert_index(type_name: str, index_name: str = None) -> Tuple[int, int]:
+    """Index all the documents of the type, raises if any of them failed
+    so that a partial index is never swapped in
+
+    Returns:
+        Tuple[int, int] -- number of documents indexed and failed
+    """
     if type_name == "query_executions":
         LOG.info("Inserting query executions")
-        _bulk_insert_query_executions()
+        result = _bulk_insert_query_executions(index_name=index_name)
     elif type_name == "query_cells":
         LOG.info("Inserting query cells")
-        _bulk_insert_query_cells()
+        result = _bulk_insert_query_cells(index_name=index_name)
     elif type_name == "datadocs":
         LOG.info("Inserting datadocs")
-        _bulk_insert_datadocs()
+        result = _bulk_insert_datadocs(index_name=index_name)
     elif type_name == "tables":
         LOG.info("Inserting tables")
-        _bulk_insert_tables()
+        result = _bulk_insert_tables(index_name=index_name)
     elif type_name == "users":
         LOG.info("Inserting users")
-        _bulk_insert_users()
+        result = _bulk_insert_users(index_name=index_name)
     elif type_name == "boards":
         LOG.info("Inserting boards")
-        _bulk_insert_boards()
+        result = _bulk_insert_boards(index_name=index_name)
+    else:
+        raise ValueError(f"Unknown index type {type_name}")
+
+    num_failed = result[1]
+    if num_failed > 0:
+        raise Exception(f"Failed to index {num_failed} {type_name} in {index_name}")
+    return result
+
+
+def _update_by_id(type_name: str, id: int, index_name: str = None):
+    if type_name == "query_executions":
+        update_query_execution_by_id(id, index_name=index_name)
+    elif type_name == "query_cells":
+        update_query_cell_by_id(id, index_name=index_name)
+    elif type_name == "datadocs":
+        update_data_doc_by_id(id, index_name=index_name)
+    elif type_name == "tables":
+        update_table_by_id(id, index_name=index_name)
+    elif type_name == "users":
+        update_user_by_id(id, index_name=index_name)
+    elif type_name == "boards":
+        update_board_by_id(id, index_name=index_name)
+
+
+def _create_index(es_config):
+    index_name = _create_versioned_index(es_config)
+    try:
+        _bulk_insert_index(es_config["type_name"], index_name=index_name)
+    except Exception:
+        LOG.error(f"Failed to create {es_config['index_name']}, dropping {index_name}")
+        get_hosted_es().indices.delete(index_name, ignore_unavailable=True)
+        raise
+    _swap_alias(es_config["index_name"], index_name)
 
 
 def create_indices(*config_names):
     es_configs = get_es_config_by_name(*config_names)
     for es_config in es_configs:
-        get_hosted_es().indices.create(es_config["index_name"], es_config["mappings"])
-        _bulk_insert_index(es_config["type_name"])
+        _create_index(es_config)
 
 
 def create_indices_if_not_exist(*config_names):
     es_configs = get_es_config_by_name(*config_names)
     for es_config in es_configs:
+        # exists is true for both the alias and a legacy concrete index
         if not get_hosted_es().indices.exists(index=es_config["index_name"]):
-            get_hosted_es().indices.create(
-                es_config["index_name"], es_config["mappings"]
-            )
-            _bulk_insert_index(es_config["type_name"])
+            _create_index(es_config)
 
 
 def delete_indices(*config_names):
     es_configs = get_es_config_by_name(*config_names)
     for es_config in es_configs:
-        get_hosted_es().indices.delete(es_config["index_name"])
+        for index_name in _get_indices_by_alias(es_config["index_name"]):
+            get_hosted_es().indices.delete(index_name)
 
 
 def get_es_config_by_name(*config_names):
@@ -941,8 +1100,124 @@ def get_es_config_by_name(*config_names):
 
 
 def recreate_indices(*config_names):
-    delete_indices(*config_names)
-    create_indices_if_not_exist(*config_names)
+    """Rebuild the indices without a search outage.
+
+    For each index, a new <index>_v{n} is bulk indexed while the current one
+    keeps serving. The documents updated during the build are recorded and
+    replayed on the new index, then the alias is atomically swapped to it and
+    the old index is dropped.
+    """
+    es_configs = get_es_config_by_name(*config_names)
+    for es_config in es_configs:
+        _reindex(es_config)
+
+
+"""
+    ALIASES
+"""
+
+
+def _reindex(es_config):
+    alias = es_config["index_name"]
+    type_name = es_config["type_name"]
+
+    index_name = _create_versioned_index(es_config)
+    LOG.info(f"Reindexing {alias} into {index_name}")
+    get_redis().delete(ES_REINDEX_UPDATES_KEY_PREFIX + alias)
+    get_redis().set(
+        ES_REINDEX_KEY_PREFIX + alias, index_name, ex=ES_REINDEX_KEY_TIMEOUT
+    )
+    try:
+        # Refreshes are useless until the index is searched
+        get_hosted_es().indices.put_settings(
+            {"index": {"refresh_interval": "-1"}}, index=index_name
+        )
+        _bulk_insert_index(type_name, index_name=index_name)
+        _replay_reindex_updates(type_name, alias, index_name=index_name)
+        get_hosted_es().indices.put_settings(
+            {"index": {"refresh_interval": None}}, index=index_name
+        )
+        get_hosted_es().indices.refresh(index=index_name)
+        _swap_alias(alias, index_name)
+    except Exception:
+        LOG.error(f"Failed to reindex {alias}, dropping {index_name}")
+        get_hosted_es().indices.delete(index_name, ignore_unavailable=True)
+        get_redis().delete(ES_REINDEX_UPDATES_KEY_PREFIX + alias)
+        raise
+    finally:
+        get_redis().delete(ES_REINDEX_KEY_PREFIX + alias)
+
+    # Updates recorded after the replay went to the old index,
+    # the alias now points to the new one
+    _replay_reindex_updates(type_name, alias)
+
+
+def _create_versioned_index(es_config) -> str:
+    alias = es_config["index_name"]
+    versions = [
+        int(name[len(alias) + 2 :])
+        for name in get_hosted_es().indices.get(
+            index=f"{alias}_v*", ignore_unavailable=True
+        )
+        if name[len(alias) + 2 :].isdigit()
+    ]
+    index_name = f"{alias}_v{max(versions, default=0) + 1}"
+    get_hosted_es().indices.create(index_name, es_config["mappings"])
+    return index_name
+
+
+def _get_indices_by_alias(alias: str) -> List[str]:
+    """Returns the concrete indices behind the alias, or the alias
+    itself if it is a concrete index created before aliases were used"""
+    if not get_hosted_es().indices.exists(index=alias):
+        return []
+    return list(get_hosted_es().indices.get(index=alias).keys())
+
+
+def _swap_alias(alias: str, index_name: str):
+    """Atomically points the alias to index_name and drops the
+    indices it pointed to"""
+    old_indices = _get_indices_by_alias(alias)
+    if alias in old_indices:
+        # A concrete index has the name, it must be removed in the same request
+        actions = [{"remove_index": {"index": alias}}]
+        old_indices = []
+    else:
+        actions = [
+            {"remove": {"index": old_index, "alias": alias}}
+            for old_index in old_indices
+        ]
+    actions.append({"add": {"index": index_name, "alias": alias}})
+    get_hosted_es().indices.update_aliases({"actions": actions})
+
+    for old_index in old_indices:
+        get_hosted_es().indices.delete(old_index)
+
+
+def _record_reindex_update(index_name: str, id):
+    _record_reindex_updates(index_name, [id])
+
+
+def _record_reindex_updates(index_name: str, ids: Iterable):
+    """Remember the updated documents if their index is being rebuilt
+    so that the updates can be replayed on the new index"""
+    try:
+        redis_conn = get_redis()
+        if redis_conn.exists(ES_REINDEX_KEY_PREFIX + index_name):
+            redis_conn.sadd(ES_REINDEX_UPDATES_KEY_PREFIX + index_name, *ids)
+    except Exception:
+        LOG.error(f"Failed to record updates of {ids} in {index_name}. Will pass.")
+
+
+def _replay_reindex_updates(type_name: str, alias: str, index_name: str = None):
+    updates_key = ES_REINDEX_UPDATES_KEY_PREFIX + alias
+    while True:
+        ids = get_redis().spop(updates_key, ES_REINDEX_REPLAY_BATCH_SIZE)
+        if not ids:
+            break
+        LOG.info(f"Replaying {len(ids)} updates of {alias}")
+        for id in ids:
+            _update_by_id(type_name, int(id), index_name=index_name)
 
 
 def update_indices(*config_names):
@@ -953,19 +1228,187 @@ def update_indices(*config_names):
         get_hosted_es().indices.put_mapping(mapping, index=index_name)
 
 
-def bulk_update_index_by_fields(config_name, fields):
+def bulk_update_index_by_fields(config_name, fields) -> Tuple[int, int]:
+    """Update the fields of every document of the index, raises if any
+    document failed
+
+    Returns:
+        Tuple[int, int] -- number of documents updated and failed
+    """
     es_config = ES_CONFIG[config_name]
     type_name = es_config["type_name"]
     LOG.info(f"Updating {type_name}")
     if type_name == "query_executions":
-        _bulk_update_query_executions(fields=fields)
+        result = _bulk_update_query_executions(fields=fields)
     elif type_name == "query_cells":
-        _bulk_update_query_cells(fields=fields)
+        result = _bulk_update_query_cells(fields=fields)
     elif type_name == "datadocs":
-        _bulk_update_datadocs(fields=fields)
+        result = _bulk_update_datadocs(fields=fields)
     elif type_name == "tables":
-        _bulk_update_tables(fields=fields)
+        result = _bulk_update_tables(fields=fields)
     elif type_name == "users":
-        _bulk_update_users(fields=fields)
+        result = _bulk_update_users(fields=fields)
     elif type_name == "boards":
-        _bulk_update_boards(fields=fields)
+        result = _bulk_update_boards(fields=fields)
+    else:
+        raise ValueError(f"Unknown index type {type_name}")
+
+    num_failed = result[1]
+    if num_failed > 0:
+        raise Exception(
+            f"Failed to update {num_failed} {type_name} in {es_config['index_name']}"
+        )
+    return result
+
+
+"""
+    SYNC QUEUE
+"""
+
+
+@with_session
+def flush_sync_queue(session=None):
+    """Reindex the items queued by queue_sync_elasticsearch.
+
+    The queue is a redis set, so an item updated many times since the last
+    flush is reindexed once. Each batch of items is sent with the bulk api.
+    """
+    redis_conn = get_redis()
+    while True:
+        members = redis_conn.spop(
+            ELASTICSEARCH_SYNC_QUEUE_KEY, ES_SYNC_QUEUE_BATCH_SIZE
+        )
+        if not members:
+            break
+
+        fields_by_id_by_type = defaultdict(dict)
+        # id -> types of the items of the id that are partially updated
+        partial_update_types_by_id = defaultdict(set)
+        for member, fields in zip(
+            members, _pop_sync_queue_fields(members, redis_conn=redis_conn)
+        ):
+            item_type, item_id = member.decode("utf-8").split(":")
+            fields_by_id_by_type[item_type][int(item_id)] = fields
+            if fields is not None:
+                partial_update_types_by_id[item_id].add(item_type)
+        LOG.info(f"Flushing {len(members)} queued items")
+
+        missing_ids = []
+        try:
+            _bulk(
+                None,
+                chain.from_iterable(
+                    _get_sync_actions(item_type, fields_by_id, session=session)
+                    for item_type, fields_by_id in fields_by_id_by_type.items()
+                ),
+                on_document_missing=missing_ids.append,
+            )
+        except Exception:
+            # Keep the items for the next flush, they will be fully updated
+            redis_conn.sadd(ELASTICSEARCH_SYNC_QUEUE_KEY, *members)
+            raise
+
+        # A partial update cannot create the document, so the items not in
+        # the index yet are fully updated by the next flush. The response
+        # only has the concrete index, so every partially updated type of
+        # the id is queued.
+        for item_id in missing_ids:
+            for item_type in partial_update_types_by_id[str(item_id)]:
+                queue_sync_elasticsearch(item_type, item_id, redis_conn=redis_conn)
+
+
+def _pop_sync_queue_fields(members: List[bytes], redis_conn) -> List[Optional[Set]]:
+    """Returns the fields queued for each member, None if all of them"""
+    with redis_conn.pipeline() as pipe:
+        for member in members:
+            fields_key = ELASTICSEARCH_SYNC_QUEUE_FIELDS_KEY_PREFIX + member.decode(
+                "utf-8"
+            )
+            pipe.smembers(fields_key)
+            pipe.delete(fields_key)
+        results = pipe.execute()
+
+    fields_by_member = []
+    for fields in results[::2]:
+        fields = {field.decode("utf-8") for field in fields}
+        # No fields means they expired, update them all to be safe
+        if not fields or ELASTICSEARCH_SYNC_ALL_FIELDS in fields:
+            fields = None
+        fields_by_member.append(fields)
+    return fields_by_member
+
+
+def _get_sync_actions(
+    type_name: str, fields_by_id: Dict[int, Optional[Set]], session=None
+):
+    index_name = ES_CONFIG[type_name]["index_name"]
+    _record_reindex_updates(index_name, fields_by_id.keys())
+
+    for id, fields in sorted(fields_by_id.items()):
+        try:
+            doc = _get_es_doc_by_id(type_name, id, fields=fields, session=session)
+        except Exception:
+            LOG.error(f"Failed to get {type_name} {id}. Will pass.", exc_info=True)
+            continue
+
+        if doc is None:
+            if type_name == "tables":
+                _delete_table_from_vector_store(id)
+            yield {"_op_type": "delete", "_index": index_name, "_id": id}
+        else:
+            yield {
+                "_op_type": "update",
+                "_index": index_name,
+                "_id": id,
+                "doc": doc,
+                # A partial document must not be inserted as is
+                "doc_as_upsert": fields is None,
+            }
+
+
+def _get_es_doc_by_id(
+    type_name: str, id: int, fields: Optional[Set] = None, session=None
+) -> Optional[Dict]:
+    """Returns the document of the item, or None if it must be
+    removed from the index (same rules as the update_*_by_id).
+    fields is only used for the datadocs and tables, whose documents
+    are the most costly to build."""
+    if type_name == "query_executions":
+        query_execution = get_query_execution_by_id(id, session=session)
+        if (
+            query_execution is None
+            or query_execution.status != QueryExecutionStatus.DONE
+        ):
+            return None
+        data_cell = get_data_cell_by_query_execution_id(id, session=session)
+        return query_execution_to_es(
+            query_execution, data_cell=data_cell, session=session
+        )
+    elif type_name == "query_cells":
+        query_cell = get_unarchived_query_cell_by_id(id, session=session)
+        return query_cell and query_cell_to_es(query_cell, session=session)
+    elif type_name == "datadocs":
+        doc = get_data_doc_by_id(id, session=session)
+        if doc is None or doc.archived:
+            return None
+        return datadocs_to_es(doc, fields=fields, session=session)
+    elif type_name == "tables":
+        table = get_table_by_id(id, session=session)
+        return table and table_to_es(table, fields=fields, session=session)
+    elif type_name == "users":
+        user = User.get(id=id, session=session)
+        return user and user_to_es(user, session=session)
+    elif type_name == "boards":
+        board = Board.get(id=id, session=session)
+        if board is None or board.deleted_at is not None:
+            return None
+        return board_to_es(board, session=session)
+
+
+def _delete_table_from_vector_store(table_id: int):
+    try:
+        from logic.vector_store import delete_table_doc
+
+        delete_table_doc(table_id)
+    except Exception:
+        LOG.error(f"failed to delete {table_id} from vector store. Will pass.")
@@ -104,6 +104,24 @@ def get_viewers_count_by_item_after_date(item_type, item_id, after_date, session
     return count
 
 
+@with_session
+def get_viewers_count_by_items_after_date(
+    item_type, item_ids, after_date, session=None
+):
+    """Returns a dict of item id to its distinct viewers count,
+    items without impressions are omitted"""
+    if not item_ids:
+        return {}
+    return dict(
+        session.query(Impression.item_id, func.count(func.distinct(Impression.uid)))
+        .filter_by(item_type=item_type)
+        .filter(Impression.item_id.in_(item_ids))
+        .filter(Impression.created_at >= after_date)
+        .group_by(Impression.item_id)
+        .all()
+    )
+
+
 @with_session
 def get_item_timeseries_after_date(item_type, item_id, after_date, session=None):
     return (
@@ -1,4 +1,5 @@
 import datetime
+from typing import List
 
 from app.db import with_session
 from const.elasticsearch import ElasticsearchItem
@@ -22,8 +23,8 @@ from models.metastore import (
 )
 from models.query_execution import QueryExecution
 from sqlalchemy import and_, func
-from sqlalchemy.orm import aliased
-from tasks.sync_elasticsearch import sync_elasticsearch
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 
 LOG = get_logger(__file__)
 
@@ -153,6 +154,25 @@ def get_all_table(offset=0, limit=100, session=None):
     return session.query(DataTable).offset(offset).limit(limit).all()
 
 
+@with_session
+def get_tables_after_id(after_id=0, limit=100, session=None):
+    """Get the next page of tables ordered by id, with the relationships
+    needed for search indexing loaded in the same round trip."""
+    return (
+        session.query(DataTable)
+        .options(
+            joinedload(DataTable.data_schema),
+            joinedload(DataTable.information),
+            selectinload(DataTable.columns).selectinload(DataTableColumn.data_elements),
+            selectinload(DataTable.tags),
+        )
+        .filter(DataTable.id > after_id)
+        .order_by(DataTable.id)
+        .limit(limit)
+        .all()
+    )
+
+
 @with_session
 def get_table_by_name(schema_name, name, metastore_id, session=None):
     """Get an table by its name"""
@@ -259,15 +279,18 @@ def update_table(id, golden=None, score=None, commit=True, session=None):
     if not table:
         return
 
+    es_fields = []
     if golden is not None:
         table.golden = golden
+        es_fields.append("golden")
 
     if score is not None:
         table.boost_score = score
+        es_fields += ["completion_name", "importance_score"]
 
     if commit:
         session.commit()
-        update_es_tables_by_id(table.id)
+        update_es_tables_by_id(table.id, fields=es_fields or None)
     else:
         session.flush()
     session.refresh(table)
@@ -392,7 +415,7 @@ def update_table_information(
     if commit:
         session.commit()
         if should_update_es:
-            update_es_tables_by_id(data_table_id)
+            update_es_tables_by_id(data_table_id, fields=["description"])
 
     session.refresh(table_information)
     return table_information
@@ -611,7 +634,9 @@ def update_column_by_id(
 
         if commit:
             session.commit()
-            update_es_tables_by_id(table_column.table_id)
+            update_es_tables_by_id(
+                table_column.table_id, fields=["column_descriptions"]
+            )
         else:
             session.flush()
         session.refresh(table_column)
@@ -839,6 +864,22 @@ def get_table_query_samples_count(table_id, session):
     return session.query(DataTableQueryExecution).filter_by(table_id=table_id).count()
 
 
+@with_session
+def get_tables_query_samples_count(table_ids, session=None):
+    """Returns a dict of table id to its query samples count,
+    tables without samples are omitted"""
+    if not table_ids:
+        return {}
+    return dict(
+        session.query(
+            DataTableQueryExecution.table_id, func.count(DataTableQueryExecution.id)
+        )
+        .filter(DataTableQueryExecution.table_id.in_(table_ids))
+        .group_by(DataTableQueryExecution.table_id)
+        .all()
+    )
+
+
 @with_session
 def get_tables_by_query_execution_id(query_execution_id, session=None):
     return (
@@ -856,8 +897,9 @@ def get_tables_by_query_execution_id(query_execution_id, session=None):
 """
 
 
-def update_es_tables_by_id(id):
-    sync_elasticsearch.apply_async(args=[ElasticsearchItem.tables.value, id])
+def update_es_tables_by_id(id, fields: List[str] = None):
+    """fields are the search document fields to update, all of them if None"""
+    queue_sync_elasticsearch(ElasticsearchItem.tables.value, id, fields=fields)
 
 
 """
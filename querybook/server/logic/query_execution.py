@@ -18,7 +18,7 @@ from models.query_execution import (
 from models.datadoc import DataCellQueryExecution, DataDocDataCell
 from models.admin import QueryEngine, QueryEngineEnvironment
 from models.environment import Environment
-from tasks.sync_elasticsearch import sync_elasticsearch
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 
 CLEAN_UP_TIME_THRESHOLD = 20 * 60  # 20 mins
 LOG = get_logger(__file__)
@@ -367,6 +367,25 @@ def create_statement_execution_stream_log(
     return stream_log
 
 
+@with_session
+def create_statement_execution_stream_logs(
+    statement_execution_id, logs, commit=True, session=None  # List[String]
+):
+    """Insert the log chunks with a single bulk insert"""
+    session.bulk_insert_mappings(
+        StatementExecutionStreamLog,
+        [
+            {"statement_execution_id": statement_execution_id, "log": log}
+            for log in logs
+        ],
+    )
+
+    if commit:
+        session.commit()
+    else:
+        session.flush()
+
+
 @with_session
 def update_statement_execution_stream_log(id, log, commit=True, session=None):  # String
     stream_log = get_statement_execution_stream_log_by_id(id, session=session)
@@ -414,6 +433,21 @@ def get_statement_execution_stream_logs(
     return rows
 
 
+@with_session
+def iterate_statement_execution_stream_logs(statement_execution_id, session=None):
+    """Yield the log strings in order, read from the db cursor in batches"""
+    query = (
+        session.query(StatementExecutionStreamLog.log)
+        .filter(
+            StatementExecutionStreamLog.statement_execution_id == statement_execution_id
+        )
+        .order_by(StatementExecutionStreamLog.id)
+        .yield_per(100)
+    )
+    for (log,) in query:
+        yield log
+
+
 @with_session
 def delete_statement_execution_stream_log(
     statement_execution_id, commit=True, session=None
@@ -570,35 +604,53 @@ def clean_up_query_execution(dry_run=False, session=None):
 
 
 @with_session
-def get_successful_adhoc_query_executions(offset=0, limit=100, session=None):
+def get_successful_adhoc_query_executions_after_id(after_id=0, limit=100, session=None):
     return (
         session.query(QueryExecution)
         .filter(QueryExecution.status == QueryExecutionStatus.DONE)
         .join(DataCellQueryExecution, isouter=True)
         .filter(DataCellQueryExecution.id.is_(None))
-        .offset(offset)
+        .filter(QueryExecution.id > after_id)
+        .order_by(QueryExecution.id)
         .limit(limit)
         .all()
     )
 
 
 @with_session
-def get_successful_query_executions_by_data_cell_id(
-    data_cell_id, offset=0, limit=100, session=None
+def get_successful_query_executions_by_data_cell_ids_after_id(
+    data_cell_ids, after_id=0, limit=100, session=None
 ):
+    """Get the next page of successful query executions of the given data cells.
+
+    Returns:
+        List of (data_cell_query_execution id, data_cell_id, QueryExecution),
+        paginated by the data_cell_query_execution id since a query execution
+        can be linked to several cells
+    """
+    if not data_cell_ids:
+        return []
     return (
-        session.query(QueryExecution)
+        session.query(
+            DataCellQueryExecution.id,
+            DataCellQueryExecution.data_cell_id,
+            QueryExecution,
+        )
+        .join(
+            QueryExecution,
+            QueryExecution.id == DataCellQueryExecution.query_execution_id,
+        )
         .filter(QueryExecution.status == QueryExecutionStatus.DONE)
-        .join(DataCellQueryExecution)
-        .filter(DataCellQueryExecution.data_cell_id == data_cell_id)
-        .offset(offset)
+        .filter(DataCellQueryExecution.data_cell_id.in_(data_cell_ids))
+        .filter(DataCellQueryExecution.id > after_id)
+        .order_by(DataCellQueryExecution.id)
         .limit(limit)
         .all()
     )
 
 
 def update_es_query_execution_by_id(id):
-    sync_elasticsearch.apply_async(args=[ElasticsearchItem.query_executions.value, id])
+    queue_sync_elasticsearch(ElasticsearchItem.query_executions.value, id)
 
 
 """
@@ -79,7 +79,7 @@ def add_tag_to_table(table_id, tag_name, uid, user_is_admin=False, session=None)
     TagItem.create(
         {"tag_name": tag.name, "table_id": table_id, "uid": uid}, session=session
     )
-    update_es_tables_by_id(table_id)
+    update_es_tables_by_id(table_id, fields=["tags"])
 
     return tag
 
@@ -100,7 +100,7 @@ def delete_tag_from_table(
 
     if commit:
         session.commit()
-        update_es_tables_by_id(tag_item.table_id)
+        update_es_tables_by_id(tag_item.table_id, fields=["tags"])
     else:
         session.flush()
 
@@ -7,7 +7,7 @@ from const.user_roles import UserRoleType
 from lib.config import get_config_value
 from lib.logger import get_logger
 from models.user import User, UserRole, UserSetting, UserGroupMember
-from tasks.sync_elasticsearch import sync_elasticsearch
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 
 LOG = get_logger(__file__)
 user_settings_config = get_config_value("user_setting")
@@ -318,4 +318,4 @@ def create_admin_when_no_admin(user, commit, session=None):
 
 
 def update_es_users_by_id(uid):
-    sync_elasticsearch.apply_async(args=[ElasticsearchItem.users.value, uid])
+    queue_sync_elasticsearch(ElasticsearchItem.users.value, uid)
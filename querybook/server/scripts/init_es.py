@@ -1,3 +1,21 @@
-from logic.elasticsearch import create_indices_if_not_exist
+import argparse
 
-create_indices_if_not_exist()
+from logic.elasticsearch import create_indices_if_not_exist, recreate_indices
+
+parser = argparse.ArgumentParser(description="Initialize the search indices")
+parser.add_argument(
+    "--reindex",
+    action="store_true",
+    help="Rebuild the indices in the background and swap them in without downtime",
+)
+parser.add_argument(
+    "indices",
+    nargs="*",
+    help="Names of the indices to initialize (e.g. tables datadocs), all by default",
+)
+args = parser.parse_args()
+
+if args.reindex:
+    recreate_indices(*args.indices)
+else:
+    create_indices_if_not_exist(*args.indices)
@@ -1,4 +1,6 @@
-from celery import chain
+from typing import List, Optional, Tuple
+
+from celery import chain, group
 
 from app.db import with_session, DBSession
 from app.flask_app import celery, socketio
@@ -10,11 +12,14 @@ from const.query_execution import QueryExecutionStatus, QueryExecutionType
 from const.schedule import TaskRunStatus
 
 from lib.logger import get_logger
+from lib.query_analysis.lineage import get_query_dependencies
 from lib.query_analysis.templating import render_templated_query
+from lib.query_executor.result_cache import apply_cached_query_execution
 from lib.scheduled_datadoc.export import export_datadoc
 from lib.scheduled_datadoc.legacy import convert_if_legacy_datadoc_schedule
 from lib.scheduled_datadoc.notification import notifiy_on_datadoc_complete
 
+from logic import admin as admin_logic
 from logic import datadoc as datadoc_logic
 from logic import query_execution as qe_logic
 from logic.schedule import (
@@ -44,10 +49,14 @@ def run_datadoc_with_config(
     execution_type=QueryExecutionType.SCHEDULED.value,
     # Exporting related settings
     exports=[],
+    # Run the cells that do not depend on each other at the same time
+    parallel_cells=False,
     *args,
     **kwargs,
 ):
-    tasks_to_run = []
+    cells_to_run = []
+    # The (language, metastore id) of the engine of each cell to run
+    cell_engines = []
     record_id = None
 
     with DBSession() as session:
@@ -70,8 +79,8 @@ def run_datadoc_with_config(
             "exports": exports,
         }
 
-        # Prepping chain jobs each unit is a [make_qe_task, run_query_task] combo
-        for index, query_cell in enumerate(query_cells):
+        # Prepping the cells to run, see _get_datadoc_run_tasks
+        for query_cell in query_cells:
             engine_id = query_cell.meta["engine"]
             raw_query = query_cell.context
 
@@ -94,26 +103,28 @@ def run_datadoc_with_config(
                 )
                 raise Exception(e)
 
-            start_query_execution_kwargs = {
-                "cell_id": query_cell.id,
-                "query_execution_params": {
-                    "query": query,
-                    "engine_id": engine_id,
-                    "uid": runner_id,
-                },
-                "data_doc_id": doc_id,
-            }
-            tasks_to_run.append(
-                _start_query_execution_task.si(
-                    **start_query_execution_kwargs,
-                    previous_query_result=(QueryExecutionStatus.DONE.value, 0),
-                )
-                if index == 0
-                else _start_query_execution_task.s(**start_query_execution_kwargs)
+            cells_to_run.append(
+                {
+                    "cell_id": query_cell.id,
+                    "query_execution_params": {
+                        "query": query,
+                        "engine_id": engine_id,
+                        "uid": runner_id,
+                    },
+                    "data_doc_id": doc_id,
+                }
+            )
+            engine = admin_logic.get_query_engine_by_id(engine_id, session=session)
+            cell_engines.append(
+                (engine.language, engine.metastore_id) if engine else (None, None)
             )
 
-            tasks_to_run.append(run_query_task.s(execution_type=execution_type))
-
+    tasks_to_run = _get_datadoc_run_tasks(
+        cells_to_run,
+        execution_type,
+        parallel_cells=parallel_cells,
+        cell_engines=cell_engines,
+    )
     chain(*tasks_to_run).apply_async(
         link=on_datadoc_run_success.s(
             completion_params=completion_params,
@@ -122,6 +133,111 @@ def run_datadoc_with_config(
     )
 
 
+def _get_datadoc_run_tasks(
+    cells_to_run: List,
+    execution_type,
+    parallel_cells=False,
+    cell_engines: Optional[List[Tuple[Optional[str], Optional[int]]]] = None,
+):
+    """Create the tasks to chain to run the cells
+
+    Each cell is a [_start_query_execution_task, run_query_task] combo. The
+    cells run one after another, unless parallel_cells is set: then the cells
+    are split into stages by their dependencies (see get_query_dependencies),
+    the cells of a stage run as a group and _on_datadoc_stage_completion
+    waits for all of them before the next stage starts.
+
+    Arguments:
+        cells_to_run {List} -- The _start_query_execution_task kwargs of each cell
+        execution_type {str}
+        parallel_cells {bool}
+        cell_engines {List} -- The (language, metastore id) of the engine of
+            each cell, see get_query_dependencies
+
+    Returns:
+        List -- The tasks to chain
+    """
+    stages = _get_cell_stages(
+        [cell["query_execution_params"]["query"] for cell in cells_to_run],
+        parallel_cells,
+        cell_engines=cell_engines,
+    )
+
+    tasks_to_run = []
+    for stage_index, stage in enumerate(stages):
+        cell_tasks = [
+            [
+                _start_query_execution_task.si(
+                    **cells_to_run[cell_index],
+                    previous_query_result=(QueryExecutionStatus.DONE.value, 0),
+                )
+                if stage_index == 0
+                else _start_query_execution_task.s(**cells_to_run[cell_index]),
+                run_query_task.s(execution_type=execution_type),
+            ]
+            for cell_index in stage
+        ]
+
+        if len(cell_tasks) == 1:
+            tasks_to_run.extend(cell_tasks[0])
+        else:
+            tasks_to_run.append(group([chain(*tasks) for tasks in cell_tasks]))
+            tasks_to_run.append(
+                _on_datadoc_stage_completion.s(
+                    is_last_stage=stage_index == len(stages) - 1
+                )
+            )
+    return tasks_to_run
+
+
+def _get_cell_stages(
+    queries: List[str],
+    parallel_cells: bool,
+    cell_engines: Optional[List[Tuple[Optional[str], Optional[int]]]] = None,
+) -> List[List[int]]:
+    """Group the cells (by index) that can run at the same time, a cell is in
+    the stage after the last stage of the cells it depends on
+    """
+    if not parallel_cells:
+        return [[index] for index in range(len(queries))]
+
+    languages = metastore_ids = None
+    if cell_engines is not None:
+        languages = [language for language, _ in cell_engines]
+        metastore_ids = [metastore_id for _, metastore_id in cell_engines]
+
+    stage_per_cell = []
+    for dependencies in get_query_dependencies(
+        queries, languages=languages, metastore_ids=metastore_ids
+    ):
+        stage_per_cell.append(
+            max((stage_per_cell[index] + 1 for index in dependencies), default=0)
+        )
+
+    stages = [[] for _ in range(max(stage_per_cell, default=-1) + 1)]
+    for index, stage in enumerate(stage_per_cell):
+        stages[stage].append(index)
+    return stages
+
+
+@celery.task
+def _on_datadoc_stage_completion(query_results, is_last_stage):
+    """Called once all the cells of a stage are done, with their
+    run_query_task results. Fails the DataDoc run like
+    _start_query_execution_task if a cell did not succeed.
+
+    Returns:
+        The result of the failed cell if it is the last stage,
+        otherwise the result of the last cell
+    """
+    for query_status, query_execution_id in query_results:
+        if query_status != QueryExecutionStatus.DONE.value:
+            if is_last_stage:
+                return (query_status, query_execution_id)
+            raise Exception(get_datadoc_error_message(query_execution_id))
+    return tuple(query_results[-1])
+
+
 @celery.task(bind=True)
 def _start_query_execution_task(
     self,
@@ -143,6 +259,8 @@ def _start_query_execution_task(
             [query_execution.id],
             session=session,
         )
+        # run_query_task skips the execution if a cached result is used
+        apply_cached_query_execution(query_execution.id, session=session)
 
         socketio.emit(
             "data_doc_query_execution",
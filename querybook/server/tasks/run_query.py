@@ -9,12 +9,16 @@ from app.flask_app import celery
 from const.query_execution import QueryExecutionStatus, QueryExecutionType
 from lib.query_executor.notification import notifiy_on_execution_completion
 from lib.query_executor.executor_factory import create_executor_from_execution
+from lib.query_executor.executor_poller import (
+    get_executor_poller,
+    is_multiplexed_poll_enabled,
+)
 from lib.query_executor.exc import QueryExecutorException
+from lib.query_executor.result_cache import cache_query_execution_result
 from lib.query_executor.utils import format_error_message
 from lib.stats_logger import QUERY_EXECUTIONS, stats_logger
 
 from logic import query_execution as qe_logic
-from logic.elasticsearch import update_query_execution_by_id
 from tasks.log_query_per_table import log_query_per_table_task
 
 LOG = get_task_logger(__name__)
@@ -31,6 +35,17 @@ LOG = get_task_logger(__name__)
 def run_query_task(
     self, query_execution_id, execution_type=QueryExecutionType.ADHOC.value
 ):
+    if is_query_execution_done(query_execution_id):
+        # The execution was completed with a cached result, it still
+        # goes through the same completion steps as an executed query
+        with DBSession() as session:
+            notifiy_on_execution_completion(query_execution_id, session=session)
+            qe_logic.update_es_query_execution_by_id(query_execution_id)
+            log_query_per_table_task.delay(
+                query_execution_id, execution_type=execution_type
+            )
+        return (QueryExecutionStatus.DONE.value, query_execution_id)
+
     stats_logger.incr(QUERY_EXECUTIONS, tags={"execution_type": execution_type})
 
     executor = None
@@ -41,7 +56,10 @@ def run_query_task(
         executor = create_executor_from_execution(
             query_execution_id, celery_task=self, execution_type=execution_type
         )
-        run_executor_until_finish(self, executor)
+        if is_multiplexed_poll_enabled():
+            get_executor_poller().run_executor_until_finish(self, executor)
+        else:
+            run_executor_until_finish(self, executor)
     except SoftTimeLimitExceeded:
         # SoftTimeLimitExceeded
         # This exception happens when query has been running for more than
@@ -63,7 +81,7 @@ def run_query_task(
                 query_execution_id, executor, error_message, session=session
             )
             notifiy_on_execution_completion(query_execution_id, session=session)
-            update_query_execution_by_id(query_execution_id, session=session)
+            qe_logic.update_es_query_execution_by_id(query_execution_id)
 
             # Executor exists means the query actually executed
             # This prevents cases when query_execution got executed twice
@@ -71,6 +89,7 @@ def run_query_task(
                 log_query_per_table_task.delay(
                     query_execution_id, execution_type=execution_type
                 )
+                cache_query_execution_result(query_execution_id, session=session)
 
     return (
         query_execution_status.value if executor is not None else None,
@@ -89,6 +108,17 @@ def run_executor_until_finish(celery_task, executor):
         executor.sleep()
 
 
+@with_session
+def is_query_execution_done(query_execution_id, session=None):
+    query_execution = qe_logic.get_query_execution_by_id(
+        query_execution_id, session=session
+    )
+    return (
+        query_execution is not None
+        and query_execution.status == QueryExecutionStatus.DONE
+    )
+
+
 @with_session
 def get_query_execution_final_status(
     query_execution_id, executor, error_message, session=None
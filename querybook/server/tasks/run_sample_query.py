@@ -41,8 +41,11 @@ def run_sample_query(
         )
 
         async_execute_query = ExecuteQuery(True)
-        async_execute_query(query, engine_id, uid=uid, session=session)
-        poll_query_until_finish(self, async_execute_query)
+        try:
+            async_execute_query(query, engine_id, uid=uid, session=session)
+            poll_query_until_finish(self, async_execute_query)
+        finally:
+            async_execute_query.close()
 
         results = {
             "created_at": DATETIME_TO_UTC(datetime.now()),
@@ -1,6 +1,43 @@
 from app.flask_app import celery
+from clients.redis_client import with_redis
 from lib.celery.task_decorator import debounced_task
-from const.elasticsearch import ElasticsearchItem
+from const.elasticsearch import (
+    ElasticsearchItem,
+    ELASTICSEARCH_SYNC_ALL_FIELDS,
+    ELASTICSEARCH_SYNC_QUEUE_FIELDS_KEY_PREFIX,
+    ELASTICSEARCH_SYNC_QUEUE_KEY,
+)
+
+# The fields of an item are kept longer than the flush interval
+# in case the flusher is not running
+ELASTICSEARCH_SYNC_QUEUE_FIELDS_TIMEOUT = 24 * 60 * 60
+
+
+@with_redis
+def queue_sync_elasticsearch(item_type, item_id, fields=None, redis_conn=None):
+    """Mark the item as dirty, it is reindexed along with the other
+    queued items by the next flush_sync_elasticsearch_queue.
+    Queueing the same item several times reindexes it only once.
+
+    Arguments:
+        fields {List[str]} -- The search document fields that changed,
+            all of them if None. The fields queued for the same item add up.
+    """
+    member = f"{item_type}:{item_id}"
+    fields_key = ELASTICSEARCH_SYNC_QUEUE_FIELDS_KEY_PREFIX + member
+    with redis_conn.pipeline() as pipe:
+        pipe.sadd(fields_key, *(fields or [ELASTICSEARCH_SYNC_ALL_FIELDS]))
+        pipe.expire(fields_key, ELASTICSEARCH_SYNC_QUEUE_FIELDS_TIMEOUT)
+        pipe.sadd(ELASTICSEARCH_SYNC_QUEUE_KEY, member)
+        pipe.execute()
+
+
+@celery.task(bind=True)
+def flush_sync_elasticsearch_queue(self, *args, **kwargs):
+    # Delaying this import to avoid circular depdendency
+    from logic.elasticsearch import flush_sync_queue
+
+    flush_sync_queue()
 
 
 @debounced_task(countdown=60)
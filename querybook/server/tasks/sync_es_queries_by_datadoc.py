@@ -1,28 +1,28 @@
 from app.db import DBSession, with_session
 from app.flask_app import celery
+from const.elasticsearch import ElasticsearchItem
 from lib.celery.task_decorator import debounced_task
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 
 
 @with_session
 def _sync_query_cells_by_data_doc_id(doc_id, session=None):
     # Delaying this import to avoid circular dependency
-    from logic.elasticsearch import update_query_cell_by_id
     from logic.datadoc import get_query_cells_by_data_doc_id
 
     query_cells = get_query_cells_by_data_doc_id(doc_id, session=session)
     for cell in query_cells:
-        update_query_cell_by_id(cell.id, session=session)
+        queue_sync_elasticsearch(ElasticsearchItem.query_cells.value, cell.id)
 
 
 @with_session
 def _sync_query_executions_by_data_doc_id(doc_id, session=None):
     # Delaying this import to avoid circular dependency
-    from logic.elasticsearch import update_query_execution_by_id
     from logic.datadoc import get_query_executions_by_data_doc_id
 
     query_executions = get_query_executions_by_data_doc_id(doc_id, session=session)
     for execution in query_executions:
-        update_query_execution_by_id(execution.id, session=session)
+        queue_sync_elasticsearch(ElasticsearchItem.query_executions.value, execution.id)
 
 
 @debounced_task(countdown=60)
@@ -0,0 +1,181 @@
+import gzip
+import io
+import threading
+import time
+from unittest import TestCase, mock
+
+from clients.s3_client import MultiPartUploader, S3FileReader
+from env import QuerybookSettings
+
+
+class FakeS3Client(object):
+    """Stand-in for the multipart upload api of boto3's s3 client"""
+
+    def __init__(self, upload_delay=0):
+        self.upload_delay = upload_delay
+        self.uploaded_parts = {}
+        self.completed_parts = None
+        self.aborted = False
+        self.upload_params = None
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.upload_params = kwargs
+        return {"UploadId": "upload_id"}
+
+    def upload_part(self, Bucket, Key, PartNumber, UploadId, Body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.upload_delay)
+        with self._lock:
+            self.in_flight -= 1
+            self.uploaded_parts[PartNumber] = Body
+        return {"ETag": f'"etag_{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed_parts = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        if self.aborted:
+            raise Exception("NoSuchUpload")
+        self.aborted = True
+
+    @property
+    def content(self):
+        return "".join(
+            self.uploaded_parts[part["PartNumber"]] for part in self.completed_parts
+        )
+
+
+class MultiPartUploaderTestCase(TestCase):
+    def setUp(self):
+        for patcher in [
+            mock.patch.object(QuerybookSettings, "STORE_MIN_UPLOAD_CHUNK_SIZE", 10),
+            mock.patch.object(QuerybookSettings, "STORE_MAX_UPLOAD_CHUNK_NUM", 10000),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get_uploader(self, s3_client, **kwargs):
+        with mock.patch("clients.s3_client.boto3.client", return_value=s3_client):
+            return MultiPartUploader("bucket", "key", **kwargs)
+
+    def _upload(self, uploader, num_lines):
+        lines = [f"line {i},{'x' * (i % 7)}\n" for i in range(num_lines)]
+        for line in lines:
+            uploader.write(line)
+        uploader.complete()
+        return "".join(lines)
+
+    def assert_parts_in_order(self, s3_client):
+        self.assertEqual(
+            s3_client.completed_parts,
+            [
+                {"PartNumber": part_number, "ETag": f"etag_{part_number}"}
+                for part_number in range(1, len(s3_client.uploaded_parts) + 1)
+            ],
+        )
+
+    def test_sequential_upload(self):
+        s3_client = FakeS3Client()
+        uploader = self._get_uploader(s3_client, max_concurrent_parts=1)
+        content = self._upload(uploader, 100)
+
+        self.assertEqual(s3_client.content, content)
+        self.assert_parts_in_order(s3_client)
+        self.assertEqual(s3_client.max_in_flight, 1)
+
+    def test_concurrent_upload(self):
+        s3_client = FakeS3Client(upload_delay=0.005)
+        uploader = self._get_uploader(
+            s3_client, max_concurrent_parts=4, max_pending_size=1000
+        )
+        content = self._upload(uploader, 200)
+
+        self.assertEqual(s3_client.content, content)
+        self.assert_parts_in_order(s3_client)
+        self.assertGreater(s3_client.max_in_flight, 1)
+        self.assertLessEqual(s3_client.max_in_flight, 4)
+
+    def test_concurrent_upload_memory_cap(self):
+        s3_client = FakeS3Client(upload_delay=0.005)
+        uploader = self._get_uploader(
+            s3_client, max_concurrent_parts=4, max_pending_size=30
+        )
+        max_pending_size = 0
+
+        def write(line):
+            nonlocal max_pending_size
+            uploader.write(line)
+            max_pending_size = max(max_pending_size, uploader._pending_size)
+
+        for i in range(100):
+            write(f"line {i}\n")
+        uploader.complete()
+
+        # Every part is over 10 chars, so at most 2 parts can be pending
+        self.assertLessEqual(max_pending_size, 30)
+        self.assertLessEqual(s3_client.max_in_flight, 2)
+        self.assert_parts_in_order(s3_client)
+
+    def test_max_chunk_num(self):
+        s3_client = FakeS3Client()
+        with mock.patch.object(QuerybookSettings, "STORE_MAX_UPLOAD_CHUNK_NUM", 2):
+            uploader = self._get_uploader(s3_client, max_concurrent_parts=4)
+            self.assertTrue(uploader.write("a" * 11))
+            self.assertTrue(uploader.write("b" * 11))
+            self.assertFalse(uploader.write("c" * 11))
+            uploader.complete()
+
+        self.assertEqual(s3_client.content, "a" * 11 + "b" * 11)
+
+    def test_failed_part_aborts_upload(self):
+        s3_client = FakeS3Client()
+        s3_client.upload_part = mock.Mock(side_effect=Exception("Upload failed"))
+        uploader = self._get_uploader(s3_client, max_concurrent_parts=2)
+
+        uploader.write("a" * 11)
+        with self.assertRaises(Exception):
+            uploader.complete()
+
+        self.assertTrue(s3_client.aborted)
+        self.assertIsNone(s3_client.completed_parts)
+
+        # The owner of the uploader aborts it as well on failure
+        uploader.abort()
+
+    def test_content_encoding(self):
+        s3_client = FakeS3Client()
+        uploader = self._get_uploader(s3_client, content_encoding="gzip")
+        uploader.write(b"compressed")
+        uploader.complete()
+
+        self.assertEqual(s3_client.upload_params, {"ContentEncoding": "gzip"})
+
+
+class S3FileReaderTestCase(TestCase):
+    raw_csv = "".join(f'{i},é✓,"multi\nline"\n' for i in range(1000))
+
+    def _get_reader(self, body: bytes, **kwargs):
+        with mock.patch(
+            "clients.s3_client.open_s3_object", return_value=io.BytesIO(body)
+        ):
+            return S3FileReader("bucket", "key", **kwargs)
+
+    def test_read_uncompressed(self):
+        reader = self._get_reader(self.raw_csv.encode(), read_size=7)
+        self.assertEqual(reader.read_lines(), self.raw_csv.split("\n")[:-1])
+
+    def test_read_compressed(self):
+        for read_size in [1, 7, 100000]:
+            reader = self._get_reader(
+                gzip.compress(self.raw_csv.encode()), read_size=read_size
+            )
+            self.assertEqual(
+                list(reader.get_csv_iter()),
+                [[str(i), "é✓", "multi\nline"] for i in range(1000)],
+            )
@@ -2,11 +2,26 @@ import datetime
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 from const.data_doc import DataCellType
+from const.elasticsearch import ELASTICSEARCH_SYNC_QUEUE_KEY
+from tasks.sync_elasticsearch import queue_sync_elasticsearch
 
 from logic.elasticsearch import (
+    _bulk,
+    _bulk_insert_index,
+    _bulk_insert,
+    _bulk_upsert,
+    _get_query_cell_executions_iter,
     datadocs_to_es,
+    _record_reindex_update,
+    _swap_alias,
+    bulk_update_index_by_fields,
+    create_indices,
+    flush_sync_queue,
+    get_table_weights,
+    get_tables_iter,
     query_cell_to_es,
     query_execution_to_es,
+    recreate_indices,
     table_to_es,
     user_to_es,
 )
@@ -436,6 +451,135 @@ class TableTestCase(TestCase):
         )
         self.assertEqual(self.get_table_weight_mock.call_count, 0)
 
+    def test_precomputed_weight(self):
+        result = table_to_es(
+            self.table_mock,
+            fields=["importance_score"],
+            weight=3,
+            session=MagicMock(),
+        )
+        self.assertEqual(result, {"importance_score": 3})
+        self.assertEqual(self.get_table_weight_mock.call_count, 0)
+
+
+class TablesIterTestCase(TestCase):
+    def setUp(self):
+        self.tables = [MagicMock(id=i, boost_score=0) for i in range(1, 6)]
+
+        def get_tables_after_id(after_id=0, limit=100, session=None):
+            return [t for t in self.tables if t.id > after_id][:limit]
+
+        get_tables_patch = patch(
+            "logic.elasticsearch.get_tables_after_id", side_effect=get_tables_after_id
+        )
+        self.get_tables_mock = get_tables_patch.start()
+        self.addCleanup(get_tables_patch.stop)
+
+        table_to_es_patch = patch(
+            "logic.elasticsearch.table_to_es",
+            side_effect=lambda table, fields=None, weight=None, session=None: (
+                table.id,
+                weight,
+            ),
+        )
+        table_to_es_patch.start()
+        self.addCleanup(table_to_es_patch.stop)
+
+        samples_count_patch = patch(
+            "logic.elasticsearch.get_tables_query_samples_count",
+            return_value={1: 3},
+        )
+        self.samples_count_mock = samples_count_patch.start()
+        self.addCleanup(samples_count_patch.stop)
+
+        viewers_count_patch = patch(
+            "logic.elasticsearch.get_viewers_count_by_items_after_date",
+            return_value={2: 1},
+        )
+        self.viewers_count_mock = viewers_count_patch.start()
+        self.addCleanup(viewers_count_patch.stop)
+
+    def test_keyset_pagination(self):
+        result = list(get_tables_iter(batch_size=2, session=MagicMock()))
+
+        self.assertEqual([table_id for table_id, _ in result], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [c.kwargs["after_id"] for c in self.get_tables_mock.call_args_list],
+            [0, 2, 4],
+        )
+        # One aggregate query per batch rather than per table
+        self.assertEqual(self.samples_count_mock.call_count, 3)
+        self.assertEqual(self.viewers_count_mock.call_count, 3)
+
+    def test_precomputed_weights(self):
+        result = dict(get_tables_iter(batch_size=10, session=MagicMock()))
+        self.assertEqual(result, {1: 4, 2: 1, 3: 0, 4: 0, 5: 0})
+
+    def test_no_weights_for_partial_fields(self):
+        result = dict(
+            get_tables_iter(batch_size=10, fields=["tags"], session=MagicMock())
+        )
+        self.assertEqual(result, {i: None for i in range(1, 6)})
+        self.assertEqual(self.samples_count_mock.call_count, 0)
+        self.assertEqual(self.viewers_count_mock.call_count, 0)
+
+    def test_get_table_weights(self):
+        self.tables[2].boost_score = 7
+        self.assertEqual(
+            get_table_weights(self.tables, session=MagicMock()),
+            {1: 4, 2: 1, 3: 3, 4: 0, 5: 0},
+        )
+
+
+class QueryCellExecutionsIterTestCase(TestCase):
+    def setUp(self):
+        self.query_cells = [MagicMock(id=i) for i in range(1, 4)]
+        # (data_cell_query_execution id, data_cell_id, query execution id)
+        self.cell_executions = [(1, 1, 10), (2, 2, 11), (3, 1, 12), (4, 3, 13)]
+
+        def get_query_cells_after_id(after_id=0, limit=100, session=None):
+            return [c for c in self.query_cells if c.id > after_id][:limit]
+
+        def get_executions(data_cell_ids, after_id=0, limit=100, session=None):
+            return [
+                (link_id, cell_id, MagicMock(id=execution_id))
+                for link_id, cell_id, execution_id in self.cell_executions
+                if cell_id in data_cell_ids and link_id > after_id
+            ][:limit]
+
+        for name, side_effect in (
+            ("get_query_cells_after_id", get_query_cells_after_id),
+            (
+                "get_successful_query_executions_by_data_cell_ids_after_id",
+                get_executions,
+            ),
+            (
+                "query_execution_to_es",
+                lambda query_execution, data_cell=None, fields=None, session=None: (
+                    query_execution.id,
+                    data_cell.id,
+                ),
+            ),
+        ):
+            mock_patch = patch(f"logic.elasticsearch.{name}", side_effect=side_effect)
+            setattr(self, f"{name}_mock", mock_patch.start())
+            self.addCleanup(mock_patch.stop)
+
+    def test_batched_executions(self):
+        result = list(
+            _get_query_cell_executions_iter(batch_size=2, session=MagicMock())
+        )
+
+        self.assertEqual(sorted(result), [(10, 1), (11, 2), (12, 1), (13, 3)])
+        # Executions are fetched per batch of cells, not per cell
+        self.assertEqual(
+            [
+                (c.args[0], c.kwargs["after_id"])
+                for c in self.get_successful_query_executions_by_data_cell_ids_after_id_mock.call_args_list
+            ],
+            [([1, 2], 0), ([1, 2], 2), ([3], 0)],
+        )
+
 
 class UserTestCase(TestCase):
     def setUp(self):
@@ -486,3 +630,418 @@ class UserTestCase(TestCase):
                 },
             )
             self.assertEqual(mock_process_names.call_count, 0)
+
+
+class BulkIndexTestCase(TestCase):
+    def setUp(self):
+        get_hosted_es_patch = patch("logic.elasticsearch.get_hosted_es")
+        get_hosted_es_patch.start()
+        self.addCleanup(get_hosted_es_patch.stop)
+
+        streaming_bulk_patch = patch("logic.elasticsearch.streaming_bulk")
+        self.streaming_bulk_mock = streaming_bulk_patch.start()
+        self.addCleanup(streaming_bulk_patch.stop)
+
+        self.actions = []
+
+        def streaming_bulk(client, actions, **kwargs):
+            for action in actions:
+                self.actions.append(action)
+                ok = action["_id"] != 2
+                yield ok, {
+                    "index": {"_id": action["_id"], "status": 200 if ok else 400}
+                }
+
+        self.streaming_bulk_mock.side_effect = streaming_bulk
+
+    def test_bulk_insert(self):
+        docs = [{"id": 1, "title": "a"}, {"id": 2, "title": "b"}]
+        self.assertEqual(_bulk_insert("test_index", iter(docs)), (1, 1))
+        self.assertEqual(
+            self.actions,
+            [{"_id": 1, "_source": docs[0]}, {"_id": 2, "_source": docs[1]}],
+        )
+        kwargs = self.streaming_bulk_mock.call_args.kwargs
+        self.assertEqual(kwargs["index"], "test_index")
+        self.assertFalse(kwargs["raise_on_error"])
+
+    def test_bulk_upsert(self):
+        self.assertEqual(_bulk_upsert("test_index", [{"id": 1, "title": "a"}]), (1, 0))
+        self.assertEqual(
+            self.actions,
+            [
+                {
+                    "_op_type": "update",
+                    "_id": 1,
+                    "doc": {"id": 1, "title": "a"},
+                    "doc_as_upsert": True,
+                }
+            ],
+        )
+
+    def test_bulk_update_index_by_fields(self):
+        with patch("logic.elasticsearch.get_tables_iter", return_value=iter([])):
+            self.assertEqual(bulk_update_index_by_fields("tables", ["tags"]), (0, 0))
+
+        tables = [{"id": 1, "tags": []}, {"id": 2, "tags": []}]
+        with patch("logic.elasticsearch.get_tables_iter", return_value=iter(tables)):
+            # The document 2 fails
+            with self.assertRaises(Exception):
+                bulk_update_index_by_fields("tables", ["tags"])
+
+    def test_document_missing(self):
+        def streaming_bulk(client, actions, **kwargs):
+            for action in actions:
+                yield False, {
+                    "update": {
+                        "_index": "search_tables_v1_1",
+                        "_id": str(action["_id"]),
+                        "status": 404,
+                        "error": {"type": "document_missing_exception"},
+                    }
+                }
+
+        self.streaming_bulk_mock.side_effect = streaming_bulk
+        actions = [{"_op_type": "update", "_id": 1, "doc": {}, "doc_as_upsert": False}]
+
+        self.assertEqual(_bulk("test_index", actions), (0, 1))
+
+        missing_ids = []
+        self.assertEqual(
+            _bulk("test_index", actions, on_document_missing=missing_ids.append),
+            (0, 0),
+        )
+        self.assertEqual(missing_ids, ["1"])
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def exists(self, key):
+        return key in self.values
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def sadd(self, key, *values):
+        self.values.setdefault(key, set()).update(
+            value if isinstance(value, bytes) else str(value).encode()
+            for value in values
+        )
+
+    def smembers(self, key):
+        return set(self.values.get(key, set()))
+
+    def expire(self, key, timeout):
+        pass
+
+    def pipeline(self):
+        return FakeRedisPipeline(self)
+
+    def spop(self, key, count):
+        members = self.values.get(key, set())
+        popped = [members.pop() for _ in range(min(count, len(members)))]
+        if not members:
+            self.delete(key)
+        return popped
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+class ReindexTestCase(TestCase):
+    ALIAS = "search_tables_v1"
+
+    def setUp(self):
+        # concrete index name -> aliases
+        self.indices = {}
+        self.es = MagicMock()
+        self.es.indices.exists.side_effect = lambda index: bool(self._get(index))
+        self.es.indices.get.side_effect = lambda index, **kwargs: self._get(index)
+        self.es.indices.create.side_effect = lambda index, body: self.indices.update(
+            {index: set()}
+        )
+        self.es.indices.delete.side_effect = lambda index, **kwargs: self.indices.pop(
+            index, None
+        )
+        self.es.indices.update_aliases.side_effect = self._update_aliases
+
+        es_patch = patch("logic.elasticsearch.get_hosted_es", return_value=self.es)
+        es_patch.start()
+        self.addCleanup(es_patch.stop)
+
+        self.redis = FakeRedis()
+        redis_patch = patch("logic.elasticsearch.get_redis", return_value=self.redis)
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+
+        self.updated = []
+        # A table is updated while the new index is being built
+        bulk_insert_patch = patch(
+            "logic.elasticsearch._bulk_insert_index",
+            side_effect=lambda type_name, index_name=None: _record_reindex_update(
+                self.ALIAS, 5
+            ),
+        )
+        self.bulk_insert_mock = bulk_insert_patch.start()
+        self.addCleanup(bulk_insert_patch.stop)
+
+        update_patch = patch(
+            "logic.elasticsearch._update_by_id",
+            side_effect=lambda type_name, id, index_name=None: self.updated.append(
+                (id, index_name)
+            ),
+        )
+        update_patch.start()
+        self.addCleanup(update_patch.stop)
+
+    def _get(self, index):
+        if index.endswith("*"):
+            return {name: {} for name in self.indices if name.startswith(index[:-1])}
+        return {
+            name: {}
+            for name, aliases in self.indices.items()
+            if name == index or index in aliases
+        }
+
+    def _update_aliases(self, body):
+        for action in body["actions"]:
+            if "remove_index" in action:
+                self.indices.pop(action["remove_index"]["index"])
+            elif "remove" in action:
+                self.indices[action["remove"]["index"]].discard(
+                    action["remove"]["alias"]
+                )
+            else:
+                self.indices[action["add"]["index"]].add(action["add"]["alias"])
+
+    def test_reindex(self):
+        self.indices = {f"{self.ALIAS}_v1": {self.ALIAS}}
+        recreate_indices("tables")
+
+        self.assertEqual(self.indices, {f"{self.ALIAS}_v2": {self.ALIAS}})
+        self.bulk_insert_mock.assert_called_once_with(
+            "tables", index_name=f"{self.ALIAS}_v2"
+        )
+        # The update made during the build is replayed on the new index
+        self.assertEqual(self.updated, [(5, f"{self.ALIAS}_v2")])
+        self.assertEqual(self.redis.values, {})
+
+    def test_reindex_legacy_index(self):
+        self.indices = {self.ALIAS: set()}
+        recreate_indices("tables")
+
+        self.assertEqual(self.indices, {f"{self.ALIAS}_v1": {self.ALIAS}})
+        self.assertEqual(
+            self.es.indices.update_aliases.call_args.args[0]["actions"],
+            [
+                {"remove_index": {"index": self.ALIAS}},
+                {"add": {"index": f"{self.ALIAS}_v1", "alias": self.ALIAS}},
+            ],
+        )
+
+    def test_failed_reindex(self):
+        self.indices = {f"{self.ALIAS}_v1": {self.ALIAS}}
+        self.bulk_insert_mock.side_effect = Exception("ES is down")
+
+        with self.assertRaises(Exception):
+            recreate_indices("tables")
+        self.assertEqual(self.indices, {f"{self.ALIAS}_v1": {self.ALIAS}})
+        self.assertEqual(self.redis.values, {})
+
+    def test_partially_failed_reindex(self):
+        self.indices = {f"{self.ALIAS}_v1": {self.ALIAS}}
+        self.bulk_insert_mock.side_effect = _bulk_insert_index
+
+        # A document failed to be indexed
+        with patch("logic.elasticsearch._bulk_insert_tables", return_value=(9, 1)):
+            with self.assertRaises(Exception):
+                recreate_indices("tables")
+        self.assertEqual(self.indices, {f"{self.ALIAS}_v1": {self.ALIAS}})
+
+        # The bulk insert stopped halfway
+        with patch("logic.elasticsearch.get_tables_iter"), patch(
+            "logic.elasticsearch._bulk",
+            side_effect=ConnectionError("ES is down"),
+        ):
+            with self.assertRaises(ConnectionError):
+                recreate_indices("tables")
+        self.assertEqual(self.indices, {f"{self.ALIAS}_v1": {self.ALIAS}})
+
+    def test_failed_create(self):
+        self.bulk_insert_mock.side_effect = Exception("ES is down")
+
+        with self.assertRaises(Exception):
+            create_indices("tables")
+        self.assertEqual(self.indices, {})
+
+    def test_swap_alias(self):
+        self.indices = {"a_v1": {"a"}, "a_v2": set()}
+        _swap_alias("a", "a_v2")
+        self.assertEqual(self.indices, {"a_v2": {"a"}})
+
+    def test_no_record_outside_reindex(self):
+        _record_reindex_update(self.ALIAS, 5)
+        self.assertEqual(self.redis.values, {})
+
+
+class SyncQueueTestCase(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        redis_patch = patch("logic.elasticsearch.get_redis", return_value=self.redis)
+        redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+
+        # Archived or deleted items have no document
+        get_doc_patch = patch(
+            "logic.elasticsearch._get_es_doc_by_id",
+            side_effect=lambda type_name, id, fields=None, session=None: (
+                None
+                if id == 404
+                else {field: id for field in (sorted(fields) if fields else ["id"])}
+            ),
+        )
+        self.get_doc_mock = get_doc_patch.start()
+        self.addCleanup(get_doc_patch.stop)
+
+        self.actions = []
+        self.missing_ids = set()
+        bulk_patch = patch(
+            "logic.elasticsearch._bulk",
+            side_effect=self._bulk,
+        )
+        self.bulk_mock = bulk_patch.start()
+        self.addCleanup(bulk_patch.stop)
+
+    def _bulk(self, index_name, actions, on_document_missing=None):
+        self.actions.append(list(actions))
+        for action in self.actions[-1]:
+            if action["_id"] in self.missing_ids and not action.get("doc_as_upsert"):
+                on_document_missing(str(action["_id"]))
+
+    def _queue(self, item_type, item_id, fields=None):
+        queue_sync_elasticsearch(
+            item_type, item_id, fields=fields, redis_conn=self.redis
+        )
+
+    def test_flush(self):
+        self._queue("datadocs", 1)
+        self._queue("datadocs", 1)
+        self._queue("datadocs", 404)
+        self._queue("boards", 1)
+        flush_sync_queue(session=MagicMock())
+
+        # One bulk request for all the items, each reindexed once
+        self.assertEqual(len(self.actions), 1)
+        self.assertCountEqual(
+            self.actions[0],
+            [
+                {
+                    "_op_type": "update",
+                    "_index": "search_datadocs_v1",
+                    "_id": 1,
+                    "doc": {"id": 1},
+                    "doc_as_upsert": True,
+                },
+                {
+                    "_op_type": "delete",
+                    "_index": "search_datadocs_v1",
+                    "_id": 404,
+                },
+                {
+                    "_op_type": "update",
+                    "_index": "search_boards_v1",
+                    "_id": 1,
+                    "doc": {"id": 1},
+                    "doc_as_upsert": True,
+                },
+            ],
+        )
+        self.assertEqual(self.get_doc_mock.call_count, 3)
+        self.assertEqual(self.redis.values, {})
+
+    def test_empty_queue(self):
+        flush_sync_queue(session=MagicMock())
+        self.bulk_mock.assert_not_called()
+
+    def test_partial_update(self):
+        self._queue("tables", 1, fields=["tags"])
+        self._queue("tables", 1, fields=["description"])
+        flush_sync_queue(session=MagicMock())
+
+        self.assertEqual(
+            self.actions,
+            [
+                [
+                    {
+                        "_op_type": "update",
+                        "_index": "search_tables_v1",
+                        "_id": 1,
+                        "doc": {"description": 1, "tags": 1},
+                        "doc_as_upsert": False,
+                    }
+                ]
+            ],
+        )
+        self.assertEqual(self.redis.values, {})
+
+    def test_partial_and_full_update(self):
+        self._queue("tables", 1, fields=["tags"])
+        self._queue("tables", 1)
+        flush_sync_queue(session=MagicMock())
+
+        self.assertEqual(self.actions[0][0]["doc"], {"id": 1})
+        self.assertTrue(self.actions[0][0]["doc_as_upsert"])
+
+    def test_requeue_missing_document(self):
+        self.missing_ids = {1}
+        self._queue("tables", 1, fields=["tags"])
+        self._queue("datadocs", 1)
+        self._queue("datadocs", 2, fields=["title"])
+        flush_sync_queue(session=MagicMock())
+
+        # Only the partially updated table is missing, it is fully updated next
+        self.assertEqual(len(self.actions), 2)
+        self.assertEqual(
+            self.actions[1],
+            [
+                {
+                    "_op_type": "update",
+                    "_index": "search_tables_v1",
+                    "_id": 1,
+                    "doc": {"id": 1},
+                    "doc_as_upsert": True,
+                }
+            ],
+        )
+        self.assertEqual(self.redis.values, {})
+
+    def test_requeue_on_failure(self):
+        self._queue("tables", 1)
+        self._queue("tables", 2)
+        self.bulk_mock.side_effect = Exception("ES is down")
+
+        with self.assertRaises(Exception):
+            flush_sync_queue(session=MagicMock())
+        self.assertEqual(
+            self.redis.values[ELASTICSEARCH_SYNC_QUEUE_KEY], {b"tables:1", b"tables:2"}
+        )
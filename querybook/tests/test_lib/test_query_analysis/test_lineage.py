@@ -5,6 +5,8 @@ from lib.query_analysis.lineage import (
     get_statement_placeholders,
     get_statement_schema,
     get_table_statement_type,
+    get_statement_dependencies,
+    get_query_dependencies,
 )
 
 
@@ -183,3 +185,78 @@ class GetTableStatementTypeTestCase(TestCase):
         self.assertSequenceEqual(
             get_table_statement_type(raw_query), [None, "INSERT", None]
         )
+
+
+class GetStatementDependenciesTestCase(TestCase):
+    def test_independent_statements(self):
+        self.assertEqual(
+            get_statement_dependencies(
+                [
+                    "select * from a",
+                    "select * from b join c on b.id = c.id",
+                    "create table d as select * from a",
+                ]
+            ),
+            [set(), set(), set()],
+        )
+
+    def test_table_dependencies(self):
+        self.assertEqual(
+            get_statement_dependencies(
+                [
+                    "create table b as select * from a",
+                    "select * from b",
+                    "select * from c",
+                    "insert into c select * from a",
+                    "with x as (select * from c) select * from x",
+                    "drop table b",
+                ]
+            ),
+            [set(), {0}, set(), {2}, {3}, {0, 1}],
+        )
+
+    def test_barrier_statements(self):
+        self.assertEqual(
+            get_statement_dependencies(
+                [
+                    "select * from a",
+                    "set hive.exec.parallel=true",
+                    "select * from b",
+                    "use test",
+                    "select * from c",
+                ]
+            ),
+            [set(), {0}, {1}, {0, 1, 2}, {1, 3}],
+        )
+
+
+class GetQueryDependenciesTestCase(TestCase):
+    def test_query_dependencies(self):
+        self.assertEqual(
+            get_query_dependencies(
+                [
+                    "set hive.exec.parallel=true; create table b as select * from a",
+                    "use foo; select * from b",
+                    "select * from b",
+                    "insert into c select 1; select * from d",
+                    "show tables",
+                    "select * from a",
+                ]
+            ),
+            [set(), set(), {0}, set(), {0, 1, 2, 3}, {4}],
+        )
+
+    def test_query_dependencies_per_metastore(self):
+        self.assertEqual(
+            get_query_dependencies(
+                [
+                    "create table b as select * from a",
+                    "select * from b",
+                    "show tables",
+                    "select * from b",
+                ],
+                languages=["hive", "presto", "sqlite", "hive"],
+                metastore_ids=[1, 2, 2, None],
+            ),
+            [set(), set(), {1}, {0, 2}],
+        )
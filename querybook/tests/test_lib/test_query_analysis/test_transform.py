@@ -4,6 +4,7 @@ from lib.query_analysis.transform import (
     format_query,
     get_select_statement_limit,
     transform_to_limited_query,
+    transform_to_limited_statement,
     transform_to_sampled_query,
 )
 
@@ -112,6 +113,37 @@ class GetLimitedQueryTestCase(TestCase):
                 )
 
 
+class GetLimitedStatementTestCase(TestCase):
+    def test_statement_not_changed(self):
+        tests = [
+            "SELECT * FROM table_1 WHERE field = 1 LIMIT 1000",
+            "-- comment\nSELECT * FROM table_1 ORDER BY id FETCH FIRST 10 ROWS ONLY",
+            "INSERT INTO table_1 SELECT * FROM table_2",
+            "SET foo = bar",
+            "SELECT 1; SELECT 2",
+            "SELECT * FROM (",
+        ]
+        for statement in tests:
+            with self.subTest(statement=statement):
+                self.assertEqual(
+                    transform_to_limited_statement(statement, 100), statement
+                )
+
+    def test_limit_is_not_specified(self):
+        self.assertEqual(
+            transform_to_limited_statement("SELECT * FROM table_1"),
+            "SELECT * FROM table_1",
+        )
+
+    def test_statement_limited(self):
+        self.assertEqual(
+            transform_to_limited_statement(
+                "SELECT * FROM (SELECT * FROM table LIMIT 5) AS x", 100
+            ),
+            "SELECT\n  *\nFROM (\n  SELECT\n    *\n  FROM table\n  LIMIT 5\n) AS x\nLIMIT 100",
+        )
+
+
 class GetSampledQueryTestCase(TestCase):
     def test_single_statement_with_sampled_table(self):
         query = "SELECT * FROM default.users;"
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from lib.query_executor.base_client import CursorBaseClass
+
+
+class FakeCursor(CursorBaseClass):
+    def __init__(self, num_rows):
+        self._rows = [[i] for i in range(num_rows)]
+        self.fetch_sizes = []
+
+    def run(self, query):
+        pass
+
+    def poll(self):
+        return True
+
+    def cancel(self):
+        pass
+
+    def get_one_row(self):
+        return self._rows.pop(0) if len(self._rows) else None
+
+    def get_columns(self):
+        return ["a"]
+
+    def get_n_rows(self, n):
+        self.fetch_sizes.append(n)
+        rows = self._rows[:n]
+        self._rows = self._rows[n:]
+        return rows
+
+
+class GetRowsChunkIterTestCase(TestCase):
+    def test_all_rows(self):
+        cursor = FakeCursor(25)
+        chunks = list(cursor.get_rows_chunk_iter(chunk_size=10))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(cursor.fetch_sizes, [10, 10, 10, 10])
+
+    def test_max_rows(self):
+        cursor = FakeCursor(25)
+        chunks = list(cursor.get_rows_chunk_iter(chunk_size=10, max_rows=13))
+        self.assertEqual(sum(chunks, []), [[i] for i in range(13)])
+        # The last fetch is sized to the remaining rows
+        self.assertEqual(cursor.fetch_sizes, [10, 3])
+
+    def test_max_rows_more_than_result(self):
+        cursor = FakeCursor(5)
+        self.assertEqual(len(list(cursor.get_rows_iter(max_rows=10))), 5)
@@ -1,5 +1,14 @@
-from unittest import TestCase
-from lib.query_executor.base_executor import QueryExecutorBaseClass
+from unittest import TestCase, mock
+
+from const.db import description_length
+from const.query_execution import QUERY_EXECUTION_NAMESPACE, QueryExecutionStatus
+from env import QuerybookSettings
+from lib.query_executor.base_executor import (
+    QueryExecutorBaseClass,
+    QueryExecutorLogger,
+    STREAM_LOG_FLUSH_CHUNKS,
+    STREAM_LOG_FLUSH_INTERVAL,
+)
 
 
 class QueryExecutorBaseMatchTestCase(TestCase):
@@ -31,3 +40,509 @@ class QueryExecutorBaseMatchTestCase(TestCase):
         self.assertTrue(TestEngine.match("French", "Test"))
         self.assertFalse(TestEngine.match("English", "Prod"))
         self.assertFalse(TestEngine.match("Spanish", "Test"))
+
+
+class QueryExecutorLoggerStreamLogTestCase(TestCase):
+    def setUp(self):
+        self.db_logs = []
+        self.uploaded_logs = []
+
+        def create_stream_logs(statement_execution_id, logs, **kwargs):
+            self.db_logs.extend(logs)
+
+        def iterate_stream_logs(statement_execution_id, session=None):
+            yield from self.db_logs
+
+        def uploader_write(log):
+            self.uploaded_logs.append(log)
+            return True
+
+        self.mock_qe_logic = self._patch("qe_logic")
+        self.mock_qe_logic.create_statement_execution_stream_logs.side_effect = (
+            create_stream_logs
+        )
+        self.mock_qe_logic.iterate_statement_execution_stream_logs.side_effect = (
+            iterate_stream_logs
+        )
+        self._patch("DBSession")
+        self._patch("socketio")
+        mock_uploader = self._patch("GenericUploader").return_value.__enter__
+        mock_uploader.return_value.write.side_effect = uploader_write
+        mock_uploader.return_value.upload_url = "s3://bucket/log.txt"
+
+        self.mock_time = self._patch("time")
+        self.mock_time.time.return_value = 0
+
+        self.logger = QueryExecutorLogger(1, mock.MagicMock(), "select 1", [(0, 8)])
+        self.logger.statement_execution_ids.append(10)
+
+    def _patch(self, name):
+        patcher = mock.patch(f"lib.query_executor.base_executor.{name}")
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_buffer_small_logs(self):
+        for _ in range(100):
+            self.logger.on_statement_update(log="a" * 100)
+
+        # Nothing is over description_length yet
+        self.mock_qe_logic.create_statement_execution_stream_logs.assert_not_called()
+
+        self.assertEqual(self.logger._upload_log(10), ("s3://bucket/log.txt", True))
+        self.assertEqual("".join(self.uploaded_logs), "\n".join(["a" * 100] * 100))
+        # The buffered logs are uploaded without going through the DB
+        self.mock_qe_logic.create_statement_execution_stream_logs.assert_not_called()
+        self.mock_qe_logic.delete_statement_execution_stream_log.assert_not_called()
+
+    def test_flush_on_size(self):
+        chunk = "a" * description_length
+        for _ in range(STREAM_LOG_FLUSH_CHUNKS + 1):
+            self.logger.on_statement_update(log=chunk)
+
+        # All chunks are inserted at once
+        self.mock_qe_logic.create_statement_execution_stream_logs.assert_called_once()
+        self.assertEqual(len(self.db_logs), STREAM_LOG_FLUSH_CHUNKS)
+        self.mock_qe_logic.update_statement_execution.assert_called_once_with(
+            10, has_log=True, log_path="stream://", commit=False, session=mock.ANY
+        )
+
+        self.logger._upload_log(10)
+        self.assertEqual(
+            "".join(self.uploaded_logs),
+            "\n".join([chunk] * (STREAM_LOG_FLUSH_CHUNKS + 1)),
+        )
+        self.mock_qe_logic.delete_statement_execution_stream_log.assert_called_once()
+
+    def test_flush_on_time(self):
+        self.logger.on_statement_update(log="a" * (description_length + 1))
+        self.mock_qe_logic.create_statement_execution_stream_logs.assert_not_called()
+
+        # Polls without new logs flush once the interval has passed
+        self.mock_time.time.return_value = STREAM_LOG_FLUSH_INTERVAL
+        self.logger.on_statement_update()
+        self.assertEqual(self.db_logs, ["a" * description_length])
+
+        self.logger._upload_log(10)
+        self.assertEqual("".join(self.uploaded_logs), "a" * (description_length + 1))
+
+    def test_no_log(self):
+        self.assertEqual(self.logger._upload_log(10), (None, False))
+        self.mock_qe_logic.create_statement_execution_stream_logs.assert_not_called()
+
+
+class QueryExecutorLoggerEmitTestCase(TestCase):
+    def setUp(self):
+        self._patch("qe_logic")
+        self._patch("DBSession")
+        self.mock_socketio = self._patch("socketio")
+        self.mock_has_subscriber = self._patch(
+            "QueryExecutionSubscriberChecker"
+        ).return_value.has_subscriber
+        self.mock_has_subscriber.return_value = True
+        self.mock_time = self._patch("time")
+        self.mock_time.time.return_value = 100
+        settings_patch = mock.patch.object(
+            QuerybookSettings, "QUERY_EXECUTION_EMIT_INTERVAL", 1
+        )
+        settings_patch.start()
+        self.addCleanup(settings_patch.stop)
+
+        self.celery_task = mock.MagicMock()
+        self.logger = QueryExecutorLogger(1, self.celery_task, "select 1", [(0, 8)])
+        self.logger.statement_execution_ids.append(10)
+        self.mock_socketio.emit.reset_mock()
+
+    def _patch(self, name):
+        patcher = mock.patch(f"lib.query_executor.base_executor.{name}")
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _get_emits(self, event="statement_update"):
+        return [
+            call.args[1]
+            for call in self.mock_socketio.emit.call_args_list
+            if call.args[0] == event
+        ]
+
+    def test_coalesce_updates(self):
+        self.logger.on_statement_update(log="a", percent_complete=10)
+        self.logger.on_statement_update(log="b", percent_complete=20)
+        self.logger.on_statement_update(log="c")
+        self.assertEqual(
+            self._get_emits(),
+            [{"query_execution_id": 1, "id": 10, "log": ["a"], "percent_complete": 10}],
+        )
+        self.assertEqual(self.celery_task.update_state.call_count, 1)
+
+        # The next poll after the interval sends everything at once
+        self.mock_time.time.return_value += 1
+        self.logger.on_statement_update()
+        self.assertEqual(
+            self._get_emits()[1],
+            {
+                "query_execution_id": 1,
+                "id": 10,
+                "log": ["b", "c"],
+                "percent_complete": 20,
+            },
+        )
+        self.assertEqual(self.celery_task.update_state.call_count, 2)
+
+    def test_no_subscriber(self):
+        self.mock_has_subscriber.return_value = False
+        self.logger.on_statement_update(log="a", percent_complete=10)
+        self.assertEqual(self._get_emits(), [])
+        # The progress is still updated
+        self.assertEqual(self.celery_task.update_state.call_count, 1)
+
+    def test_emit_before_statement_end(self):
+        self.logger.on_statement_update(log="a")
+        self.logger.on_statement_update(log="b")
+        with mock.patch.object(
+            self.logger, "_upload_query_result", return_value=(None, 0)
+        ), mock.patch.object(self.logger, "_upload_log", return_value=(None, False)):
+            self.logger.on_statement_end(mock.MagicMock())
+
+        self.assertEqual(
+            [call.args[0] for call in self.mock_socketio.emit.call_args_list],
+            [
+                "statement_update",
+                "statement_update",
+                "statement_update",
+                "statement_end",
+            ],
+        )
+        self.assertEqual(self._get_emits()[1]["log"], ["b"])
+
+
+class FakeParallelCursor(object):
+    def __init__(self, polls_per_statement):
+        self._polls_per_statement = polls_per_statement
+        self.statement = None
+        self.statements = []
+        self.cancelled = False
+        self.tracking_url = None
+        self.percent_complete = None
+
+    def run(self, statement):
+        self.statement = statement
+        self.statements.append(statement)
+        self._num_polls = 0
+
+    def poll(self):
+        self._num_polls += 1
+        if self._polls_per_statement[self.statement] is None:
+            raise Exception(f"{self.statement} failed")
+        return self._num_polls >= self._polls_per_statement[self.statement]
+
+    def get_logs(self):
+        return ""
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeParallelLogger(object):
+    def __init__(
+        self,
+        query_execution_id,
+        celery_task,
+        query,
+        statement_ranges,
+        max_result_rows=None,
+    ):
+        self._query = query
+        self._statement_ranges = statement_ranges
+        self.statement_execution_ids = []
+        self.current_statement_execution_id = None
+        self.events = []
+
+    def _statement(self, statement_execution_id=None):
+        start, end = self._statement_ranges[
+            self.statement_execution_ids.index(
+                statement_execution_id or self.current_statement_execution_id
+            )
+        ]
+        return self._query[start:end]
+
+    def switch_statement(self, statement_execution_id):
+        self.current_statement_execution_id = statement_execution_id
+
+    def on_statement_start(self, statement_index):
+        statement_execution_id = len(self.statement_execution_ids) + 1
+        self.statement_execution_ids.append(statement_execution_id)
+        self.current_statement_execution_id = statement_execution_id
+        self.events.append(("start", self._statement()))
+
+    def on_statement_end(self, cursor):
+        self.events.append(("end", self._statement()))
+
+    def on_statement_cancel(self):
+        self.events.append(("cancel", self._statement()))
+
+    def on_exception(self, *args):
+        self.events.append(("error", self._statement()))
+
+    def on_query_start(self):
+        pass
+
+    def on_statement_update(self, *args, **kwargs):
+        pass
+
+    def on_query_end(self):
+        self.events.append(("query_end",))
+
+
+class QueryExecutorLoggerResultPreviewTestCase(TestCase):
+    def setUp(self):
+        self._patch("qe_logic")
+        self._patch("DBSession")
+        self.mock_socketio = self._patch("socketio")
+        self.mock_has_subscriber = self._patch(
+            "QueryExecutionSubscriberChecker"
+        ).return_value.has_subscriber
+        self.mock_has_subscriber.return_value = True
+        self.mock_set_preview = self._patch("set_uploading_result_preview")
+        self.mock_set_preview.return_value = True
+
+        self.logger = QueryExecutorLogger(1, mock.MagicMock(), "select 1", [(0, 8)])
+        self.mock_socketio.emit.reset_mock()
+
+    def _patch(self, name):
+        patcher = mock.patch(f"lib.query_executor.base_executor.{name}")
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_preview(self):
+        self.logger._on_result_preview(10, ["a", "b"], [[1, None], [2, "x"]])
+
+        result = [["a", "b"], ["1", "null"], ["2", "x"]]
+        self.mock_set_preview.assert_called_once_with(10, result)
+        self.mock_socketio.emit.assert_called_once_with(
+            "statement_result_preview",
+            {"query_execution_id": 1, "id": 10, "data": result},
+            namespace=QUERY_EXECUTION_NAMESPACE,
+            room=1,
+        )
+
+    def test_no_subscriber(self):
+        self.mock_has_subscriber.return_value = False
+        self.logger._on_result_preview(10, ["a"], [[1]])
+        self.mock_set_preview.assert_called_once()
+        self.mock_socketio.emit.assert_not_called()
+
+    def test_preview_too_large(self):
+        self.mock_set_preview.return_value = False
+        self.logger._on_result_preview(10, ["a"], [[1]])
+        self.mock_socketio.emit.assert_not_called()
+
+    def test_preview_failure(self):
+        self.mock_set_preview.side_effect = Exception("cache is down")
+        # Does not raise
+        self.logger._on_result_preview(10, ["a"], [[1]])
+
+
+class QueryExecutorLoggerResultBudgetTestCase(TestCase):
+    def setUp(self):
+        self._patch("qe_logic")
+        self._patch("DBSession")
+        self._patch("socketio")
+        self._patch("QueryExecutionSubscriberChecker")
+        self.mock_pipeline = self._patch("ResultUploadPipeline").return_value
+        self.mock_pipeline.run.return_value = ("mock://result.csv", 11)
+        self.mock_pipeline.stopped_fetching = False
+        self.mock_pipeline.rows_fetched = 10
+
+        self.cursor = mock.MagicMock()
+        self.cursor.get_columns.return_value = ["a"]
+
+    def _patch(self, name):
+        patcher = mock.patch(f"lib.query_executor.base_executor.{name}")
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _upload(self, max_result_rows=None):
+        logger = QueryExecutorLogger(
+            1,
+            mock.MagicMock(),
+            "select 1",
+            [(0, 8)],
+            max_result_rows=max_result_rows,
+        )
+        return logger._upload_query_result(self.cursor, 10)
+
+    def test_fetched_all_rows(self):
+        self.assertEqual(self._upload(), ("mock://result.csv", 11))
+        self.cursor.get_rows_chunk_iter.assert_called_once_with(max_rows=None)
+        self.cursor.cancel.assert_not_called()
+
+    def test_max_result_rows(self):
+        self._upload(max_result_rows=10)
+        self.cursor.get_rows_chunk_iter.assert_called_once_with(max_rows=10)
+        # All the rows of the limited statement are fetched
+        self.cursor.cancel.assert_not_called()
+
+    def test_upload_limit(self):
+        self.mock_pipeline.stopped_fetching = True
+        self.cursor.cancel.side_effect = Exception("Query is finished")
+        # The cancel failure is ignored
+        self.assertEqual(self._upload(), ("mock://result.csv", 11))
+        self.cursor.cancel.assert_called_once()
+
+
+class ParallelStatementsTestCase(TestCase):
+    def setUp(self):
+        self.cursors = []
+        self.polls_per_statement = {}
+
+        def create_cursor():
+            cursor = FakeParallelCursor(self.polls_per_statement)
+            self.cursors.append(cursor)
+            return cursor
+
+        mock_client_pool = self._patch("get_client_pool").return_value
+        mock_client_pool.acquire.return_value.cursor.side_effect = create_cursor
+        self._patch("qe_logic")
+        self._patch("LOG")
+
+    def _patch(self, name):
+        patcher = mock.patch(f"lib.query_executor.base_executor.{name}")
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _run(self, statements, parallel_statements=True, **kwargs):
+        class TestExecutor(QueryExecutorBaseClass):
+            @classmethod
+            def EXECUTOR_NAME(cls):
+                return "test"
+
+            @classmethod
+            def EXECUTOR_LANGUAGE(cls):
+                return "test"
+
+            @classmethod
+            def EXECUTOR_TEMPLATE(cls):
+                return None
+
+            @classmethod
+            def _get_client(cls, client_setting):
+                return None
+
+            @classmethod
+            def LOGGER_CLASS(cls):
+                return FakeParallelLogger
+
+        self.polls_per_statement.update(statements)
+        query = ";".join(statements.keys())
+        statement_ranges = []
+        start = 0
+        for statement in statements.keys():
+            statement_ranges.append((start, start + len(statement)))
+            start += len(statement) + 1
+
+        executor = TestExecutor(
+            1,
+            mock.MagicMock(),
+            query,
+            statement_ranges,
+            {},
+            "adhoc",
+            parallel_statements=parallel_statements,
+            **kwargs,
+        )
+        for _ in range(20):
+            executor.poll()
+            if executor.status != QueryExecutionStatus.RUNNING:
+                break
+        return executor
+
+    def test_max_result_rows(self):
+        self.polls_per_statement["SELECT\n  *\nFROM a\nLIMIT 10"] = 1
+        executor = self._run(
+            {"select * from a": 1, "select * from b limit 5": 1},
+            parallel_statements=False,
+            max_result_rows=10,
+        )
+        self.assertEqual(executor.status, QueryExecutionStatus.DONE)
+        self.assertEqual(
+            self.cursors[0].statements,
+            ["SELECT\n  *\nFROM a\nLIMIT 10", "select * from b limit 5"],
+        )
+
+    def test_parallel_statements(self):
+        executor = self._run(
+            {
+                "select * from a": 3,
+                "select * from b": 1,
+                "create table c as select * from b": 1,
+                "select * from c": 1,
+            }
+        )
+        self.assertEqual(executor.status, QueryExecutionStatus.DONE)
+        self.assertEqual(
+            executor._logger.events,
+            [
+                ("start", "select * from a"),
+                ("start", "select * from b"),
+                ("start", "create table c as select * from b"),
+                ("end", "select * from b"),
+                ("end", "create table c as select * from b"),
+                ("start", "select * from c"),
+                ("end", "select * from c"),
+                ("end", "select * from a"),
+                ("query_end",),
+            ],
+        )
+        self.assertEqual(len(self.cursors), 3)
+
+    def test_sequential_statements(self):
+        executor = self._run(
+            {"select * from a": 2, "select * from b": 1}, parallel_statements=False
+        )
+        self.assertEqual(executor.status, QueryExecutionStatus.DONE)
+        self.assertEqual(
+            executor._logger.events,
+            [
+                ("start", "select * from a"),
+                ("end", "select * from a"),
+                ("start", "select * from b"),
+                ("end", "select * from b"),
+                ("query_end",),
+            ],
+        )
+        self.assertEqual(len(self.cursors), 1)
+
+    def test_session_statements_run_sequentially(self):
+        # The statements after USE must run on the cursor that ran it
+        executor = self._run({"use foo": 1, "select * from a": 2, "select * from b": 1})
+        self.assertEqual(executor.status, QueryExecutionStatus.DONE)
+        self.assertEqual(
+            executor._logger.events,
+            [
+                ("start", "use foo"),
+                ("end", "use foo"),
+                ("start", "select * from a"),
+                ("end", "select * from a"),
+                ("start", "select * from b"),
+                ("end", "select * from b"),
+                ("query_end",),
+            ],
+        )
+        self.assertEqual(len(self.cursors), 1)
+
+    def test_failed_statement(self):
+        executor = self._run(
+            {"select * from a": 5, "select * from b": None, "select * from c": 5}
+        )
+        self.assertEqual(executor.status, QueryExecutionStatus.ERROR)
+        self.assertEqual(
+            sorted(executor._logger.events[3:]),
+            [
+                ("cancel", "select * from a"),
+                ("cancel", "select * from c"),
+                ("error", "select * from b"),
+            ],
+        )
+        self.assertEqual(
+            [cursor.cancelled for cursor in self.cursors], [True, False, True]
+        )
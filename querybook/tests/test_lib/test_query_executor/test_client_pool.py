@@ -0,0 +1,143 @@
+from unittest import TestCase, mock
+
+from lib.query_executor.client_pool import (
+    QueryEngineClientPool,
+    has_session_statement,
+)
+
+
+class FakeClient(object):
+    def __init__(self, client_setting):
+        self.client_setting = client_setting
+        self.healthy = True
+        self.closed = False
+
+    def cursor(self):
+        return mock.MagicMock()
+
+    def is_healthy(self):
+        return self.healthy
+
+    def close(self):
+        self.closed = True
+
+
+class FakeExecutor(object):
+    @classmethod
+    def _get_client(cls, client_setting):
+        return FakeClient(client_setting)
+
+
+ALICE_SETTING = {"connection_string": "hive://foo", "proxy_user": "alice"}
+BOB_SETTING = {"connection_string": "hive://foo", "proxy_user": "bob"}
+
+
+class QueryEngineClientPoolTestCase(TestCase):
+    def setUp(self):
+        time_patch = mock.patch("lib.query_executor.client_pool.time.time")
+        self.mock_time = time_patch.start()
+        self.mock_time.return_value = 1000
+        self.addCleanup(time_patch.stop)
+
+        self.pool = QueryEngineClientPool(
+            max_idle_clients=3, max_idle_clients_per_key=2, idle_timeout=60
+        )
+
+    def test_reuse_client(self):
+        client = self.pool.acquire(FakeExecutor, ALICE_SETTING)
+        self.pool.release(client)
+
+        # Same settings in a different order
+        self.assertIs(
+            self.pool.acquire(FakeExecutor, dict(reversed(ALICE_SETTING.items()))),
+            client,
+        )
+        # Not shared with another user
+        self.assertIsNot(self.pool.acquire(FakeExecutor, BOB_SETTING), client)
+
+    def test_in_use_client_not_shared(self):
+        client = self.pool.acquire(FakeExecutor, ALICE_SETTING)
+        self.assertIsNot(self.pool.acquire(FakeExecutor, ALICE_SETTING), client)
+
+    def test_not_reusable(self):
+        client = self.pool.acquire(FakeExecutor, ALICE_SETTING)
+        self.pool.release(client, reusable=False)
+
+        self.assertTrue(client.closed)
+        self.assertIsNot(self.pool.acquire(FakeExecutor, ALICE_SETTING), client)
+
+    def test_unhealthy_client(self):
+        client = self.pool.acquire(FakeExecutor, ALICE_SETTING)
+        self.pool.release(client)
+        client.healthy = False
+
+        self.assertIsNot(self.pool.acquire(FakeExecutor, ALICE_SETTING), client)
+        self.assertTrue(client.closed)
+
+    def test_idle_eviction(self):
+        client = self.pool.acquire(FakeExecutor, ALICE_SETTING)
+        self.pool.release(client)
+
+        self.mock_time.return_value += 61
+        self.assertIsNot(self.pool.acquire(FakeExecutor, BOB_SETTING), client)
+        self.assertTrue(client.closed)
+        self.assertEqual(self.pool.num_idle_clients, 0)
+
+    def test_max_size(self):
+        alice_clients = [
+            self.pool.acquire(FakeExecutor, ALICE_SETTING) for _ in range(3)
+        ]
+        bob_clients = [self.pool.acquire(FakeExecutor, BOB_SETTING) for _ in range(2)]
+
+        for client in alice_clients + bob_clients:
+            self.mock_time.return_value += 1
+            self.pool.release(client)
+
+        self.assertEqual(self.pool.num_idle_clients, 3)
+        # Oldest clients are closed first
+        self.assertEqual(
+            [client.closed for client in alice_clients], [True, True, False]
+        )
+        self.assertEqual([client.closed for client in bob_clients], [False, False])
+
+    def test_client_context(self):
+        with self.pool.client(FakeExecutor, ALICE_SETTING) as client:
+            pass
+        self.assertEqual(self.pool.num_idle_clients, 1)
+
+        with self.assertRaises(ValueError):
+            with self.pool.client(FakeExecutor, ALICE_SETTING) as failed_client:
+                raise ValueError()
+        self.assertIs(failed_client, client)
+        self.assertTrue(client.closed)
+        self.assertEqual(self.pool.num_idle_clients, 0)
+
+    def test_fresh_client(self):
+        with self.pool.client(FakeExecutor, ALICE_SETTING) as client:
+            pass
+        with self.pool.client(FakeExecutor, ALICE_SETTING, fresh=True) as fresh_client:
+            self.assertIsNot(fresh_client, client)
+        self.assertEqual(self.pool.num_idle_clients, 2)
+
+
+class HasSessionStatementTestCase(TestCase):
+    def test_session_statements(self):
+        for statement in [
+            "set hive.exec.parallel=true",
+            "USE default",
+            "create temporary function foo as 'bar'",
+            "CREATE OR REPLACE TEMP TABLE foo AS SELECT 1",
+            "alter session set timezone = 'UTC'",
+        ]:
+            self.assertTrue(has_session_statement(["select 1", statement]), statement)
+
+    def test_other_statements(self):
+        self.assertFalse(
+            has_session_statement(
+                [
+                    "select * from settings",
+                    "create table users_backup as select 1",
+                    "insert into user_settings values (1)",
+                ]
+            )
+        )
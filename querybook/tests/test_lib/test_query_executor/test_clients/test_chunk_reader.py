@@ -10,14 +10,16 @@ class MockChunkReaderDerivedClass(ChunkReader):
         self,
         read_size=5,
         max_read_size=20,
+        raw_csv=MOCK_RAW_CSV,
     ):
         self._curr_char = 0
+        self._raw_csv = raw_csv
         super(MockChunkReaderDerivedClass, self).__init__(
             read_size=read_size, max_read_size=max_read_size
         )
 
     def read(self):
-        next_chunk = MOCK_RAW_CSV[self._curr_char : self._curr_char + self._read_size]
+        next_chunk = self._raw_csv[self._curr_char : self._curr_char + self._read_size]
         self._curr_char += self._read_size
         return next_chunk
 
@@ -34,3 +36,26 @@ class ChunkReaderTestCase(TestCase):
     def test_set_max_read_size_set(self):
         reader = MockChunkReaderDerivedClass(max_read_size=25)
         self.assertEqual(reader.read_lines(), MOCK_CSV_LINES[:2])
+
+    def test_get_csv_iter(self):
+        raw_csv = 'foo,bar\n"multi\nline ""quoted""",2\n3,"4\n\n"\n5,6'
+        expected_csv = [
+            ["foo", "bar"],
+            ['multi\nline "quoted"', "2"],
+            ["3", "4\n\n"],
+            ["5", "6"],
+        ]
+        for read_size in [1, 3, 100]:
+            reader = MockChunkReaderDerivedClass(
+                read_size=read_size, max_read_size=None, raw_csv=raw_csv
+            )
+            self.assertEqual(list(reader.get_csv_iter()), expected_csv)
+
+        reader = MockChunkReaderDerivedClass(max_read_size=None, raw_csv=raw_csv)
+        self.assertEqual(list(reader.get_csv_iter(2)), expected_csv[:2])
+
+    def test_get_csv_iter_max_read_size(self):
+        # The max read size is reached inside the quoted cell
+        raw_csv = 'foo,bar\n1,"long\nquoted\ncell"\n2,3'
+        reader = MockChunkReaderDerivedClass(max_read_size=15, raw_csv=raw_csv)
+        self.assertEqual(list(reader.get_csv_iter()), [["foo", "bar"]])
@@ -10,6 +10,7 @@ from lib.query_executor.clients.utils.presto_types import (
     PrestoType,
     RowType,
     _bracket_aware_split,
+    compile_row_transform,
 )
 
 
@@ -314,6 +315,32 @@ def test_format_data(
     presto_type: PrestoType, data: Any, exp_formatted_data: Any
 ) -> None:
     assert presto_type.format_data(data) == exp_formatted_data
+    assert presto_type.format_data(None) is None
+
+    converter = presto_type.get_converter()
+    if converter is None:
+        # Only types whose data is returned as is skip the conversion
+        assert data == exp_formatted_data
+    else:
+        assert converter(data) == exp_formatted_data
+        assert converter(None) is None
+
+
+def test_compile_row_transform() -> None:
+    assert compile_row_transform(["integer", "array(varchar)"]) is list
+
+    transform = compile_row_transform(
+        ["integer", "row(x bigint, y array(row(z double)))", "map(varchar, integer)"]
+    )
+    assert transform is compile_row_transform(
+        ("integer", "row(x bigint, y array(row(z double)))", "map(varchar, integer)")
+    )
+    assert transform((1, [2, [[3.0], None]], {"a": 4})) == [
+        1,
+        {"x": 2, "y": [{"z": 3.0}, None]},
+        {"a": 4},
+    ]
+    assert transform([None, None, None]) == [None, None, None]
 
 
 @pytest.mark.parametrize(
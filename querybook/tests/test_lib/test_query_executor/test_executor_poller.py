@@ -0,0 +1,136 @@
+from unittest import TestCase, mock
+
+import gevent
+
+from const.query_execution import QueryExecutionStatus
+from env import QuerybookSettings
+from lib.query_executor.executor_poller import (
+    MultiplexedExecutorPoller,
+    is_multiplexed_poll_enabled,
+)
+
+
+class FakeExecutor(object):
+    def __init__(self, num_polls, sleep_time=0.01, error=None):
+        self.status = QueryExecutionStatus.DELIVERED
+        self.num_polls = 0
+        self._num_polls_until_done = num_polls
+        self._sleep_time = sleep_time
+        self._error = error
+        self.cancelled = False
+
+    def poll(self):
+        self.num_polls += 1
+        if self._error:
+            raise self._error
+        self.status = (
+            QueryExecutionStatus.DONE
+            if self.num_polls >= self._num_polls_until_done
+            else QueryExecutionStatus.RUNNING
+        )
+
+    def get_sleep_time(self):
+        return self._sleep_time
+
+    def cancel(self):
+        self.cancelled = True
+        self.status = QueryExecutionStatus.CANCEL
+
+
+class FakeCeleryTask(object):
+    def __init__(self, task_id):
+        self.request = mock.MagicMock(id=task_id)
+        self.aborted_task_ids = set()
+
+    def is_aborted(self, task_id=None):
+        return task_id in self.aborted_task_ids
+
+
+class MultiplexedExecutorPollerTestCase(TestCase):
+    def setUp(self):
+        self.poller = MultiplexedExecutorPoller(max_concurrent_polls=10)
+
+    def _run(self, celery_task, executor):
+        return gevent.spawn(
+            self.poller.run_executor_until_finish, celery_task, executor
+        )
+
+    def test_poll_until_finish(self):
+        executors = [FakeExecutor(num_polls=i + 1) for i in range(20)]
+        greenlets = [
+            self._run(FakeCeleryTask(f"task_{i}"), executor)
+            for i, executor in enumerate(executors)
+        ]
+        gevent.joinall(greenlets, timeout=5, raise_error=True)
+
+        for i, executor in enumerate(executors):
+            self.assertEqual(executor.status, QueryExecutionStatus.DONE)
+            self.assertEqual(executor.num_polls, i + 1)
+
+    def test_poll_order(self):
+        slow_executor = FakeExecutor(num_polls=2, sleep_time=0.5)
+        fast_executor = FakeExecutor(num_polls=5, sleep_time=0.01)
+        slow_greenlet = self._run(FakeCeleryTask("slow"), slow_executor)
+        fast_greenlet = self._run(FakeCeleryTask("fast"), fast_executor)
+
+        # The fast executor is not held back by the slow one
+        fast_greenlet.join(timeout=0.3)
+        self.assertTrue(fast_greenlet.successful())
+        self.assertEqual(slow_executor.num_polls, 1)
+
+        slow_greenlet.join(timeout=2)
+        self.assertEqual(slow_executor.status, QueryExecutionStatus.DONE)
+
+    def test_abort(self):
+        celery_task = FakeCeleryTask("task")
+        executor = FakeExecutor(num_polls=1000)
+        greenlet = self._run(celery_task, executor)
+
+        gevent.sleep(0.05)
+        celery_task.aborted_task_ids.add("task")
+        greenlet.join(timeout=1)
+
+        self.assertTrue(greenlet.successful())
+        self.assertTrue(executor.cancelled)
+
+    def test_exception(self):
+        greenlet = self._run(
+            FakeCeleryTask("task"), FakeExecutor(num_polls=1, error=ValueError("foo"))
+        )
+        greenlet.join(timeout=1)
+        self.assertIsInstance(greenlet.exception, ValueError)
+
+    def test_stop_polling_after_timeout(self):
+        executor = FakeExecutor(num_polls=1000)
+
+        def run_with_timeout():
+            with gevent.Timeout(0.05):
+                self.poller.run_executor_until_finish(FakeCeleryTask("task"), executor)
+
+        greenlet = gevent.spawn(run_with_timeout)
+        greenlet.join(timeout=1)
+        self.assertIsInstance(greenlet.exception, gevent.Timeout)
+
+        num_polls = executor.num_polls
+        gevent.sleep(0.05)
+        self.assertEqual(executor.num_polls, num_polls)
+
+
+class IsMultiplexedPollEnabledTestCase(TestCase):
+    def test_process_mode(self):
+        with mock.patch.object(
+            QuerybookSettings, "QUERY_EXECUTION_POLL_MODE", "process"
+        ):
+            self.assertFalse(is_multiplexed_poll_enabled())
+
+    def test_requires_gevent_patch(self):
+        with mock.patch.object(
+            QuerybookSettings, "QUERY_EXECUTION_POLL_MODE", "multiplexed"
+        ), mock.patch(
+            "lib.query_executor.executor_poller.is_module_patched"
+        ) as is_module_patched:
+            is_module_patched.return_value = False
+            self.assertFalse(is_multiplexed_poll_enabled())
+
+            is_module_patched.return_value = True
+            self.assertTrue(is_multiplexed_poll_enabled())
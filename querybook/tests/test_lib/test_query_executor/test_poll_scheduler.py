@@ -0,0 +1,108 @@
+from unittest import TestCase, mock
+
+from lib.query_executor.poll_scheduler import (
+    LONG_RUNNING_QUERY_POLL_MIN_INTERVAL,
+    LONG_RUNNING_QUERY_SECONDS,
+    POLL_MAX_INTERVAL,
+    POLL_MIN_INTERVAL,
+    UNWATCHED_POLL_MAX_INTERVAL,
+    AdaptivePollScheduler,
+    FixedPollScheduler,
+)
+
+
+class PollSchedulerTestCase(TestCase):
+    def setUp(self):
+        time_patch = mock.patch("lib.query_executor.poll_scheduler.time.time")
+        self.mock_time = time_patch.start()
+        self.mock_time.return_value = 1000
+        self.addCleanup(time_patch.stop)
+
+        subscriber_patch = mock.patch(
+            "lib.query_executor.poll_scheduler.has_query_execution_subscriber"
+        )
+        self.mock_has_subscriber = subscriber_patch.start()
+        self.mock_has_subscriber.return_value = True
+        self.addCleanup(subscriber_patch.stop)
+
+    def _advance(self, seconds):
+        self.mock_time.return_value += seconds
+
+    def _poll_without_change(self, scheduler, num_polls):
+        for _ in range(num_polls):
+            scheduler.on_poll(False)
+            self._advance(scheduler.get_sleep_time())
+
+    def test_fixed(self):
+        scheduler = FixedPollScheduler(1)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MIN_INTERVAL)
+        self._advance(LONG_RUNNING_QUERY_SECONDS)
+        self.assertEqual(
+            scheduler.get_sleep_time(), LONG_RUNNING_QUERY_POLL_MIN_INTERVAL
+        )
+
+    def test_backoff(self):
+        scheduler = AdaptivePollScheduler(1)
+        scheduler.on_poll(False)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MIN_INTERVAL)
+
+        scheduler.on_poll(False)
+        first_backoff = scheduler.get_sleep_time()
+        self.assertGreater(first_backoff, POLL_MIN_INTERVAL)
+
+        self._poll_without_change(scheduler, 20)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MAX_INTERVAL)
+
+    def test_reset_on_activity(self):
+        scheduler = AdaptivePollScheduler(1)
+        self._poll_without_change(scheduler, 20)
+
+        scheduler.on_poll(False, has_log=True)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MIN_INTERVAL)
+
+        self._poll_without_change(scheduler, 20)
+        scheduler.on_poll(False, percent_complete=10)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MIN_INTERVAL)
+
+        self._poll_without_change(scheduler, 20)
+        scheduler.on_poll(True)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MIN_INTERVAL)
+
+    def test_unwatched(self):
+        self.mock_has_subscriber.return_value = False
+        scheduler = AdaptivePollScheduler(1)
+        self._poll_without_change(scheduler, 20)
+        self.assertEqual(scheduler.get_sleep_time(), UNWATCHED_POLL_MAX_INTERVAL)
+
+    def test_subscriber_check_cached(self):
+        scheduler = AdaptivePollScheduler(1)
+        scheduler.on_poll(False)
+        scheduler.get_sleep_time()
+        scheduler.get_sleep_time()
+        self.assertEqual(self.mock_has_subscriber.call_count, 1)
+
+    def test_subscriber_check_failure(self):
+        self.mock_has_subscriber.side_effect = Exception("redis is down")
+        scheduler = AdaptivePollScheduler(1)
+        self._poll_without_change(scheduler, 20)
+        self.assertEqual(scheduler.get_sleep_time(), POLL_MAX_INTERVAL)
+
+    def test_long_running_min_interval(self):
+        scheduler = AdaptivePollScheduler(1)
+        self._advance(LONG_RUNNING_QUERY_SECONDS)
+        scheduler.on_poll(False, has_log=True)
+        self.assertEqual(
+            scheduler.get_sleep_time(), LONG_RUNNING_QUERY_POLL_MIN_INTERVAL
+        )
+
+    def test_expected_remaining_time(self):
+        scheduler = AdaptivePollScheduler(1)
+        scheduler.on_poll(False, percent_complete=0)
+        self._advance(10)
+        scheduler.on_poll(False, percent_complete=80)
+
+        # Nothing changed but the query should be done in ~3 seconds,
+        # so the interval does not back off
+        self._poll_without_change(scheduler, 2)
+        self.assertLessEqual(scheduler.get_sleep_time(), 2)
+        self.assertGreaterEqual(scheduler.get_sleep_time(), POLL_MIN_INTERVAL)
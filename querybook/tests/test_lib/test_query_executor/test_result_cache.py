@@ -0,0 +1,155 @@
+import datetime
+from unittest import TestCase, mock
+
+from const.query_execution import QueryExecutionStatus, StatementExecutionStatus
+from lib.query_executor.result_cache import (
+    get_cached_query_execution,
+    get_result_cache_ttl,
+    is_query_cacheable,
+    normalize_query,
+)
+
+
+class IsQueryCacheableTestCase(TestCase):
+    def test_cacheable(self):
+        for statements in [
+            ["select * from foo"],
+            ["WITH a AS (SELECT 1) SELECT * FROM a"],
+            ["select * from foo where dt = current_date", "select updated_at from bar"],
+        ]:
+            self.assertTrue(is_query_cacheable(statements), statements)
+
+    def test_not_cacheable(self):
+        for statements in [
+            [],
+            ["set foo=bar", "select 1"],
+            ["insert into foo select 1"],
+            ["with a as (select 1) insert into foo select * from a"],
+            ["create table foo as select 1"],
+            # Statements whose type is unknown are not cached
+            ["(select 1) union all (select 2)"],
+            ["select now()"],
+            ["select * from foo where rand() < 0.1"],
+            ["select current_timestamp"],
+        ]:
+            self.assertFalse(is_query_cacheable(statements), statements)
+
+
+class NormalizeQueryTestCase(TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(
+            normalize_query("-- dashboard\nselect 1;\n\n  select 2 ; "),
+            normalize_query("select 1;select 2"),
+        )
+        self.assertNotEqual(
+            normalize_query("select 'a  b'"), normalize_query("select 'a b'")
+        )
+
+
+class GetResultCacheTTLTestCase(TestCase):
+    def test_get_result_cache_ttl(self):
+        for feature_params, ttl in [
+            ({}, 0),
+            ({"result_cache_ttl": None}, 0),
+            ({"result_cache_ttl": "600"}, 600),
+            ({"result_cache_ttl": -1}, 0),
+            ({"result_cache_ttl": "foo"}, 0),
+        ]:
+            engine = mock.MagicMock()
+            engine.get_feature_params.return_value = feature_params
+            self.assertEqual(get_result_cache_ttl(engine), ttl)
+
+
+class GetCachedQueryExecutionTestCase(TestCase):
+    QUERY = "select * from foo"
+
+    def setUp(self):
+        self.engine = engine = mock.MagicMock()
+        engine.get_feature_params.return_value = {"result_cache_ttl": 600}
+        engine.get_engine_params.return_value = {}
+        engine_patch = mock.patch(
+            "lib.query_executor.result_cache.admin_logic.get_query_engine_by_id",
+            return_value=engine,
+        )
+        engine_patch.start()
+        self.addCleanup(engine_patch.stop)
+
+        self.cached_execution = self._get_query_execution()
+        execution_patch = mock.patch(
+            "lib.query_executor.result_cache.qe_logic.get_query_execution_by_id",
+            side_effect=lambda id, session=None: self.cached_execution,
+        )
+        execution_patch.start()
+        self.addCleanup(execution_patch.stop)
+
+        redis_patch = mock.patch("lib.query_executor.result_cache.get_redis")
+        self.mock_redis = redis_patch.start().return_value
+        self.mock_redis.get.return_value = b"1"
+        self.addCleanup(redis_patch.stop)
+
+    def _get_query_execution(self, started_seconds_ago=60):
+        statement_execution = mock.MagicMock(
+            id=1,
+            status=StatementExecutionStatus.DONE,
+            created_at=datetime.datetime.utcnow()
+            - datetime.timedelta(seconds=started_seconds_ago),
+        )
+        return mock.MagicMock(
+            id=1,
+            query=self.QUERY + ";",
+            engine_id=1,
+            uid=1,
+            status=QueryExecutionStatus.DONE,
+            statement_executions=[statement_execution],
+        )
+
+    def _get_cached_query_execution(self, query=QUERY, uid=1):
+        return get_cached_query_execution(query, 1, uid, session=mock.MagicMock())
+
+    def test_hit(self):
+        self.assertIs(self._get_cached_query_execution(), self.cached_execution)
+
+    def test_no_cached_execution(self):
+        self.mock_redis.get.return_value = None
+        self.assertIsNone(self._get_cached_query_execution())
+
+    def test_not_cacheable_query(self):
+        self.assertIsNone(self._get_cached_query_execution("select now()"))
+        self.mock_redis.get.assert_not_called()
+
+    def test_expired(self):
+        self.cached_execution = self._get_query_execution(started_seconds_ago=601)
+        self.assertIsNone(self._get_cached_query_execution())
+
+    def test_failed_statement(self):
+        self.cached_execution.statement_executions[
+            0
+        ].status = StatementExecutionStatus.ERROR
+        self.assertIsNone(self._get_cached_query_execution())
+
+    def test_different_query(self):
+        self.cached_execution.query = "select * from bar"
+        self.assertIsNone(self._get_cached_query_execution())
+
+    def test_redis_failure(self):
+        self.mock_redis.get.side_effect = Exception("redis is down")
+        self.assertIsNone(self._get_cached_query_execution())
+
+    def test_shared_by_users(self):
+        self.assertIs(self._get_cached_query_execution(), self.cached_execution)
+        self.assertIs(self._get_cached_query_execution(uid=2), self.cached_execution)
+        self.assertEqual(
+            self.mock_redis.get.call_args_list[0], self.mock_redis.get.call_args_list[1]
+        )
+
+    def test_impersonated_engine(self):
+        self.engine.get_engine_params.return_value = {"impersonate": True}
+        self.assertIs(self._get_cached_query_execution(), self.cached_execution)
+        self.assertIsNone(self._get_cached_query_execution(uid=2))
+        self.assertNotEqual(
+            self.mock_redis.get.call_args_list[0], self.mock_redis.get.call_args_list[1]
+        )
+
+    def test_proxy_user_engine(self):
+        self.engine.get_engine_params.return_value = {"proxy_user_id": "email"}
+        self.assertIsNone(self._get_cached_query_execution(uid=2))
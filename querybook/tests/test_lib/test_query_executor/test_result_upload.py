@@ -0,0 +1,165 @@
+from unittest import TestCase, mock
+
+from lib.query_executor.result_upload import (
+    PIPELINE_QUEUE_SIZE,
+    ResultUploadPipeline,
+)
+from lib.utils.csv import row_to_csv
+
+
+class MockUploader(object):
+    SUPPORTS_BINARY = False
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.data = ""
+        self.started = False
+        self.ended = False
+        self.aborted = False
+
+    def start(self):
+        self.started = True
+
+    def write(self, data: str) -> bool:
+        if self.max_size is not None and len(self.data) + len(data) > self.max_size:
+            return False
+        self.data += data
+        return True
+
+    def end(self):
+        self.ended = True
+
+    def abort(self):
+        self.aborted = True
+
+    def checkpoint(self):
+        return None
+
+    @property
+    def upload_url(self):
+        return "mock://result.csv"
+
+
+class ResultUploadPipelineTestCase(TestCase):
+    columns = ["a", "b"]
+
+    def _run(self, uploader, chunks, **kwargs):
+        with mock.patch(
+            "lib.query_executor.result_upload.GenericUploader",
+            return_value=uploader,
+        ):
+            return ResultUploadPipeline("result.csv", self.columns, **kwargs).run(
+                iter(chunks)
+            )
+
+    def test_upload(self):
+        uploader = MockUploader()
+        chunks = [[[i, str(i)] for i in range(j, j + 10)] for j in range(0, 100, 10)]
+
+        upload_url, rows_uploaded = self._run(uploader, chunks)
+
+        self.assertEqual(upload_url, "mock://result.csv")
+        self.assertEqual(rows_uploaded, 101)
+        self.assertEqual(
+            uploader.data,
+            "".join(row_to_csv(row) for row in [self.columns] + sum(chunks, [])),
+        )
+        self.assertTrue(uploader.ended)
+        self.assertFalse(uploader.aborted)
+
+    def test_upload_truncated_per_row(self):
+        uploader = MockUploader(max_size=len("a,b\n") + len("10,x\n") * 15)
+        num_chunks_fetched = 0
+
+        def chunks():
+            nonlocal num_chunks_fetched
+            i = 10
+            while True:
+                num_chunks_fetched += 1
+                yield [[j, "x"] for j in range(i, i + 10)]
+                i += 10
+
+        _, rows_uploaded = self._run(uploader, chunks())
+
+        self.assertEqual(rows_uploaded, 16)
+        self.assertEqual(
+            uploader.data,
+            "".join(
+                row_to_csv(row)
+                for row in [self.columns] + [[i, "x"] for i in range(10, 25)]
+            ),
+        )
+        self.assertTrue(uploader.ended)
+        # Fetching stops once the limit is reached, only the chunks
+        # buffered in the pipeline are read ahead
+        self.assertLessEqual(num_chunks_fetched, 2 + 2 * PIPELINE_QUEUE_SIZE + 2)
+
+    def test_fetch_failure(self):
+        uploader = MockUploader()
+
+        def chunks():
+            yield [[1, "x"]]
+            raise ValueError("Fetch failed")
+
+        with self.assertRaises(ValueError):
+            self._run(uploader, chunks())
+        self.assertFalse(uploader.ended)
+        self.assertTrue(uploader.aborted)
+
+    def test_upload_failure(self):
+        uploader = MockUploader()
+        uploader.write = mock.Mock(side_effect=IOError("Upload failed"))
+
+        with self.assertRaises(IOError):
+            self._run(uploader, [[[1, "x"]], [[2, "y"]]])
+        self.assertFalse(uploader.ended)
+        self.assertTrue(uploader.aborted)
+
+    def test_end_failure(self):
+        uploader = MockUploader()
+        uploader.end = mock.Mock(side_effect=IOError("Upload failed"))
+
+        with self.assertRaises(IOError):
+            self._run(uploader, [[[1, "x"]]])
+        self.assertTrue(uploader.aborted)
+
+    def test_preview(self):
+        on_preview = mock.Mock()
+        chunks = [[[i, str(i)] for i in range(j, j + 10)] for j in range(0, 100, 10)]
+
+        self._run(MockUploader(), chunks, on_preview=on_preview, preview_size=25)
+        on_preview.assert_called_once_with([[i, str(i)] for i in range(25)])
+
+    def test_no_preview_of_small_result(self):
+        on_preview = mock.Mock()
+
+        self._run(MockUploader(), [[[1, "x"]], [[2, "y"]]], on_preview=on_preview)
+        on_preview.assert_not_called()
+
+    def test_stopped_fetching(self):
+        uploader = MockUploader(max_size=len("a,b\n") + len("10,x\n") * 15)
+
+        def chunks():
+            i = 10
+            while True:
+                yield [[j, "x"] for j in range(i, i + 10)]
+                i += 10
+
+        pipeline = ResultUploadPipeline("result.csv", self.columns)
+        with mock.patch(
+            "lib.query_executor.result_upload.GenericUploader",
+            return_value=uploader,
+        ):
+            pipeline.run(chunks())
+        self.assertTrue(pipeline.stopped_fetching)
+        self.assertGreaterEqual(pipeline.rows_fetched, 20)
+
+    def test_fetched_all_rows(self):
+        pipeline = ResultUploadPipeline("result.csv", self.columns)
+        with mock.patch(
+            "lib.query_executor.result_upload.GenericUploader",
+            return_value=MockUploader(),
+        ):
+            pipeline.run(iter([[[1, "x"]], [[2, "y"]]]))
+        self.assertFalse(pipeline.stopped_fetching)
+        self.assertEqual(pipeline.rows_fetched, 2)
@@ -0,0 +1,118 @@
+from contextlib import closing
+import datetime
+import tempfile
+from unittest import TestCase, mock
+
+import pyarrow as pa
+
+from env import QuerybookSettings
+from lib.result_store import GenericReader
+from lib.result_store.columnar import (
+    ColumnarResultWriter,
+    get_columnar_result_path,
+    get_columnar_schema,
+)
+from lib.utils.csv import serialize_cell
+
+
+class GetColumnarResultPathTestCase(TestCase):
+    def test_path(self):
+        self.assertEqual(
+            get_columnar_result_path("s3://querybook_temp/1/result.csv"),
+            "s3://querybook_temp/1/result.arrow",
+        )
+        self.assertEqual(
+            get_columnar_result_path("querybook_temp/1/result.csv"),
+            "querybook_temp/1/result.arrow",
+        )
+
+
+class GetColumnarSchemaTestCase(TestCase):
+    def test_schema(self):
+        schema = get_columnar_schema(
+            ["a", "b", "c", "d", "e", "f"],
+            [
+                [1, 1.5, True, "x", None, 1],
+                [None, 2.5, False, None, None, "y"],
+            ],
+        )
+        self.assertEqual(
+            schema.types,
+            [
+                pa.int64(),
+                pa.float64(),
+                pa.bool_(),
+                pa.string(),
+                pa.string(),
+                pa.string(),
+            ],
+        )
+
+
+class ColumnarResultTestCase(TestCase):
+    columns = ["id", "price", "flag", "name", "created_at", "meta"]
+    rows = [
+        [1, 1.0, True, 'hello, "world"', datetime.datetime(2024, 1, 1), {"a": [1]}],
+        [2, None, False, None, datetime.datetime(2024, 1, 2), None],
+        [None, 2.25, None, "foo\nbar", None, [1, 2]],
+    ]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        for patcher in [
+            mock.patch(
+                "lib.result_store.stores.file_store.FILE_STORE_PATH",
+                self.temp_dir.name + "/",
+            ),
+            mock.patch.object(QuerybookSettings, "RESULT_STORE_TYPE", "file"),
+            mock.patch.object(QuerybookSettings, "RESULT_STORE_COLUMNAR_ENABLED", True),
+            mock.patch.object(QuerybookSettings, "DB_MAX_UPLOAD_SIZE", 0),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _upload(self, rows):
+        with ColumnarResultWriter("test/result.arrow", self.columns) as writer:
+            for row in rows:
+                writer.write(row)
+        return writer
+
+    def _read(self, writer):
+        reader = GenericReader(writer.upload_url)
+        with closing(reader.open_binary_stream()) as stream:
+            return pa.ipc.open_stream(stream).read_all()
+
+    def test_typed_table(self):
+        table = self._read(self._upload(self.rows))
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("id").to_pylist(), [1, 2, None])
+        self.assertEqual(table.schema.field("price").type, pa.float64())
+        self.assertEqual(table.schema.field("flag").type, pa.bool_())
+        self.assertEqual(
+            table.column("name").to_pylist(), ['hello, "world"', None, "foo\nbar"]
+        )
+        # Other values are stored as they are in the csv
+        self.assertEqual(
+            table.column("created_at").to_pylist(),
+            [serialize_cell(self.rows[0][4]), serialize_cell(self.rows[1][4]), None],
+        )
+        self.assertEqual(
+            table.column("meta").to_pylist(),
+            [serialize_cell({"a": [1]}), None, "[1, 2]"],
+        )
+
+    def test_truncated_on_type_change(self):
+        rows = [[1] + row[1:] for row in self.rows]
+        with mock.patch("lib.result_store.columnar.COLUMNAR_BATCH_SIZE", 1):
+            writer = self._upload(rows + [["a"] + self.rows[0][1:]])
+
+        self.assertTrue(writer.is_truncated)
+        self.assertEqual(self._read(writer).num_rows, 3)
+
+    def test_empty_result(self):
+        table = self._read(self._upload([]))
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.column_names, self.columns)
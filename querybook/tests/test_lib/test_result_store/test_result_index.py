@@ -0,0 +1,111 @@
+import tempfile
+from unittest import TestCase, mock
+
+from env import QuerybookSettings
+from lib.query_executor.result_upload import ResultUploadPipeline
+from lib.result_store import GenericReader
+from lib.result_store.result_index import (
+    RESULT_INDEX_INTERVAL,
+    get_result_index_path,
+    read_result_index,
+    read_result_rows,
+)
+from lib.utils.compression import zstandard
+
+NUM_ROWS = 3 * RESULT_INDEX_INTERVAL + 10
+COLUMNS = ["id", "name", "comment"]
+ROWS = [
+    [i, f"user_{i}", 'multi\nline "quoted"' if i % 7 == 0 else "é✓"]
+    for i in range(NUM_ROWS)
+]
+
+
+class GetResultIndexPathTestCase(TestCase):
+    def test_path(self):
+        self.assertEqual(
+            get_result_index_path("s3://querybook_temp/1/result.csv"),
+            "s3://querybook_temp/1/result.index",
+        )
+
+
+class ResultIndexTestCase(TestCase):
+    compression = None
+
+    def setUp(self):
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.store_dir.cleanup)
+
+        for patcher in [
+            mock.patch(
+                "lib.result_store.stores.file_store.FILE_STORE_PATH",
+                self.store_dir.name + "/",
+            ),
+            mock.patch.object(QuerybookSettings, "RESULT_STORE_TYPE", "file"),
+            mock.patch.object(QuerybookSettings, "DB_MAX_UPLOAD_SIZE", 0),
+            mock.patch.object(QuerybookSettings, "STORE_COMPRESSION", self.compression),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # Uneven chunks so that indexed rows are in the middle of chunks
+        chunks = [ROWS[i : i + 700] for i in range(0, NUM_ROWS, 700)]
+        self.result_path, _ = ResultUploadPipeline("1/result.csv", COLUMNS).run(
+            iter(chunks)
+        )
+
+        with GenericReader(self.result_path, max_read_size=None) as reader:
+            self.csv = reader.read_csv(None)
+
+    def test_index(self):
+        index = read_result_index(self.result_path)
+        self.assertEqual(index["interval"], RESULT_INDEX_INTERVAL)
+        self.assertEqual(index["compression"], self.compression)
+        self.assertEqual(index["columns"], COLUMNS)
+        self.assertEqual(len(index["offsets"]), 4)
+        # Checkpoints do not change the content read from the start
+        self.assertEqual(len(self.csv), NUM_ROWS + 1)
+        self.assertEqual(
+            self.csv[-1], [str(NUM_ROWS - 1), f"user_{NUM_ROWS - 1}", "é✓"]
+        )
+
+    def test_read_result_rows(self):
+        for offset, limit in [
+            (0, 10),
+            (5, RESULT_INDEX_INTERVAL),
+            (RESULT_INDEX_INTERVAL, 1),
+            (2 * RESULT_INDEX_INTERVAL + 999, 2),
+            (NUM_ROWS - 5, 100),
+            (NUM_ROWS, 10),
+            (NUM_ROWS + 100, 10),
+        ]:
+            self.assertEqual(
+                read_result_rows(self.result_path, offset, limit),
+                self.csv[:1] + self.csv[offset + 1 : offset + 1 + limit],
+            )
+
+    def test_read_from_indexed_row(self):
+        index = read_result_index(self.result_path)
+        offset = 2 * RESULT_INDEX_INTERVAL + 5
+        with mock.patch.object(
+            GenericReader,
+            "open_stored_stream",
+            autospec=True,
+            side_effect=GenericReader.open_stored_stream,
+        ) as open_stored_stream:
+            rows = read_result_rows(self.result_path, offset, 1)
+
+        open_stored_stream.assert_called_once_with(mock.ANY, index["offsets"][2])
+        self.assertEqual(rows, self.csv[:1] + self.csv[offset + 1 : offset + 2])
+
+    def test_no_index(self):
+        self.assertIsNone(read_result_rows("file://2/result.csv", 10, 10))
+
+
+class GzipResultIndexTestCase(ResultIndexTestCase):
+    compression = "gzip"
+
+
+if zstandard is not None:
+
+    class ZstdResultIndexTestCase(ResultIndexTestCase):
+        compression = "zstd"
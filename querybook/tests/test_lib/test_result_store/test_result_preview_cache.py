@@ -0,0 +1,81 @@
+from unittest import TestCase, mock
+
+from lib.result_store.result_preview_cache import (
+    delete_uploading_result_preview,
+    get_result_preview,
+    get_uploading_result_preview,
+    set_result_preview,
+    set_uploading_result_preview,
+)
+
+RESULT = [["a", "b"], ["1", "foo"], ["2", "bar"]]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class ResultPreviewCacheTestCase(TestCase):
+    def setUp(self):
+        redis_patch = mock.patch(
+            "clients.redis_client.get_redis", return_value=FakeRedis()
+        )
+        self.redis = redis_patch.start()
+        self.addCleanup(redis_patch.stop)
+
+    def test_set_and_get(self):
+        self.assertIsNone(get_result_preview(1, 1000))
+
+        set_result_preview(1, 1000, RESULT)
+        self.assertEqual(get_result_preview(1, 1000), RESULT)
+        self.assertIsNone(get_result_preview(1, 5000))
+        self.assertIsNone(get_result_preview(2, 1000))
+
+    def test_only_cache_limit_options(self):
+        set_result_preview(1, 123, RESULT)
+        self.assertIsNone(get_result_preview(1, 123))
+
+    def test_skip_large_preview(self):
+        with mock.patch(
+            "lib.result_store.result_preview_cache.RESULT_PREVIEW_CACHE_MAX_SIZE", 5
+        ):
+            set_result_preview(1, 1000, RESULT)
+        self.assertIsNone(get_result_preview(1, 1000))
+        self.assertIsNone(get_uploading_result_preview(1))
+
+    def test_uploading_preview(self):
+        self.assertIsNone(get_uploading_result_preview(1))
+
+        self.assertTrue(set_uploading_result_preview(1, RESULT))
+        self.assertEqual(get_uploading_result_preview(1), RESULT)
+        self.assertIsNone(get_result_preview(1, 1000))
+
+        delete_uploading_result_preview(1)
+        self.assertIsNone(get_uploading_result_preview(1))
+
+    def test_skip_large_uploading_preview(self):
+        with mock.patch(
+            "lib.result_store.result_preview_cache.RESULT_PREVIEW_CACHE_MAX_SIZE", 5
+        ):
+            self.assertFalse(set_uploading_result_preview(1, RESULT))
+        self.assertIsNone(get_uploading_result_preview(1))
+
+    def test_redis_failure(self):
+        self.redis.return_value = mock.MagicMock()
+        self.redis.return_value.get.side_effect = Exception("redis is down")
+        self.redis.return_value.set.side_effect = Exception("redis is down")
+        # The preview is read from the result store instead
+        set_result_preview(1, 1000, RESULT)
+        self.assertIsNone(get_result_preview(1, 1000))
+        self.assertIsNone(get_uploading_result_preview(1))
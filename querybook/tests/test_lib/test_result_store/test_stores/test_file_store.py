@@ -1,4 +1,8 @@
+import gzip
+import tempfile
 from unittest import TestCase, mock
+
+from env import QuerybookSettings
 from lib.result_store.stores.file_store import (
     FileUploader,
     FileReader,
@@ -57,9 +61,9 @@ class FileUploaderTestCase(TestCase):
         self.assertEqual(uploader.uri_dir_path, FILE_STORE_PATH[:-1])
 
     def test_simple_write_value(self):
-        mock_file_content = ""
+        mock_file_content = b""
 
-        def mock_write_file(s: str):
+        def mock_write_file(s: bytes):
             nonlocal mock_file_content
             mock_file_content += s
 
@@ -74,18 +78,35 @@ class FileUploaderTestCase(TestCase):
 
             uploader.end()
 
-        m.assert_called_with(f"{FILE_STORE_PATH}test/path", "a")
+        # The file is opened once for the whole upload
+        m.assert_called_once_with(f"{FILE_STORE_PATH}test/path", "wb")
+        m.return_value.close.assert_called_once()
         self.assertEqual(
-            mock_file_content, 'foo,bar,baz\n"hello world", "foo\nbar", ","\n'
+            mock_file_content, b'foo,bar,baz\n"hello world", "foo\nbar", ","\n'
         )
 
+    def test_abort(self):
+        with mock.patch("builtins.open", mock.mock_open()) as m, mock.patch(
+            "lib.result_store.stores.file_store.os.remove"
+        ) as mock_remove:
+            uploader = FileUploader("test/path")
+            uploader.start()
+            uploader.write("foo,bar,baz\n")
+            uploader.abort()
+
+        # The partial file is closed and removed
+        m.return_value.close.assert_called_once()
+        mock_remove.assert_called_once_with(f"{FILE_STORE_PATH}test/path")
+
 
 class FileReaderTestCase(TestCase):
     mock_raw_csv = 'foo,bar,baz\n"hello "" world","foo \t bar",","\n'
     mock_csv = [["foo", "bar", "baz"], ['hello " world', "foo \t bar", ","]]
 
     def test_read_lines(self):
-        with mock.patch("builtins.open", mock.mock_open(read_data=self.mock_raw_csv)):
+        with mock.patch(
+            "builtins.open", mock.mock_open(read_data=self.mock_raw_csv.encode())
+        ):
             reader = FileReader("test")
             self.assertEqual(reader.read_lines(1), ["foo,bar,baz\n"])
             self.assertEqual(
@@ -94,11 +115,72 @@ class FileReaderTestCase(TestCase):
             )
 
     def test_read_csv(self):
-        with mock.patch("builtins.open", mock.mock_open(read_data=self.mock_raw_csv)):
+        with mock.patch(
+            "builtins.open", mock.mock_open(read_data=self.mock_raw_csv.encode())
+        ):
             reader = FileReader("test")
             self.assertEqual(reader.read_csv(0), [])
 
     def test_read_csv_with_num_lines_not_specified(self):
-        with mock.patch("builtins.open", mock.mock_open(read_data=self.mock_raw_csv)):
+        with mock.patch(
+            "builtins.open", mock.mock_open(read_data=self.mock_raw_csv.encode())
+        ):
             reader = FileReader("test")
             self.assertEqual(reader.read_csv(None), self.mock_csv)
+
+    def test_get_csv_iter_stops_reading(self):
+        with mock.patch(
+            "builtins.open",
+            mock.mock_open(read_data=(self.mock_raw_csv * 10000).encode()),
+        ) as m:
+            reader = FileReader("test")
+            self.assertEqual(reader.read_csv(1), self.mock_csv[:1])
+
+        # Only the first buffer of the file is read, and the file is closed
+        self.assertLess(
+            sum(len(call.args[0]) for call in m.return_value.readinto.call_args_list),
+            len(self.mock_raw_csv) * 10000,
+        )
+        m.return_value.close.assert_called()
+
+
+class FileStoreCompressionTestCase(TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.store_dir.cleanup)
+
+        for patcher in [
+            mock.patch(
+                "lib.result_store.stores.file_store.FILE_STORE_PATH",
+                self.store_dir.name + "/",
+            ),
+            mock.patch.object(QuerybookSettings, "STORE_COMPRESSION", "gzip"),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_compressed_round_trip(self):
+        raw_csv = FileReaderTestCase.mock_raw_csv * 1000
+        with FileUploader("test/result.csv") as uploader:
+            for line in raw_csv.splitlines(keepends=True):
+                uploader.write(line)
+
+        with open(uploader.uri, "rb") as result_file:
+            compressed = result_file.read()
+        self.assertEqual(gzip.decompress(compressed).decode(), raw_csv)
+        self.assertLess(len(compressed), len(raw_csv))
+
+        with FileReader("test/result.csv") as reader:
+            self.assertEqual(reader.read_raw(), raw_csv)
+            self.assertEqual(
+                reader.read_lines(2), raw_csv.splitlines(keepends=True)[:2]
+            )
+            self.assertEqual(reader.read_csv(2), FileReaderTestCase.mock_csv)
+
+    def test_read_uncompressed_result(self):
+        with mock.patch.object(QuerybookSettings, "STORE_COMPRESSION", None):
+            with FileUploader("test/result.csv") as uploader:
+                uploader.write(FileReaderTestCase.mock_raw_csv)
+
+        with FileReader("test/result.csv") as reader:
+            self.assertEqual(reader.read_raw(), FileReaderTestCase.mock_raw_csv)
@@ -1,6 +1,6 @@
 from unittest import TestCase, mock
 from env import QuerybookSettings
-from lib.result_store.stores.google_store import GoogleReader
+from lib.result_store.stores.google_store import GoogleReader, GoogleUploader
 
 
 class GoogleReaderTestCase(TestCase):
@@ -28,3 +28,30 @@ class GoogleReaderTestCase(TestCase):
             self.google_download_client_mock.assert_called_once_with(
                 QuerybookSettings.STORE_BUCKET_NAME, reader.uri, max_read_size=5
             )
+
+
+class GoogleUploaderTestCase(TestCase):
+    def setUp(self):
+        google_upload_client_patch = mock.patch(
+            "lib.result_store.stores.google_store.GoogleUploadClient",
+        )
+        self.addCleanup(google_upload_client_patch.stop)
+        self.google_upload_client_mock = google_upload_client_patch.start()
+        self.upload_client = self.google_upload_client_mock.return_value
+        self.upload_client.write.side_effect = len
+
+    def test_write_multiple_chunks(self):
+        uploader = GoogleUploader("test_uri")
+        uploader.start()
+        self.assertTrue(uploader.is_uploading)
+
+        self.assertTrue(uploader.write("a,b\n"))
+        self.assertTrue(uploader.write("1,2\n"))
+        self.assertEqual(uploader.checkpoint(), 8)
+        uploader.end()
+
+        self.upload_client.write.assert_has_calls(
+            [mock.call(b"a,b\n"), mock.call(b"1,2\n")]
+        )
+        self.upload_client.stop.assert_called_once()
+        self.assertFalse(uploader.is_uploading)
@@ -1,6 +1,9 @@
+import io
 from unittest import TestCase, mock
+
+from clients.common import FileDoesNotExist
 from env import QuerybookSettings
-from lib.result_store.stores.s3_store import S3Reader
+from lib.result_store.stores.s3_store import S3Reader, S3Uploader
 
 
 class S3FileReaderTestCase(TestCase):
@@ -28,3 +31,65 @@ class S3FileReaderTestCase(TestCase):
             self.s3_file_reader_mock.assert_called_once_with(
                 QuerybookSettings.STORE_BUCKET_NAME, reader.uri, max_read_size=5
             )
+
+
+class S3ReaderDownloadUrlTestCase(TestCase):
+    def _has_download_url(self, **kwargs):
+        with mock.patch("clients.s3_client.open_s3_object", **kwargs):
+            return S3Reader("test_uri").has_download_url
+
+    def test_zstd_result(self):
+        self.assertFalse(
+            self._has_download_url(return_value=io.BytesIO(b"\x28\xb5\x2f\xfd..."))
+        )
+
+    def test_gzip_result(self):
+        self.assertTrue(self._has_download_url(return_value=io.BytesIO(b"\x1f\x8b...")))
+
+    def test_uncompressed_result(self):
+        self.assertTrue(self._has_download_url(return_value=io.BytesIO(b"a,b\n")))
+
+    def test_missing_result(self):
+        self.assertTrue(self._has_download_url(side_effect=FileDoesNotExist()))
+
+
+class S3UploaderTestCase(TestCase):
+    def setUp(self):
+        multi_part_uploader_patch = mock.patch(
+            "lib.result_store.stores.s3_store.MultiPartUploader",
+        )
+        self.addCleanup(multi_part_uploader_patch.stop)
+        self.multi_part_uploader_mock = multi_part_uploader_patch.start()
+        self.upload_client = self.multi_part_uploader_mock.return_value
+        self.upload_client.write.return_value = True
+
+    def test_write_multiple_chunks(self):
+        uploader = S3Uploader("test_uri")
+        uploader.start()
+        self.assertTrue(uploader.is_uploading)
+
+        self.assertTrue(uploader.write("a,b\n"))
+        self.assertTrue(uploader.write("1,2\n"))
+        self.assertEqual(uploader.checkpoint(), 8)
+        uploader.end()
+
+        self.upload_client.write.assert_has_calls(
+            [mock.call(b"a,b\n"), mock.call(b"1,2\n")]
+        )
+        self.upload_client.complete.assert_called_once()
+        self.assertFalse(uploader.is_uploading)
+
+    def test_content_encoding(self):
+        for codec, content_encoding in [
+            ("gzip", "gzip"),
+            # Browsers do not decode zstd downloads
+            ("zstd", None),
+            (None, None),
+        ]:
+            self.multi_part_uploader_mock.reset_mock()
+            with mock.patch.object(QuerybookSettings, "STORE_COMPRESSION", codec):
+                S3Uploader("test_uri").start()
+            self.assertEqual(
+                self.multi_part_uploader_mock.call_args.kwargs["content_encoding"],
+                content_encoding,
+            )
@@ -105,3 +105,9 @@ class ValidateDatadocScheduleConfigTestCase(TestCase):
         mock_validate_exporters_config.side_effect = InvalidScheduleException()
         self.assertFalse(validate_datadoc_schedule_config({})[0])
         self.assertTrue(mock_validate_exporters_config.called)
+
+    def test_parallel_cells(self):
+        self.assertTrue(validate_datadoc_schedule_config({"parallel_cells": True})[0])
+        self.assertFalse(
+            validate_datadoc_schedule_config({"parallel_cells": "true"})[0]
+        )
@@ -0,0 +1,108 @@
+import io
+from unittest import TestCase, skipIf
+
+from lib.utils.compression import (
+    GZIP,
+    ZSTD,
+    StreamCompressor,
+    StreamDecompressor,
+    get_compression_codec,
+    open_decompressed_stream,
+    zstandard,
+)
+
+RAW_CSV = "".join(f'{i},"user {i}",{i * 1.5},é✓\n' for i in range(2000))
+
+
+def compress(codec: str, text: str, piece_size: int = 100) -> bytes:
+    compressor = StreamCompressor(codec)
+    compressed = b"".join(
+        compressor.compress(text[i : i + piece_size])
+        for i in range(0, len(text), piece_size)
+    )
+    return compressed + compressor.flush()
+
+
+def decompress(data: bytes, piece_size: int) -> bytes:
+    decompressor = StreamDecompressor()
+    decompressed = b"".join(
+        decompressor.decompress(data[i : i + piece_size])
+        for i in range(0, len(data), piece_size)
+    )
+    return decompressed + decompressor.flush()
+
+
+class GetCompressionCodecTestCase(TestCase):
+    def test_no_compression(self):
+        for codec in [None, "", "none", "NULL"]:
+            self.assertIsNone(get_compression_codec(codec))
+
+    def test_codec(self):
+        self.assertEqual(get_compression_codec("GZIP"), GZIP)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            get_compression_codec("lz4")
+
+
+class StreamCompressionTestCase(TestCase):
+    def _test_round_trip(self, codec: str):
+        compressed = compress(codec, RAW_CSV)
+        self.assertLess(len(compressed), len(RAW_CSV) / 2)
+
+        for piece_size in [1, 3, 1000, len(compressed)]:
+            decompressed = decompress(compressed, piece_size)
+            self.assertEqual(decompressed.decode(), RAW_CSV)
+
+    def test_gzip(self):
+        self._test_round_trip(GZIP)
+
+    @skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        self._test_round_trip(ZSTD)
+
+    def _test_checkpoint(self, codec: str):
+        compressor = StreamCompressor(codec)
+        head = compressor.compress(RAW_CSV[:1000]) + compressor.checkpoint()
+        tail = compressor.compress(RAW_CSV[1000:]) + compressor.flush()
+
+        # Decompress from the start
+        self.assertEqual(decompress(head + tail, 100).decode(), RAW_CSV)
+
+        # Decompress from the checkpoint
+        decompressor = StreamDecompressor(checkpoint_codec=codec)
+        decompressed = decompressor.decompress(tail) + decompressor.flush()
+        self.assertEqual(decompressed.decode(), RAW_CSV[1000:])
+
+    def test_gzip_checkpoint(self):
+        self._test_checkpoint(GZIP)
+
+    @skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd_checkpoint(self):
+        self._test_checkpoint(ZSTD)
+
+    def test_uncompressed_passthrough(self):
+        raw = RAW_CSV.encode()
+        for piece_size in [1, 3, 1000]:
+            self.assertEqual(decompress(raw, piece_size), raw)
+
+        # Shorter than any magic number
+        self.assertEqual(decompress(b"a\n", 1), b"a\n")
+        self.assertEqual(decompress(b"", 1), b"")
+
+
+class OpenDecompressedStreamTestCase(TestCase):
+    def test_compressed_stream(self):
+        stream = open_decompressed_stream(io.BytesIO(compress(GZIP, RAW_CSV)))
+        self.assertEqual(stream.read(10), RAW_CSV.encode()[:10])
+        self.assertEqual(stream.read(), RAW_CSV.encode()[10:])
+        self.assertEqual(stream.read(), b"")
+
+    def test_uncompressed_stream(self):
+        stream = open_decompressed_stream(io.BytesIO(RAW_CSV.encode()))
+        self.assertEqual(stream.read(), RAW_CSV.encode())
+
+    def test_close(self):
+        raw = io.BytesIO(b"")
+        open_decompressed_stream(raw).close()
+        self.assertTrue(raw.closed)
@@ -1,7 +1,16 @@
 import datetime
 from unittest import TestCase
 
-from lib.utils.csv import serialize_cell, row_to_csv, csv_sniffer, split_csv_to_chunks
+from lib.utils.csv import (
+    CSVBatchSerializer,
+    serialize_cell,
+    row_to_csv,
+    csv_sniffer,
+    iter_str_lines,
+    lines_to_csv_iter,
+    split_csv_to_chunks,
+    text_lines_to_csv_iter,
+)
 
 
 class SerializeCellTestCase(TestCase):
@@ -45,6 +54,44 @@ class RowToCSVTestCase(TestCase):
         self.assertEqual(row_to_csv(quote_row), '123,"Hello""World",123\n')
 
 
+class CSVBatchSerializerTestCase(TestCase):
+    def assert_same_as_row_to_csv(self, serializer, rows):
+        self.assertEqual(
+            serializer.serialize(rows), "".join(row_to_csv(row) for row in rows)
+        )
+
+    def test_mixed_types(self):
+        rows = [
+            ["Hello World", 1234, 0.5, "中文", None, True],
+            ['Hello"World', -1, float("nan"), "a,b", [1, 2], False],
+            ["Hello\nWorld", 0, 1e20, "", {"a": "b"}, None],
+        ]
+        self.assert_same_as_row_to_csv(CSVBatchSerializer(), rows)
+
+    def test_datetime(self):
+        rows = [
+            [datetime.datetime(2020, 1, 2, 3, 4, 5), datetime.date(2020, 1, 2)],
+            [datetime.datetime(2020, 1, 3), None],
+        ]
+        self.assert_same_as_row_to_csv(CSVBatchSerializer(), rows)
+
+    def test_plan_changes_between_chunks(self):
+        serializer = CSVBatchSerializer()
+        self.assert_same_as_row_to_csv(serializer, [["a", 1], ["b", 2]])
+        self.assert_same_as_row_to_csv(serializer, [[None, 1.5], [3, None]])
+        self.assert_same_as_row_to_csv(serializer, [["c", 3]])
+
+    def test_special_cases(self):
+        serializer = CSVBatchSerializer()
+        self.assertEqual(serializer.serialize([]), "")
+        # csv.writer would quote a single empty cell
+        self.assert_same_as_row_to_csv(serializer, [[""], ["a"]])
+        # csv.writer would not quote \r
+        self.assert_same_as_row_to_csv(serializer, [["a\rb", "c"]])
+        # Rows with different number of columns
+        self.assert_same_as_row_to_csv(serializer, [["a", "b"], ["c"]])
+
+
 class CSVSnifferTestCase(TestCase):
     def test_simple_csv(self):
         data = ["foo,bar", '"1", """"', '3, "4"""']
@@ -91,3 +138,56 @@ class SplitCSVToChunksTestCase(TestCase):
     def test_simple_csv_entire_partial(self):
         data = ['"foo,bar', "1, 2", "3, 4"]
         self.assertEqual(split_csv_to_chunks(data), ([], data))
+
+
+class LinesToCSVIterTestCase(TestCase):
+    def test_simple_csv(self):
+        data = ["foo,bar", '"1",""""', '3,"4"""']
+        self.assertEqual(
+            list(lines_to_csv_iter(data)), [["foo", "bar"], ["1", '"'], ["3", '4"']]
+        )
+
+    def test_csv_with_new_line(self):
+        data = ["foo,bar", '"', '1",""""', "", '3,"4', '"']
+        self.assertEqual(
+            list(lines_to_csv_iter(data)),
+            [["foo", "bar"], ["\n1", '"'], [], ["3", "4\n"]],
+        )
+
+    def test_last_row_partial(self):
+        data = ["foo,bar", '"1",""""', '3,"', "4,5"]
+        self.assertEqual(list(lines_to_csv_iter(data)), [["foo", "bar"], ["1", '"']])
+
+    def test_null_byte(self):
+        self.assertEqual(list(lines_to_csv_iter(["a\x00,b"])), [["a", "b"]])
+
+    def test_lazy(self):
+        def lines():
+            yield "foo,bar"
+            raise Exception("Should not be read")
+
+        self.assertEqual(next(lines_to_csv_iter(lines())), ["foo", "bar"])
+
+
+class IterStrLinesTestCase(TestCase):
+    def test_lines(self):
+        for raw_str in ["", "a", "a\n", "a\nb", "a\n\nb\n", "\n\n"]:
+            self.assertEqual(
+                list(iter_str_lines(raw_str)), raw_str.splitlines(keepends=True)
+            )
+
+
+class TextLinesToCSVIterTestCase(TestCase):
+    def test_csv(self):
+        raw_csv = 'foo,bar\n"multi\nline",""""\n3,"4\x00"'
+        self.assertEqual(
+            list(text_lines_to_csv_iter(iter_str_lines(raw_csv))),
+            [["foo", "bar"], ["multi\nline", '"'], ["3", "4"]],
+        )
+
+    def test_lazy(self):
+        def lines():
+            yield "foo,bar\n"
+            raise Exception("Should not be read")
+
+        self.assertEqual(next(text_lines_to_csv_iter(lines())), ["foo", "bar"])
@@ -0,0 +1,26 @@
+from unittest import TestCase, mock
+
+from lib.utils.execute_query import ExecuteQuery
+
+
+class ExecuteQueryCloseTestCase(TestCase):
+    def setUp(self):
+        patcher = mock.patch("lib.utils.execute_query.get_client_pool")
+        self.addCleanup(patcher.stop)
+        self.mock_pool = patcher.start().return_value
+
+    def test_close_unfinished_query(self):
+        client = mock.Mock()
+        async_execute_query = ExecuteQuery(True)
+        async_execute_query._async_run(client, client.cursor(), ["select 1"])
+
+        async_execute_query.close()
+        self.mock_pool.release.assert_called_once_with(client, reusable=False)
+
+        # The client is only released once
+        async_execute_query.close()
+        self.mock_pool.release.assert_called_once()
+
+    def test_close_sync_query(self):
+        ExecuteQuery(False).close()
+        self.mock_pool.release.assert_not_called()
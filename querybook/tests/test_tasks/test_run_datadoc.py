@@ -0,0 +1,117 @@
+from unittest import TestCase, mock
+
+from const.query_execution import QueryExecutionStatus
+from tasks.run_datadoc import (
+    _get_cell_stages,
+    _get_datadoc_run_tasks,
+    _on_datadoc_stage_completion,
+)
+
+DONE = QueryExecutionStatus.DONE.value
+ERROR = QueryExecutionStatus.ERROR.value
+
+
+class GetCellStagesTestCase(TestCase):
+    QUERIES = [
+        "create table b as select * from a",
+        "select * from c",
+        "select * from b",
+        "insert into b select * from c",
+    ]
+
+    def test_sequential(self):
+        self.assertEqual(
+            _get_cell_stages(self.QUERIES, parallel_cells=False),
+            [[0], [1], [2], [3]],
+        )
+
+    def test_parallel(self):
+        self.assertEqual(
+            _get_cell_stages(self.QUERIES, parallel_cells=True),
+            [[0, 1], [2], [3]],
+        )
+
+    def test_different_metastores(self):
+        # Only the cells of the same metastore depend on each other
+        self.assertEqual(
+            _get_cell_stages(
+                self.QUERIES,
+                parallel_cells=True,
+                cell_engines=[("hive", 1), ("hive", 1), ("presto", 2), ("hive", 1)],
+            ),
+            [[0, 1, 2], [3]],
+        )
+
+    def test_engine_language(self):
+        # main is the default schema of sqlite
+        self.assertEqual(
+            _get_cell_stages(
+                ["create table main.b as select 1", "select * from b"],
+                parallel_cells=True,
+                cell_engines=[("sqlite", 1), ("sqlite", 1)],
+            ),
+            [[0], [1]],
+        )
+
+
+class GetDatadocRunTasksTestCase(TestCase):
+    def _get_cell(self, cell_id, query):
+        return {
+            "cell_id": cell_id,
+            "query_execution_params": {"query": query, "engine_id": 1, "uid": 1},
+            "data_doc_id": 1,
+        }
+
+    def test_parallel_tasks(self):
+        tasks = _get_datadoc_run_tasks(
+            [
+                self._get_cell(1, "select * from a"),
+                self._get_cell(2, "select * from b"),
+            ],
+            "scheduled",
+            parallel_cells=True,
+        )
+        self.assertEqual(len(tasks), 2)
+        self.assertEqual(len(tasks[0].tasks), 2)
+        self.assertEqual(tasks[1].kwargs, {"is_last_stage": True})
+
+    def test_sequential_tasks(self):
+        tasks = _get_datadoc_run_tasks(
+            [
+                self._get_cell(1, "select * from a"),
+                self._get_cell(2, "select * from b"),
+            ],
+            "scheduled",
+        )
+        self.assertEqual(
+            [task.task for task in tasks],
+            [
+                "tasks.run_datadoc._start_query_execution_task",
+                "tasks.run_query.run_query_task",
+            ]
+            * 2,
+        )
+        # Only the first cell does not wait for a previous cell
+        self.assertTrue(tasks[0].immutable)
+        self.assertFalse(tasks[2].immutable)
+
+
+class OnDatadocStageCompletionTestCase(TestCase):
+    def test_success(self):
+        self.assertEqual(
+            _on_datadoc_stage_completion([[DONE, 1], [DONE, 2]], is_last_stage=False),
+            (DONE, 2),
+        )
+
+    @mock.patch("tasks.run_datadoc.get_datadoc_error_message")
+    def test_failure(self, mock_get_datadoc_error_message):
+        mock_get_datadoc_error_message.return_value = "Failure in cell"
+        with self.assertRaisesRegex(Exception, "Failure in cell"):
+            _on_datadoc_stage_completion([[DONE, 1], [ERROR, 2]], is_last_stage=False)
+        mock_get_datadoc_error_message.assert_called_once_with(2)
+
+        # The last stage reports the failure like a single cell
+        self.assertEqual(
+            _on_datadoc_stage_completion([[DONE, 1], [ERROR, 2]], is_last_stage=True),
+            (ERROR, 2),
+        )
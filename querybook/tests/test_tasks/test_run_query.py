@@ -0,0 +1,28 @@
+from unittest import TestCase, mock
+
+from const.query_execution import QueryExecutionStatus
+from tasks.run_query import run_query_task
+
+
+class RunQueryTaskTestCase(TestCase):
+    def _patch(self, name, **kwargs):
+        patcher = mock.patch(f"tasks.run_query.{name}", **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def setUp(self):
+        self._patch("DBSession")
+        self.mock_notify = self._patch("notifiy_on_execution_completion")
+        self.mock_qe_logic = self._patch("qe_logic")
+        self.mock_create_executor = self._patch("create_executor_from_execution")
+        self.mock_log_query_per_table = self._patch("log_query_per_table_task")
+
+    def test_cached_execution(self):
+        self._patch("is_query_execution_done", return_value=True)
+        self.assertEqual(run_query_task.run(1), (QueryExecutionStatus.DONE.value, 1))
+        self.mock_create_executor.assert_not_called()
+        self.mock_notify.assert_called_once_with(1, session=mock.ANY)
+        self.mock_qe_logic.update_es_query_execution_by_id.assert_called_once_with(1)
+        self.mock_log_query_per_table.delay.assert_called_once_with(
+            1, execution_type="adhoc"
+        )
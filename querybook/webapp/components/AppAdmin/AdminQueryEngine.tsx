@@ -441,6 +441,29 @@ export const AdminQueryEngine: React.FunctionComponent<IProps> = ({
                                     label="(Experimental) Enable Row Limit"
                                 />
 
+                                <SimpleField
+                                    stacked
+                                    name="feature_params.parallel_statements"
+                                    type="toggle"
+                                    label="(Experimental) Run Independent Statements in Parallel"
+                                />
+
+                                <SimpleField
+                                    stacked
+                                    name="feature_params.result_cache_ttl"
+                                    type="number"
+                                    label="(Experimental) Result Cache TTL (seconds)"
+                                    help="Reuse the result of an identical read only query run in the last N seconds. The cache is shared by all users of the engine, unless it impersonates the querying user. Leave empty to disable."
+                                />
+
+                                <SimpleField
+                                    stacked
+                                    name="feature_params.max_result_rows"
+                                    type="number"
+                                    label="(Experimental) Max Result Rows"
+                                    help="SELECT statements without a LIMIT are run with this LIMIT, and no more rows of a statement are fetched. Leave empty to only be limited by the result store."
+                                />
+
                                 {isPeerReviewEnabled && (
                                     <SimpleField
                                         stacked
@@ -109,6 +109,7 @@ interface IScheduleFormValues {
     kwargs: {
         notifications: IDataDocScheduleNotification[];
         exports: IDataDocScheduleKwargs['exports'];
+        parallel_cells?: boolean;
     };
 }
 
@@ -143,6 +144,7 @@ export const DataDocScheduleForm: React.FunctionComponent<
               kwargs: {
                   exports: [],
                   notifications: [],
+                  parallel_cells: false,
               },
           }
         : {
@@ -150,6 +152,7 @@ export const DataDocScheduleForm: React.FunctionComponent<
               enabled,
               kwargs: {
                   exports: kwargs.exports,
+                  parallel_cells: kwargs.parallel_cells ?? false,
                   // merge notification config from `config.to_user` and `config.to` to `config.to_all`
                   notifications: kwargs.notifications.map((n) => ({
                       ...n,
@@ -219,6 +222,15 @@ export const DataDocScheduleForm: React.FunctionComponent<
                     <SimpleField label="Enabled" name="enabled" type="toggle" />
                 );
 
+                const parallelCellsField = (
+                    <SimpleField
+                        label="Parallel Cells"
+                        name="kwargs.parallel_cells"
+                        type="toggle"
+                        help="Run the cells that do not use the tables of each other at the same time"
+                    />
+                );
+
                 const notificationField = (
                     <>
                         <FormSectionHeader>Notification</FormSectionHeader>
@@ -282,6 +294,7 @@ export const DataDocScheduleForm: React.FunctionComponent<
                                         }
                                     />
                                     {enabledField}
+                                    {parallelCellsField}
                                     {notificationField}
                                     {exportField}
 
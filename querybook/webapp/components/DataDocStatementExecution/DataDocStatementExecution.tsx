@@ -1,6 +1,7 @@
 import React, { useCallback, useEffect, useMemo, useState } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
 
+import { StatementResultTable } from 'components/StatementResultTable/StatementResultTable';
 import {
     IStatementExecution,
     StatementExecutionStatus,
@@ -8,7 +9,10 @@ import {
 import { StatementExecutionDefaultResultSize } from 'const/queryResultLimit';
 import { useToggleState } from 'hooks/useToggleState';
 import { sanitizeAndExtraMarkdown } from 'lib/markdown';
-import { fetchResult } from 'redux/queryExecutions/action';
+import {
+    fetchResult,
+    fetchResultPreview,
+} from 'redux/queryExecutions/action';
 import { IStoreState } from 'redux/store/types';
 import { Icon } from 'ui/Icon/Icon';
 import { Modal } from 'ui/Modal/Modal';
@@ -67,11 +71,35 @@ function useStatementResult(statementExecution: IStatementExecution) {
         loadStatementResult,
     ]);
 
+    // Rows fetched while the result is still uploading
+    const statementResultPreview = useSelector(
+        (state: IStoreState) =>
+            state.queryExecutions.statementResultPreviewById[
+                statementExecution.id
+            ]
+    );
+
+    const isUploading =
+        statementExecution.status === StatementExecutionStatus.UPLOADING;
+    useEffect(() => {
+        // The preview is only pushed by the socket once, fetch it if the
+        // statement was already uploading (e.g. after a page reload)
+        if (isUploading && !statementResultPreview) {
+            dispatch(
+                fetchResultPreview(
+                    statementExecution.id,
+                    StatementExecutionDefaultResultSize
+                )
+            );
+        }
+    }, [statementExecution.id, isUploading]);
+
     return {
         resultLimit,
         setResultLimit,
 
         statementResult,
+        statementResultPreview,
         isFetchingStatementResult,
     };
 }
@@ -120,6 +148,7 @@ export const DataDocStatementExecution: React.FC<IProps> = ({
         setResultLimit,
         isFetchingStatementResult,
         statementResult,
+        statementResultPreview,
     } = useStatementResult(statementExecution);
 
     const getLogDOM = () => (
@@ -176,6 +205,13 @@ export const DataDocStatementExecution: React.FC<IProps> = ({
                             Loading query results
                         </AccentText>
                     </div>
+                    {statementResultPreview && (
+                        <StatementResultTable
+                            data={statementResultPreview}
+                            paginate
+                            isPreview
+                        />
+                    )}
                     {getLogDOM()}
                 </div>
             );
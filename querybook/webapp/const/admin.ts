@@ -47,6 +47,9 @@ export interface IAdminQueryEngine {
     feature_params: {
         status_checker?: string;
         upload_exporter?: string;
+        result_cache_ttl?: number;
+        parallel_statements?: boolean;
+        max_result_rows?: number;
     };
 
     environments?: IAdminEnvironment[];
@@ -16,6 +16,9 @@ export interface IQueryEngine {
         upload_exporter?: string;
         validator?: string;
         peer_review?: boolean;
+        result_cache_ttl?: number;
+        parallel_statements?: boolean;
+        max_result_rows?: number;
     };
 }
 
@@ -83,6 +83,7 @@ export interface IDataDocScheduleKwargs {
         exporter_name?: string;
         exporter_params?: Record<string, any>;
     }>;
+    parallel_cells?: boolean;
 }
 
 export interface IDataDocTaskSchedule extends ITaskSchedule {
@@ -10,6 +10,7 @@ import {
     IRawQueryExecution,
     IStatementExecution,
     QueryExecutionStatus,
+    StatementExecutionStatus,
 } from 'const/queryExecution';
 import { queryCellExecutionManager } from 'lib/batch/query-execution-manager';
 import SocketIOManager from 'lib/socketio-manager';
@@ -539,6 +540,41 @@ export function fetchResult(
     };
 }
 
+export function fetchResultPreview(
+    statementExecutionId: number,
+    numberOfLines: number
+): ThunkResult<Promise<void>> {
+    return async (dispatch, getState) => {
+        try {
+            // The server returns the rows fetched so far while uploading
+            const { data } = await StatementResource.getResult(
+                statementExecutionId,
+                numberOfLines
+            );
+
+            // The result may be uploaded while the preview is fetched
+            const statementExecution =
+                getState().queryExecutions.statementExecutionById[
+                    statementExecutionId
+                ];
+            if (
+                statementExecution?.status ===
+                StatementExecutionStatus.UPLOADING
+            ) {
+                dispatch({
+                    type: '@@queryExecutions/RECEIVE_RESULT_PREVIEW',
+                    payload: {
+                        statementExecutionId,
+                        data,
+                    },
+                });
+            }
+        } catch (error) {
+            // The preview is optional, the result is shown once uploaded
+        }
+    };
+}
+
 export function fetchLog(
     statementExecutionId: number
 ): ThunkResult<Promise<void>> {
@@ -726,6 +762,18 @@ class QueryExecutionSocket {
                     );
                 }
             );
+            this.socket.on(
+                'statement_result_preview',
+                (preview: { id: number; data: string[][] }) => {
+                    this.dispatch({
+                        type: '@@queryExecutions/RECEIVE_RESULT_PREVIEW',
+                        payload: {
+                            statementExecutionId: preview.id,
+                            data: preview.data,
+                        },
+                    });
+                }
+            );
             this.socket.on(
                 'statement_end',
                 (statementExecution: IStatementExecution) => {
@@ -17,6 +17,7 @@ const initialState: IQueryExecutionState = {
 
     statementResultById: {},
     statementResultLoadingById: {},
+    statementResultPreviewById: {},
 
     statementLogById: {},
     queryErrorById: {},
@@ -368,6 +369,32 @@ function statementResultLoadingByIdReducer(
     });
 }
 
+function statementResultPreviewByIdReducer(
+    state = initialState.statementResultPreviewById,
+    action: QueryExecutionAction
+) {
+    return produce(state, (draft) => {
+        switch (action.type) {
+            case '@@queryExecutions/RECEIVE_RESULT_PREVIEW': {
+                const { statementExecutionId, data } = action.payload;
+                draft[statementExecutionId] = data;
+                return;
+            }
+            case '@@queryExecutions/RECEIVE_STATEMENT_EXECUTION': {
+                // The preview is not needed once the result is uploaded
+                const { statementExecution } = action.payload;
+                if (
+                    statementExecution.status !==
+                    StatementExecutionStatus.UPLOADING
+                ) {
+                    delete draft[statementExecution.id];
+                }
+                return;
+            }
+        }
+    });
+}
+
 function queryErrorByIdReducer(
     state = initialState.queryErrorById,
     action: QueryExecutionAction
@@ -476,6 +503,7 @@ export default combineReducers({
 
     statementResultById: statementResultByIdReducer,
     statementResultLoadingById: statementResultLoadingByIdReducer,
+    statementResultPreviewById: statementResultPreviewByIdReducer,
 
     statementLogById: statementLogByIdReducer,
     queryErrorById: queryErrorByIdReducer,
@@ -101,6 +101,14 @@ export interface IReceiveStatementExecutionUpdateAction extends Action {
     };
 }
 
+export interface IReceiveResultPreviewAction extends Action {
+    type: '@@queryExecutions/RECEIVE_RESULT_PREVIEW';
+    payload: {
+        statementExecutionId: number;
+        data: string[][];
+    };
+}
+
 export interface IReceiveStatementExporters extends Action {
     type: '@@queryExecutions/RECEIVE_QUERY_RESULT_EXPORTERS';
     payload: {
@@ -173,6 +181,7 @@ export type QueryExecutionAction =
     | IReceiveDownloadUrlAction
     | IStartResultAction
     | IReceiveResultAction
+    | IReceiveResultPreviewAction
     | IReceiveLogAction
     | IReceiveStatementExecutionAction
     | IReceiveStatementExecutionUpdateAction
@@ -203,6 +212,8 @@ export interface IQueryExecutionState {
     queryErrorById: Record<number, IQueryError>;
     statementResultById: Record<number, IStatementResult>;
     statementResultLoadingById: Record<number, IStatementResultLoading>;
+    // First rows of the statements that are uploading their result
+    statementResultPreviewById: Record<number, string[][]>;
     statementLogById: Record<number, IStatementLog>;
 
     statementExporters: IQueryResultExporter[];
@@ -122,9 +122,10 @@ export const QueryExecutionMetadataResource = {
 };
 
 export const StatementResource = {
-    getResult: (id: number, numberOfLines?: number) =>
+    getResult: (id: number, numberOfLines?: number, offset?: number) =>
         ds.fetch<string[][]>(`/statement_execution/${id}/result/`, {
             limit: numberOfLines,
+            offset,
         }),
     getLogs: (id: number) =>
         ds.fetch<string[]>(`/statement_execution/${id}/log/`),